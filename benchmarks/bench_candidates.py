@@ -0,0 +1,119 @@
+"""
+Multi-candidate evaluation against one evaluate_batch call per model.
+
+Builds one synthetic reference set and several candidate prediction sets
+(different correctness levels), then times evaluate_candidates, which
+preprocesses and embeds the references once per chunk, against calling
+evaluate_batch for each model. Checks both give the same aggregates and
+reports each path's peak traced (Python + numpy) allocation, measured in a
+separate tracemalloc run; evaluate_candidates writes per-sample results to
+a temporary directory, so its peak is set by chunk_size, not by the number
+of samples or models.
+
+    python benchmarks/bench_candidates.py --samples 5000 --models 10
+    python benchmarks/bench_candidates.py --model /path/to/local/sentence-transformer
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.datasets import DatasetLoader
+from src.evaluator import LLMEvaluator
+
+# Semantic scores of a text depend slightly on what it is padded with in a batch
+AGGREGATE_TOLERANCE = 1e-5
+
+
+def build_candidates(samples: int, models: int, seed: int = 0):
+    references, candidates = None, {}
+    for k in range(models):
+        level = 0.2 + 0.7 * k / max(1, models - 1)
+        items = DatasetLoader.create_synthetic_dataset(samples, seed=seed, correctness_level=level)
+        references = [item['reference_answer'] for item in items]
+        candidates[f'model_{k:02d}'] = [item['prediction'] for item in items]
+    return references, candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--models', type=int, default=10)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--model', default=None,
+                        help="Sentence-transformer name or local path (default: tiny offline model)")
+    parser.add_argument('--no-semantic', action='store_true')
+    args = parser.parse_args()
+
+    references, candidates = build_candidates(args.samples, args.models)
+    metrics_config = {
+        'exact_match': {'normalize': True},
+        'fuzzy_match': {'threshold': 0.7},
+        'keyword_match': {},
+    }
+    if not args.no_semantic:
+        if args.model:
+            model_name = args.model
+        else:
+            from tiny_model import build_tiny_model
+            model_name = build_tiny_model(os.path.join(tempfile.gettempdir(), 'llm-eval-tiny-model'))
+        metrics_config['semantic_similarity'] = {'model_name': model_name}
+
+    evaluator = LLMEvaluator(metrics_config)
+    # Load the model outside the timed region
+    evaluator.evaluate_batch(references[:2], references[:2])
+
+    def run_candidates():
+        with tempfile.TemporaryDirectory() as output_dir:
+            # Per-sample results go to disk, as they would in a large run
+            return evaluator.evaluate_candidates(references, candidates, chunk_size=args.chunk_size,
+                                                 output_dir=output_dir)
+
+    def run_separate():
+        return {name: evaluator.evaluate_batch(predictions, references)['aggregate']
+                for name, predictions in candidates.items()}
+
+    start = time.perf_counter()
+    combined = run_candidates()
+    combined_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    separate = run_separate()
+    separate_seconds = time.perf_counter() - start
+
+    peaks = {}
+    tracemalloc.start()
+    for name, run in (('candidates', run_candidates), ('per_model_batch', run_separate)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run()
+        peaks[name] = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    max_diff = max(abs(value - combined['models'][name]['aggregate'][key])
+                   for name, aggregate in separate.items() for key, value in aggregate.items())
+    report = {
+        'samples': args.samples,
+        'models': args.models,
+        'chunk_size': args.chunk_size,
+        'candidates_seconds': combined_seconds,
+        'per_model_batch_seconds': separate_seconds,
+        'speedup': separate_seconds / combined_seconds if combined_seconds else None,
+        'candidates_peak_traced_bytes': peaks['candidates'],
+        'per_model_batch_peak_traced_bytes': peaks['per_model_batch'],
+        'max_aggregate_diff': max_diff,
+        'comparison': combined['comparison'],
+    }
+    print(json.dumps(report, indent=2))
+    if max_diff > AGGREGATE_TOLERANCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Paired run comparison on million-row columnar runs.
+
+Writes two synthetic runs as .evalcols stores: the candidate is a slightly
+worse model, in shuffled row order, missing a few baseline samples. It then
+times the comparison engine (load, hash-index alignment, paired bootstrap,
+permutation test, top-k regressions, gate) and checks its mean deltas and
+top regressions against a pandas merge of the same two runs.
+
+    python benchmarks/bench_compare.py --rows 1000000
+    python benchmarks/bench_compare.py --rows 100000 --drop 0.0
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.compare import compare_runs, load_run
+from src.storage import ColumnarResultWriter
+
+METRICS = ('exact_match', 'fuzzy_match', 'keyword_match', 'semantic_similarity')
+
+
+def build_scores(rows: int, drop: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    skill = rng.random(rows)
+    baseline = {
+        'exact_match': (rng.random(rows) < skill).astype(np.float64),
+        'fuzzy_match': (rng.random(rows) < skill + 0.1).astype(np.float64),
+        'keyword_match': np.round(np.clip(skill + rng.normal(0, 0.2, rows), 0, 1) * 4) / 4,
+        'semantic_similarity': np.clip(skill + rng.normal(0, 0.1, rows), -1, 1),
+    }
+    # Most answers are unchanged; the rest are re-drawn around a lower skill
+    changed = rng.random(rows) < 0.3
+    candidate = {}
+    for metric, values in baseline.items():
+        worse = np.clip(values - drop + rng.normal(0, 0.2, rows), 0, 1)
+        if metric != 'semantic_similarity':
+            worse = np.round(worse * 4) / 4 if metric == 'keyword_match' else (worse > 0.5).astype(np.float64)
+        candidate[metric] = np.where(changed, worse, values)
+    for scores in (baseline, candidate):
+        scores['overall_score'] = sum(scores[m] for m in METRICS) / len(METRICS)
+    return baseline, candidate
+
+
+def write_run(path: Path, sample_ids, scores, order, chunk: int = 50_000):
+    with ColumnarResultWriter(path) as writer:
+        for start in range(0, len(order), chunk):
+            rows = order[start:start + chunk]
+            columns = {metric: values[rows].tolist() for metric, values in scores.items()}
+            writer.write_samples([
+                {'sample_id': sample_ids[row], 'prediction': '', 'reference': '',
+                 'scores': {metric: columns[metric][i] for metric in scores}}
+                for i, row in enumerate(rows.tolist())
+            ])
+        writer.close({'total_samples': len(order)}, {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--drop', type=float, default=0.01, help="Mean score drop of changed candidate answers")
+    parser.add_argument('--missing', type=float, default=0.01, help="Fraction of samples only the baseline has")
+    parser.add_argument('--bootstrap', type=int, default=1000)
+    parser.add_argument('--permutations', type=int, default=1000)
+    args = parser.parse_args()
+
+    baseline_scores, candidate_scores = build_scores(args.rows, args.drop)
+    sample_ids = [f'q{i:07d}' for i in range(args.rows)]
+    rng = np.random.default_rng(1)
+    candidate_order = rng.permutation(args.rows)[:int(args.rows * (1 - args.missing))]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        write_run(workdir / 'baseline.evalcols', sample_ids, baseline_scores, np.arange(args.rows))
+        write_run(workdir / 'candidate.evalcols', sample_ids, candidate_scores, candidate_order)
+
+        timings = {}
+        start = time.perf_counter()
+        baseline, candidate = load_run(str(workdir / 'baseline.evalcols')), load_run(str(workdir / 'candidate.evalcols'))
+        timings['load'] = time.perf_counter() - start
+        start = time.perf_counter()
+        report = compare_runs(baseline, candidate, n_boot=args.bootstrap, n_permutations=args.permutations,
+                              max_drops={'overall_score': 0.0})
+        timings['compare'] = time.perf_counter() - start
+
+        import pandas as pd
+
+        start = time.perf_counter()
+        frames = [pd.DataFrame(dict({'sample_id': run.sample_ids},
+                                    **{m: run.scores[:, j] for j, m in enumerate(run.metrics)}))
+                  for run in (baseline, candidate)]
+        merged = frames[0].merge(frames[1], on='sample_id', suffixes=('_base', '_cand'))
+        expected = {m: float((merged[f'{m}_cand'] - merged[f'{m}_base']).mean()) for m in report['metrics']}
+        worst = (merged['overall_score_cand'] - merged['overall_score_base']).nsmallest(len(report['top_regressions']))
+        timings['pandas_merge_means'] = time.perf_counter() - start
+
+    delta_diff = max(abs(expected[m] - entry['mean_delta']) for m, entry in report['metrics'].items())
+    top_matches = np.allclose(sorted(worst.tolist()), sorted(e['delta'] for e in report['top_regressions']))
+    result = {
+        'rows': args.rows,
+        'pairs': report['pairs'],
+        'bootstrap_replicates': args.bootstrap,
+        'permutations': args.permutations,
+        'seconds': timings,
+        'overall_score': report['metrics']['overall_score'],
+        'gate_failed': report['gate']['failed'],
+        'max_mean_delta_diff_vs_pandas': delta_diff,
+        'top_regressions_match_pandas': bool(top_matches),
+    }
+    print(json.dumps(result, indent=2))
+    if delta_diff > 1e-12 or not top_matches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
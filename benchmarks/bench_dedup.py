@@ -0,0 +1,99 @@
+"""
+In-batch deduplication benchmark on a skewed synthetic dataset.
+
+Draws (prediction, reference) pairs from a Zipf-like distribution over a
+small pool, the way temperature-0 outputs and templated references repeat,
+then times evaluate_batch's row scoring with and without deduplication and
+checks that both produce the same scores.
+
+    python benchmarks/bench_dedup.py --rows 20000 --pool 2000 --skew 1.2
+    python benchmarks/bench_dedup.py --model /path/to/local/sentence-transformer
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.datasets import DatasetLoader
+from src.evaluator import LLMEvaluator
+
+# Semantic scores of a text depend slightly on what it is padded with in a batch
+SEMANTIC_TOLERANCE = 1e-5
+
+
+def build_dataset(rows: int, pool: int, skew: float, seed: int = 0):
+    random.seed(seed)
+    base = DatasetLoader.create_qa_dataset(num_samples=10)
+    items = [dict(base[i % len(base)], reference_answer=f"{base[i % len(base)]['reference_answer']} (v{i})")
+             for i in range(pool)]
+    predictions = DatasetLoader.generate_llm_predictions(items, correctness_level=0.7)
+    references = [item['reference_answer'] for item in items]
+
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, pool + 1) ** skew
+    picks = rng.choice(pool, size=rows, p=weights / weights.sum())
+    return [predictions[i] for i in picks], [references[i] for i in picks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--pool', type=int, default=2000, help="Distinct pairs to draw from")
+    parser.add_argument('--skew', type=float, default=1.2, help="Zipf exponent of pair frequencies")
+    parser.add_argument('--model', default=None, help="Sentence-transformer name or local path")
+    parser.add_argument('--no-semantic', action='store_true')
+    args = parser.parse_args()
+
+    predictions, references = build_dataset(args.rows, args.pool, args.skew)
+
+    metrics_config = {
+        'exact_match': {'normalize': True},
+        'fuzzy_match': {'threshold': 0.7},
+        'keyword_match': {},
+    }
+    if not args.no_semantic:
+        metrics_config['semantic_similarity'] = {'model_name': args.model or 'all-MiniLM-L6-v2'}
+
+    evaluator = LLMEvaluator(metrics_config)
+    # Load the model outside the timed region
+    evaluator._score_columns(predictions[:2], references[:2])
+
+    start = time.perf_counter()
+    full = evaluator._score_columns(predictions, references)
+    full_seconds = time.perf_counter() - start
+
+    dedup_stats = {}
+    start = time.perf_counter()
+    deduped = evaluator._score_all(predictions, references, dedup_stats=dedup_stats)
+    dedup_seconds = time.perf_counter() - start
+
+    max_diff = {
+        metric: float(np.max(np.abs(np.asarray(full[metric]) - np.asarray(deduped[metric]))))
+        for metric in full
+    }
+    tolerance = {metric: SEMANTIC_TOLERANCE if metric == 'semantic_similarity' else 0.0
+                 for metric in full}
+
+    report = {
+        'rows': args.rows,
+        'pool': args.pool,
+        'skew': args.skew,
+        'dedup': LLMEvaluator._dedup_summary(dedup_stats),
+        'full_seconds': full_seconds,
+        'dedup_seconds': dedup_seconds,
+        'speedup': full_seconds / dedup_seconds if dedup_seconds else None,
+        'max_abs_diff': max_diff,
+    }
+    print(json.dumps(report, indent=2))
+    if any(max_diff[metric] > tolerance[metric] for metric in max_diff):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
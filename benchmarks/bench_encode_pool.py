@@ -0,0 +1,127 @@
+"""
+Multi-process encoding throughput against single-process encode.
+
+Encodes the same texts with RelevanceMetrics in-process (torch using all
+cores) and with EncoderPool at each worker count (cores split evenly between
+workers), reports texts/second and speedup over the single process, and
+checks the embeddings agree.
+
+Where it helps: one process stops scaling past a few intra-op threads, so on
+machines with many cores, several workers with fewer threads each encode
+more texts per second. On a machine with one or two cores the pool only adds
+process and copy overhead; expect a speedup below 1 there. Model load time
+is excluded from the timings.
+
+The workers=1 row isolates the pool's own overhead (IPC, shared-memory
+copy); compare later rows against it for the gain from parallelism.
+
+    python benchmarks/bench_encode_pool.py --texts 20000 --workers 1 2 4 8
+    python benchmarks/bench_encode_pool.py --model /path/to/local/sentence-transformer
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.datasets import DatasetLoader
+from src.metrics.encoding_pool import EncoderPool
+from src.metrics.relevance import RelevanceMetrics
+
+# Embeddings of a text depend slightly on what it is padded with in a batch
+EMBEDDING_TOLERANCE = 1e-4
+
+
+def build_texts(count: int, seed: int = 0):
+    items = DatasetLoader.create_synthetic_dataset(count, seed=seed)
+    texts = [item['prediction'] for item in items]
+    random.Random(seed).shuffle(texts)
+    return texts
+
+
+def timed_encode(encode, texts, batch_size: int, repeat: int):
+    best, embeddings = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = [encode(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+        embeddings = np.concatenate(chunks)
+    return best, embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--texts', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help="Default: cores split evenly between workers")
+    parser.add_argument('--batch-size', type=int, default=1024,
+                        help="Texts per encode call (RelevanceMetrics encodes one mini-batch per call)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--model', default=None,
+                        help="Sentence-transformer name or local path (default: tiny offline model)")
+    parser.add_argument('--output', default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    if args.model:
+        model = args.model
+    else:
+        from tiny_model import build_tiny_model
+        model = build_tiny_model(os.path.join(tempfile.gettempdir(), 'llm-eval-tiny-model'))
+    texts = build_texts(args.texts)
+
+    import torch
+
+    single = RelevanceMetrics(model_name=model)
+    single.encode(texts[:8])
+    single_seconds, reference = timed_encode(single.encode, texts, args.batch_size, args.repeat)
+
+    cases = [{
+        'workers': 1,
+        'threads_per_worker': torch.get_num_threads(),
+        'seconds': single_seconds,
+        'texts_per_second': len(texts) / single_seconds,
+        'speedup': 1.0,
+        'max_abs_diff': 0.0,
+    }]
+
+    failed = False
+    for workers in args.workers:
+        with EncoderPool(model, workers, threads_per_worker=args.threads_per_worker) as pool:
+            pool.encode(texts[:8 * workers])
+            seconds, embeddings = timed_encode(pool.encode, texts, args.batch_size, args.repeat)
+            diff = float(np.max(np.abs(embeddings - reference)))
+            failed = failed or diff > EMBEDDING_TOLERANCE
+            cases.append({
+                'workers': workers,
+                'threads_per_worker': pool.threads_per_worker,
+                'seconds': seconds,
+                'texts_per_second': len(texts) / seconds,
+                'speedup': single_seconds / seconds,
+                'max_abs_diff': diff,
+            })
+
+    report = {
+        'texts': len(texts),
+        'batch_size': args.batch_size,
+        'cpu_count': os.cpu_count(),
+        'model': model,
+        'cases': cases,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+fuzzy_match benchmark: full Levenshtein distance vs the bounded early-exit path.
+
+For each answer length, builds seeded prediction/reference pairs (near
+paraphrases, unrelated texts and length-mismatched texts) and times the
+previous full-distance check against CorrectnessMetrics.fuzzy_match. Exits
+non-zero if any decision differs.
+
+    python benchmarks/bench_fuzzy.py --lengths 50 500 5000 20000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import Levenshtein
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.metrics.correctness import CorrectnessMetrics
+
+WORDS = ['the', 'capital', 'of', 'france', 'is', 'paris', 'water', 'boils', 'at',
+         'sea', 'level', 'light', 'travels', 'about', 'meters', 'per', 'second']
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)[:length]
+
+
+def mutate(rng: random.Random, text: str, rate: float) -> str:
+    chars = list(text)
+    for i in range(len(chars)):
+        if rng.random() < rate:
+            chars[i] = rng.choice('abcdefghij ')
+    return ''.join(chars)
+
+
+def build_pairs(length: int, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    pairs = []
+    for i in range(count):
+        reference = random_text(rng, length)
+        kind = i % 3
+        if kind == 0:
+            prediction = mutate(rng, reference, 0.1)          # near match
+        elif kind == 1:
+            prediction = random_text(rng, length)             # unrelated
+        else:
+            prediction = random_text(rng, max(1, length // 3))  # length mismatch
+        pairs.append((prediction, reference))
+    return pairs
+
+
+def full_fuzzy_match(prediction, reference, threshold: float) -> float:
+    """The pre-bounded implementation: full distance, then compare."""
+    pred_norm = prediction.normalized
+    ref_norm = reference.normalized
+    if len(ref_norm) == 0:
+        return 1.0 if len(pred_norm) == 0 else 0.0
+    distance = Levenshtein.distance(pred_norm, ref_norm)
+    similarity = 1 - (distance / max(len(pred_norm), len(ref_norm)))
+    return 1.0 if similarity >= threshold else 0.0
+
+
+def time_it(fn, pairs, threshold):
+    start = time.perf_counter()
+    decisions = [fn(p, r, threshold) for p, r in pairs]
+    return time.perf_counter() - start, decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[50, 200, 1000, 5000, 20000])
+    parser.add_argument('--pairs', type=int, default=300)
+    parser.add_argument('--threshold', type=float, default=0.7)
+    args = parser.parse_args()
+
+    runs = []
+    for length in args.lengths:
+        # Preprocess up front so only the distance decision is timed
+        pairs = [(CorrectnessMetrics.preprocess(p), CorrectnessMetrics.preprocess(r))
+                 for p, r in build_pairs(length, args.pairs)]
+        full_seconds, full = time_it(full_fuzzy_match, pairs, args.threshold)
+        bounded_seconds, bounded = time_it(CorrectnessMetrics.fuzzy_match, pairs, args.threshold)
+        runs.append({
+            'length': length,
+            'pairs': len(pairs),
+            'full_seconds': full_seconds,
+            'bounded_seconds': bounded_seconds,
+            'speedup': full_seconds / bounded_seconds if bounded_seconds else None,
+            'identical': full == bounded
+        })
+
+    print(json.dumps({'threshold': args.threshold, 'runs': runs}, indent=2))
+    if not all(run['identical'] for run in runs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
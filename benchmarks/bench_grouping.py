@@ -0,0 +1,117 @@
+"""
+Grouped aggregates with vectorized bootstrap CIs against a per-replicate loop.
+
+Builds a synthetic score table (several metrics, a category-like group
+column), then times group_aggregates (index-matrix bootstrap, all groups and
+metrics per block of replicates) against the loop it replaces: per group,
+one index draw and one mean (all metrics) per replicate. The loop runs --loop-replicates
+replicates and its time is scaled to --replicates. Both intervals estimate
+the same quantity, so their endpoints should agree up to Monte Carlo noise.
+
+    python benchmarks/bench_grouping.py --rows 1000000 --replicates 1000
+    python benchmarks/bench_grouping.py --rows 100000 --groups 50
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.grouping import factorize, group_aggregates
+
+# Largest CI endpoint difference (in units of the group's standard error) put down to resampling noise
+NOISE_TOLERANCE = 0.5
+
+
+def build_table(rows: int, groups: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, groups, rows)
+    skill = rng.random(groups)[group]
+    columns = {
+        'exact_match': (rng.random(rows) < skill).astype(np.float64),
+        'fuzzy_match': (rng.random(rows) < skill + 0.1).astype(np.float64),
+        'keyword_match': np.round(rng.random(rows) * skill * 4) / 4,
+        'semantic_similarity': np.clip(rng.normal(skill, 0.2, rows), -1, 1),
+    }
+    columns['overall_score'] = (columns['exact_match'] + columns['fuzzy_match']
+                                + columns['keyword_match'] + columns['semantic_similarity']) / 4
+    return columns, [f'group_{g:03d}' for g in group]
+
+
+def loop_bootstrap(columns, values, replicates: int, confidence: float, seed: int = 0):
+    metrics = list(columns)
+    matrix = np.column_stack([np.asarray(columns[m], dtype=np.float64) for m in metrics])
+    labels, codes = factorize(values)
+    rng = np.random.default_rng(seed)
+    alpha = 1 - confidence
+    intervals = {}
+    for g, label in enumerate(labels):
+        group_scores = matrix[codes == g]
+        n = len(group_scores)
+        # One draw per replicate, shared by all metrics
+        means = np.array([group_scores[rng.integers(0, n, n)].mean(axis=0) for _ in range(replicates)])
+        low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2], axis=0)
+        for j, metric in enumerate(metrics):
+            intervals[(str(label), metric)] = (low[j], high[j])
+    return intervals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--groups', type=int, default=8)
+    parser.add_argument('--replicates', type=int, default=1000)
+    parser.add_argument('--loop-replicates', type=int, default=50,
+                        help="Replicates actually run by the loop baseline")
+    parser.add_argument('--confidence', type=float, default=0.95)
+    args = parser.parse_args()
+
+    columns, values = build_table(args.rows, args.groups)
+
+    start = time.perf_counter()
+    groups = group_aggregates(columns, values, n_boot=args.replicates, confidence=args.confidence)
+    vectorized_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = loop_bootstrap(columns, values, args.loop_replicates, args.confidence)
+    loop_seconds = (time.perf_counter() - start) * args.replicates / args.loop_replicates
+
+    # The short loop run has noisy tails; compare against a full-length loop on the first group only
+    first = next(iter(groups))
+    rows = [i for i, value in enumerate(values) if value == first]
+    reference = loop_bootstrap({m: np.asarray(c)[rows] for m, c in columns.items()}, [first] * len(rows),
+                               args.replicates, args.confidence, seed=1)
+    worst = 0.0
+    for metric in columns:
+        prefix = 'overall' if metric == 'overall_score' else metric
+        entry = groups[first]
+        standard_error = entry[f'{prefix}_std'] / np.sqrt(entry['count'])
+        if standard_error:
+            low, high = reference[(first, metric)]
+            worst = max(worst, abs(entry[f'{prefix}_ci_low'] - low) / standard_error,
+                        abs(entry[f'{prefix}_ci_high'] - high) / standard_error)
+
+    report = {
+        'rows': args.rows,
+        'groups': len(groups),
+        'metrics': len(columns),
+        'replicates': args.replicates,
+        'vectorized_seconds': vectorized_seconds,
+        'loop_seconds_estimated': loop_seconds,
+        'loop_replicates_run': args.loop_replicates,
+        'speedup': loop_seconds / vectorized_seconds,
+        'max_ci_endpoint_diff_in_standard_errors': worst,
+        'loop_checked_rows': len(rows),
+        'example': {first: {k: v for k, v in groups[first].items() if k.startswith('overall') or k == 'count'}},
+    }
+    print(json.dumps(report, indent=2))
+    if worst > NOISE_TOLERANCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
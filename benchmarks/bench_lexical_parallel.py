@@ -0,0 +1,82 @@
+"""
+Scaling benchmark for the lexical metric process pool.
+
+Builds a large synthetic dataset by cycling DatasetLoader.create_qa_dataset,
+then times exact/fuzzy/keyword scoring at several worker counts and checks
+that every parallel run returns exactly the serial columns.
+
+    python benchmarks/bench_lexical_parallel.py --rows 200000 --workers 1 4 16
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.datasets import DatasetLoader
+from src.metrics.correctness import CorrectnessMetrics
+
+LEXICAL_CONFIG = {
+    'exact_match': {'normalize': True},
+    'fuzzy_match': {'threshold': 0.7},
+    'keyword_match': {}
+}
+
+
+def build_dataset(rows: int, seed: int = 0):
+    random.seed(seed)
+    base = DatasetLoader.create_qa_dataset(num_samples=10)
+    dataset = [base[i % len(base)] for i in range(rows)]
+    predictions = DatasetLoader.generate_llm_predictions(dataset, correctness_level=0.7)
+    references = [item['reference_answer'] for item in dataset]
+    return predictions, references
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    predictions, references = build_dataset(args.rows)
+
+    start = time.perf_counter()
+    serial = CorrectnessMetrics.score_columns(predictions, references, LEXICAL_CONFIG)
+    serial_seconds = time.perf_counter() - start
+
+    report = {'rows': args.rows, 'chunk_size': args.chunk_size, 'runs': []}
+    for workers in args.workers:
+        if workers == 1:
+            seconds, columns = serial_seconds, serial
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+                # Warm the pool so process start-up isn't billed to scoring
+                list(executor.map(abs, range(workers)))
+                start = time.perf_counter()
+                columns = CorrectnessMetrics.parallel_score_columns(
+                    predictions, references, LEXICAL_CONFIG, executor,
+                    chunk_size=args.chunk_size
+                )
+                seconds = time.perf_counter() - start
+
+        report['runs'].append({
+            'workers': workers,
+            'seconds': seconds,
+            'rows_per_second': args.rows / seconds,
+            'speedup': serial_seconds / seconds,
+            'identical_to_serial': columns == serial
+        })
+
+    print(json.dumps(report, indent=2))
+    if not all(run['identical_to_serial'] for run in report['runs']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
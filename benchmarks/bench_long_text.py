@@ -0,0 +1,143 @@
+"""
+Length-bucketed encoding and sliding windows on a mixed-length dataset.
+
+Mixes ordinary answers with a fraction of long-form ones (several answers
+joined, well past the model's max_seq_length) and encodes them the old way
+(each call one forward batch, in arrival order, long texts truncated) and
+through RelevanceMetrics with long_text='truncate' and 'window'.
+
+Throughput: texts/second per case and speedup over arrival order.
+Fidelity: cosine between each case's embedding and the embedding of the
+whole text, computed by the same model with max_seq_length raised to its
+position-embedding limit. Truncation keeps only the first window, so long
+texts drift from their full-text embedding; windowing should stay closer.
+Bucketed truncation must match arrival order up to padding noise.
+
+    python benchmarks/bench_long_text.py --texts 4000 --long-fraction 0.1
+    python benchmarks/bench_long_text.py --model /path/to/local/sentence-transformer
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.datasets import DatasetLoader
+from src.metrics.relevance import RelevanceMetrics
+
+# Bucketed truncation vs arrival order: only padding noise may differ
+ORDER_TOLERANCE = 1e-4
+
+
+def build_texts(count: int, long_fraction: float, long_parts: int, seed: int = 0):
+    items = DatasetLoader.create_synthetic_dataset(count, seed=seed)
+    texts = [item['prediction'] for item in items]
+    rng = random.Random(seed)
+    for i in rng.sample(range(count), int(count * long_fraction)):
+        texts[i] = ' '.join(rng.choice(texts) for _ in range(long_parts))
+    return texts
+
+
+def timed(encode, texts, call_size: int, repeat: int):
+    best, embeddings = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = [encode(texts[i:i + call_size]) for i in range(0, len(texts), call_size)]
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+        embeddings = np.concatenate(chunks)
+    return best, embeddings
+
+
+def row_cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return RelevanceMetrics.paired_cosine(a.astype(np.float64), b.astype(np.float64))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--texts', type=int, default=4000)
+    parser.add_argument('--long-fraction', type=float, default=0.1)
+    parser.add_argument('--long-parts', type=int, default=6, help="Answers joined into one long text")
+    parser.add_argument('--call-size', type=int, default=128,
+                        help="Texts per encode call (64 pairs per mini-batch by default)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--model', default=None,
+                        help="Sentence-transformer name or local path (default: tiny offline model)")
+    parser.add_argument('--output', default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    if args.model:
+        model_name = args.model
+    else:
+        from tiny_model import build_tiny_model
+        model_name = build_tiny_model(os.path.join(tempfile.gettempdir(), 'llm-eval-tiny-model-long'),
+                                      max_position_embeddings=1024)
+    texts = build_texts(args.texts, args.long_fraction, args.long_parts)
+
+    from sentence_transformers import SentenceTransformer
+
+    arrival_model = SentenceTransformer(model_name)
+    window_tokens = arrival_model.max_seq_length
+
+    def arrival(chunk):
+        return arrival_model.encode(chunk, batch_size=len(chunk), convert_to_numpy=True, show_progress_bar=False)
+
+    # Ground truth: the whole text in one pass
+    full_model = SentenceTransformer(model_name)
+    full_model.max_seq_length = full_model[0].auto_model.config.max_position_embeddings
+    full = full_model.encode(texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False)
+    special = full_model.tokenizer.num_special_tokens_to_add()
+    token_counts = np.array([len(ids) for ids in full_model.tokenizer(
+        texts, add_special_tokens=False, verbose=False)['input_ids']])
+    long_rows = token_counts > window_tokens - special
+
+    encoders = {'arrival_order': arrival}
+    for mode in ('truncate', 'window'):
+        encoders[f'bucketed_{mode}'] = RelevanceMetrics(model_name=model_name, long_text=mode).encode
+
+    cases, embeddings = {}, {}
+    for name, encode in encoders.items():
+        encode(texts[:8])
+        seconds, embeddings[name] = timed(encode, texts, args.call_size, args.repeat)
+        cosine = row_cosine(embeddings[name], full)
+        cases[name] = {
+            'seconds': seconds,
+            'texts_per_second': len(texts) / seconds,
+            'cosine_to_full_text': {
+                'long_mean': float(cosine[long_rows].mean()) if long_rows.any() else None,
+                'long_min': float(cosine[long_rows].min()) if long_rows.any() else None,
+                'short_mean': float(cosine[~long_rows].mean()) if (~long_rows).any() else None,
+            },
+        }
+    for case in cases.values():
+        case['speedup'] = cases['arrival_order']['seconds'] / case['seconds']
+
+    order_diff = float(np.max(np.abs(embeddings['bucketed_truncate'] - embeddings['arrival_order'])))
+    report = {
+        'texts': len(texts),
+        'long_texts': int(long_rows.sum()),
+        'max_seq_length': window_tokens,
+        'token_length': {'mean': float(token_counts.mean()), 'p50': float(np.median(token_counts)),
+                         'max': int(token_counts.max())},
+        'texts_beyond_position_limit': int((token_counts > full_model.max_seq_length - special).sum()),
+        'call_size': args.call_size,
+        'model': model_name,
+        'cases': cases,
+        'bucketed_vs_arrival_max_abs_diff': order_diff,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    if order_diff > ORDER_TOLERANCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Multi-reference scoring against a Python loop over references.
+
+Gives every sample between 1 and --max-refs references (its own answer plus
+random others, a few of them equal to the prediction so the exact-match
+early exit triggers), then times evaluate_batch on the ragged references
+against the loop it replaces: evaluate_single per (prediction, reference)
+and a max per metric. Checks both give the same scores.
+
+    python benchmarks/bench_multi_reference.py --samples 1000 --max-refs 5
+    python benchmarks/bench_multi_reference.py --model /path/to/local/sentence-transformer
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.datasets import DatasetLoader
+from src.evaluator import LLMEvaluator
+
+# Semantic scores of a text depend slightly on what it is padded with in a batch
+SCORE_TOLERANCE = 1e-5
+
+
+def build_dataset(samples: int, max_refs: int, seed: int = 0):
+    items = DatasetLoader.create_synthetic_dataset(samples, seed=seed)
+    rng = random.Random(seed)
+    predictions = [item['prediction'] for item in items]
+    pool = [item['reference_answer'] for item in items]
+    references = []
+    for i, item in enumerate(items):
+        refs = [item['reference_answer']] + [rng.choice(pool) for _ in range(rng.randint(0, max_refs - 1))]
+        if rng.random() < 0.1:
+            refs.insert(rng.randint(0, len(refs)), predictions[i])
+        references.append(refs)
+    return predictions, references
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--max-refs', type=int, default=5)
+    parser.add_argument('--model', default=None,
+                        help="Sentence-transformer name or local path (default: tiny offline model)")
+    parser.add_argument('--no-semantic', action='store_true')
+    args = parser.parse_args()
+
+    predictions, references = build_dataset(args.samples, args.max_refs)
+    metrics_config = {
+        'exact_match': {'normalize': True},
+        'fuzzy_match': {'threshold': 0.7},
+        'fuzzy_similarity': {},
+        'keyword_match': {},
+    }
+    if not args.no_semantic:
+        if args.model:
+            model_name = args.model
+        else:
+            from tiny_model import build_tiny_model
+            model_name = build_tiny_model(os.path.join(tempfile.gettempdir(), 'llm-eval-tiny-model'))
+        metrics_config['semantic_similarity'] = {'model_name': model_name}
+
+    evaluator = LLMEvaluator(metrics_config)
+    # Load the model outside the timed region
+    evaluator.evaluate_single(predictions[0], references[0][0])
+
+    start = time.perf_counter()
+    batch = evaluator.evaluate_batch(predictions, references)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = []
+    for prediction, refs in zip(predictions, references):
+        per_reference = [evaluator.evaluate_single(prediction, ref)['scores'] for ref in refs]
+        looped.append({metric: max(scores[metric] for scores in per_reference) for metric in metrics_config})
+    loop_seconds = time.perf_counter() - start
+
+    max_diff = {
+        metric: float(np.max(np.abs(np.array([s['scores'][metric] for s in batch['per_sample']])
+                                    - np.array([s[metric] for s in looped]))))
+        for metric in metrics_config
+    }
+    report = {
+        'samples': args.samples,
+        'references': sum(len(refs) for refs in references),
+        'batch_seconds': batch_seconds,
+        'loop_seconds': loop_seconds,
+        'speedup': loop_seconds / batch_seconds if batch_seconds else None,
+        'stages': {name: stats['seconds'] for name, stats in batch['metadata']['profile']['stages'].items()},
+        'max_abs_diff': max_diff,
+    }
+    print(json.dumps(report, indent=2))
+    if any(diff > SCORE_TOLERANCE for diff in max_diff.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Sampled evaluation with CI early stopping against a full run.
+
+Scores a large synthetic dataset in full with evaluate_batch, then runs
+evaluate_sampled (stratified by category and difficulty) with several
+seeds. Reports the rows each sampled run used, its time against the full
+run, the error of its overall_mean estimate, and how often the full-run
+mean fell inside the reported interval (should be about the confidence
+level, or higher).
+
+    python benchmarks/bench_sampled.py --samples 200000 --runs 20
+    python benchmarks/bench_sampled.py --model /path/to/local/sentence-transformer --samples 20000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.datasets import DatasetLoader
+from src.evaluator import LLMEvaluator
+
+# Fewer runs than this covering the full-run mean means the intervals are too narrow
+MIN_COVERAGE = 0.8
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--runs', type=int, default=20, help="Sampled runs, one seed each")
+    parser.add_argument('--target', type=float, default=0.01, help="CI half-width to stop at")
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--model', default=None,
+                        help="Also score semantic similarity with this sentence-transformer")
+    args = parser.parse_args()
+
+    items = DatasetLoader.create_synthetic_dataset(args.samples, seed=1)
+    metrics_config = {
+        'exact_match': {'normalize': True},
+        'fuzzy_match': {'threshold': 0.7},
+        'keyword_match': {},
+    }
+    if args.model:
+        metrics_config['semantic_similarity'] = {'model_name': args.model}
+    evaluator = LLMEvaluator(metrics_config)
+
+    start = time.perf_counter()
+    full = evaluator.evaluate_batch([item['prediction'] for item in items],
+                                    [item['reference_answer'] for item in items])
+    full_seconds = time.perf_counter() - start
+
+    runs = []
+    for seed in range(args.runs):
+        start = time.perf_counter()
+        sampled = evaluator.evaluate_sampled(
+            items, target_half_width=args.target, confidence=args.confidence,
+            chunk_size=args.chunk_size, seed=seed, compare_to=full, reference_key='reference_answer'
+        )
+        runs.append({
+            'seconds': time.perf_counter() - start,
+            'samples_used': sampled['metadata']['sampling']['samples_used'],
+            'half_width': sampled['estimate']['overall']['half_width'],
+            'error': sampled['comparison']['overall']['error'],
+            'within_ci': sampled['comparison']['overall']['within_ci'],
+        })
+
+    seconds = np.array([run['seconds'] for run in runs])
+    errors = np.abs([run['error'] for run in runs])
+    report = {
+        'population': args.samples,
+        'full_seconds': full_seconds,
+        'full_overall_mean': full['aggregate']['overall_mean'],
+        'target_half_width': args.target,
+        'confidence': args.confidence,
+        'runs': args.runs,
+        'mean_samples_used': float(np.mean([run['samples_used'] for run in runs])),
+        'mean_sampled_seconds': float(seconds.mean()),
+        'speedup': full_seconds / float(seconds.mean()),
+        'mean_abs_error': float(errors.mean()),
+        'max_abs_error': float(errors.max()),
+        'coverage': float(np.mean([run['within_ci'] for run in runs])),
+    }
+    print(json.dumps(report, indent=2))
+    if report['coverage'] < MIN_COVERAGE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Startup benchmark: import + lexical-only evaluation must not pull in torch.
+
+Each measurement runs in a fresh interpreter so module caches don't leak
+between runs. Exits non-zero if a lexical-only run imports a heavy backend.
+
+    python benchmarks/bench_startup.py
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['torch', 'transformers', 'sentence_transformers',
+                 'matplotlib', 'seaborn', 'pandas']
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+from src.evaluator import LLMEvaluator
+from reports.report_generator import ReportGenerator
+import_time = time.perf_counter() - start
+
+evaluator = LLMEvaluator({'exact_match': {'normalize': True}, 'fuzzy_match': {'threshold': 0.7}})
+evaluator.evaluate_batch(["The capital of France is Paris."] * 100,
+                         ["Paris is the capital of France."] * 100)
+total_time = time.perf_counter() - start
+
+print(json.dumps({
+    'import_seconds': import_time,
+    'lexical_eval_seconds': total_time,
+    'loaded': [m for m in %r if m in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_probe(repeats: int = 3) -> dict:
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        'import_seconds': min(r['import_seconds'] for r in runs),
+        'lexical_eval_seconds': min(r['lexical_eval_seconds'] for r in runs),
+        'heavy_modules_loaded': sorted(set(m for r in runs for m in r['loaded']))
+    }
+
+
+def main():
+    result = run_probe()
+    print(json.dumps(result, indent=2))
+
+    if result['heavy_modules_loaded']:
+        print(f"FAIL: lexical-only evaluation imported {result['heavy_modules_loaded']}")
+        sys.exit(1)
+    print("OK: lexical-only evaluation never imported torch")
+
+
+if __name__ == "__main__":
+    main()
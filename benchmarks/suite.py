@@ -0,0 +1,301 @@
+"""
+Reproducible benchmark suite for the metrics and the evaluator end to end.
+
+Generates seeded synthetic datasets (DatasetLoader.create_synthetic_dataset)
+at each requested size and times every CorrectnessMetrics/RelevanceMetrics
+method, evaluate_batch, save_results (JSON and columnar) and
+ReportGenerator. Results are written as JSON; given a baseline file, every
+case is compared against it and the run exits non-zero on a regression.
+
+Semantic cases run offline against a tiny locally built model (see
+benchmarks/tiny_model.py) unless --model names a real one. Per-pair and
+semantic cases are capped with --semantic-rows / --loop-rows / --report-rows
+so the 1M-row configuration finishes in reasonable time; every case records
+the row count it actually ran.
+
+    python benchmarks/suite.py --sizes 1000 100000 --output bench.json
+    python benchmarks/suite.py --sizes 1000 100000 --baseline bench.json --tolerance 0.25
+    python benchmarks/suite.py --sizes 1000000 --no-semantic
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.datasets import DatasetLoader
+from src.evaluator import LLMEvaluator
+from src.metrics.correctness import CorrectnessMetrics
+from src.metrics.relevance import RelevanceMetrics
+
+LEXICAL_CONFIG = {
+    'exact_match': {'normalize': True},
+    'fuzzy_match': {'threshold': 0.7},
+    'keyword_match': {}
+}
+
+
+class Suite:
+    """Runs timed cases and collects them as JSON-ready dicts."""
+
+    def __init__(self, repeat: int = 1):
+        self.repeat = repeat
+        self.cases = []
+
+    def time(self, name: str, rows: int, fn, repeat: int = None):
+        """Best-of-repeat wall time of fn()."""
+        best = float('inf')
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        self.cases.append({
+            'name': name,
+            'rows': rows,
+            'seconds': best,
+            'rows_per_second': rows / best if best > 0 else None
+        })
+        print(f"  {name:45s} {rows:>9,d} rows  {best:9.4f}s", flush=True)
+
+
+def bench_correctness(suite: Suite, predictions, references, loop_rows: int):
+    n = len(predictions)
+    m = min(n, loop_rows)
+    preds_raw, refs_raw = predictions[:m], references[:m]
+
+    suite.time('correctness.normalize_text', m,
+               lambda: [CorrectnessMetrics.normalize_text(p) for p in preds_raw])
+    suite.time('correctness.preprocess', n,
+               lambda: [CorrectnessMetrics.preprocess(p) for p in predictions])
+
+    preds = [CorrectnessMetrics.preprocess(p) for p in predictions]
+    refs = [CorrectnessMetrics.preprocess(r, cache=True) for r in references]
+    pairs = list(zip(preds[:m], refs[:m]))
+
+    # Per-pair methods on raw strings, i.e. including their own preprocessing
+    suite.time('correctness.exact_match', m,
+               lambda: [CorrectnessMetrics.exact_match(p, r) for p, r in zip(preds_raw, refs_raw)])
+    suite.time('correctness.fuzzy_match', m,
+               lambda: [CorrectnessMetrics.fuzzy_match(p, r, 0.7) for p, r in zip(preds_raw, refs_raw)])
+    suite.time('correctness.fuzzy_similarity', m,
+               lambda: [CorrectnessMetrics.fuzzy_similarity(p, r) for p, r in zip(preds_raw, refs_raw)])
+    suite.time('correctness.keyword_match', m,
+               lambda: [CorrectnessMetrics.keyword_match(p, r) for p, r in zip(preds_raw, refs_raw)])
+
+    # Same methods on preprocessed text, the way the batch paths call them
+    suite.time('correctness.fuzzy_match[preprocessed]', m,
+               lambda: [CorrectnessMetrics.fuzzy_match(p, r, 0.7) for p, r in pairs])
+    suite.time('correctness.keyword_match[preprocessed]', m,
+               lambda: [CorrectnessMetrics.keyword_match(p, r) for p, r in pairs])
+
+    suite.time('correctness.batch_exact_match', n,
+               lambda: CorrectnessMetrics.batch_exact_match(preds, refs))
+    suite.time('correctness.batch_fuzzy_match', n,
+               lambda: CorrectnessMetrics.batch_fuzzy_match(preds, refs, 0.7))
+    suite.time('correctness.batch_fuzzy_similarity', n,
+               lambda: CorrectnessMetrics.batch_fuzzy_similarity(preds, refs))
+    suite.time('correctness.batch_keyword_match', n,
+               lambda: CorrectnessMetrics.batch_keyword_match(preds, refs))
+    suite.time('correctness.score_columns', n,
+               lambda: CorrectnessMetrics.score_columns(predictions, references, LEXICAL_CONFIG))
+
+
+def bench_relevance(suite: Suite, predictions, references, model_name: str, semantic_rows: int):
+    m = min(len(predictions), semantic_rows)
+    preds, refs = predictions[:m], references[:m]
+
+    relevance = RelevanceMetrics(model_name)
+    suite.time('relevance.model_load', 0, lambda: relevance.model, repeat=1)
+
+    texts = preds + refs
+    suite.time('relevance.encode', len(texts), lambda: relevance.encode(texts))
+
+    embeddings = relevance.encode(texts)
+    a, b = embeddings[:m], embeddings[m:]
+    suite.time('relevance.paired_cosine', m, lambda: RelevanceMetrics.paired_cosine(a, b))
+
+    single = min(m, 200)
+    suite.time('relevance.semantic_similarity', single,
+               lambda: [relevance.semantic_similarity(p, r) for p, r in zip(preds[:single], refs[:single])])
+    suite.time('relevance.batch_semantic_similarity', m,
+               lambda: relevance.batch_semantic_similarity(preds, refs))
+
+
+def bench_evaluator(suite: Suite, dataset, predictions, references, model_name, semantic_rows: int,
+                    report_rows: int, workdir: Path):
+    n = len(predictions)
+    sample_ids = [item['sample_id'] for item in dataset]
+
+    lexical = LLMEvaluator(dict(LEXICAL_CONFIG))
+    holder = {}
+    suite.time('evaluator.evaluate_batch[lexical]', n,
+               lambda: holder.update(results=lexical.evaluate_batch(predictions, references, sample_ids)))
+    results = holder['results']
+
+    if model_name:
+        m = min(n, semantic_rows)
+        config = dict(LEXICAL_CONFIG, semantic_similarity={'model_name': model_name})
+        semantic = LLMEvaluator(config)
+        semantic.relevance.model  # load outside the timed region
+        suite.time('evaluator.evaluate_batch[semantic]', m,
+                   lambda: semantic.evaluate_batch(predictions[:m], references[:m], sample_ids[:m]))
+
+    for suffix in ('json', 'evalcols'):
+        path = workdir / f'results.{suffix}'
+
+        def save(path=path):
+            if path.is_dir():
+                shutil.rmtree(path)
+            lexical.save_results(results, str(path))
+
+        suite.time(f'evaluator.save_results[{suffix}]', n, save)
+        suite.time(f'evaluator.load_results[{suffix}]', n, lambda path=path: LLMEvaluator.load_results(str(path)))
+
+    from reports.report_generator import ReportGenerator, _plotting
+    import pandas  # noqa: F401
+
+    # Keep one-off pandas/matplotlib import cost out of the report cases
+    _plotting()
+
+    r = min(n, report_rows)
+    subset = dict(results, per_sample=results['per_sample'][:r])
+    suite.time('report.dataframe', r, lambda: ReportGenerator(subset))
+    suite.time('report.generate_markdown_report', r,
+               lambda: ReportGenerator(subset).generate_markdown_report(str(workdir / 'report' / 'report.md')),
+               repeat=1)
+
+
+def compare(cases, baseline, tolerance: float, min_seconds: float):
+    """Regressions: cases slower than baseline by more than tolerance (and min_seconds)."""
+    previous = {(case['name'], case['rows']): case for case in baseline['cases']}
+    comparison = []
+    for case in cases:
+        before = previous.get((case['name'], case['rows']))
+        if before is None:
+            continue
+        ratio = case['seconds'] / before['seconds'] if before['seconds'] > 0 else None
+        regressed = (ratio is not None and ratio > 1 + tolerance
+                     and case['seconds'] - before['seconds'] > min_seconds)
+        comparison.append({
+            'name': case['name'],
+            'rows': case['rows'],
+            'baseline_seconds': before['seconds'],
+            'seconds': case['seconds'],
+            'ratio': ratio,
+            'regressed': regressed
+        })
+    return comparison
+
+
+def environment():
+    import Levenshtein
+
+    env = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'levenshtein': getattr(Levenshtein, '__version__', None),
+    }
+    try:
+        import torch
+        env['torch'] = torch.__version__
+        env['torch_threads'] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-sentences', type=int, default=12, help="Longest synthetic answer")
+    parser.add_argument('--repeat', type=int, default=3, help="Best-of-N timing")
+    parser.add_argument('--model', default=None,
+                        help="Sentence-transformer for semantic cases (default: tiny local model)")
+    parser.add_argument('--model-dir', default=os.path.join(tempfile.gettempdir(), 'llm-eval-tiny-model'),
+                        help="Where the tiny local model is built")
+    parser.add_argument('--no-semantic', action='store_true')
+    parser.add_argument('--semantic-rows', type=int, default=20_000)
+    parser.add_argument('--loop-rows', type=int, default=100_000, help="Cap for per-pair method loops")
+    parser.add_argument('--report-rows', type=int, default=5000, help="Cap for ReportGenerator (plots)")
+    parser.add_argument('--output', default=None, help="Write results JSON here")
+    parser.add_argument('--baseline', default=None, help="Compare against this results JSON")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed fractional slowdown")
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help="Ignore slowdowns smaller than this (timer noise)")
+    args = parser.parse_args()
+
+    model_name = None
+    if not args.no_semantic:
+        if args.model:
+            model_name = args.model
+        else:
+            from tiny_model import build_tiny_model
+            model_name = build_tiny_model(args.model_dir)
+
+    report = {
+        'environment': environment(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')},
+        'cases': []
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"\n== {size:,d} rows (seed {args.seed}) ==")
+            suite = Suite(repeat=args.repeat)
+            holder = {}
+            suite.time('dataset.create_synthetic_dataset', size, lambda: holder.update(
+                dataset=DatasetLoader.create_synthetic_dataset(size, seed=args.seed,
+                                                               max_sentences=args.max_sentences)
+            ), repeat=1)
+            dataset = holder['dataset']
+            predictions = [item['prediction'] for item in dataset]
+            references = [item['reference_answer'] for item in dataset]
+
+            bench_correctness(suite, predictions, references, args.loop_rows)
+            if model_name:
+                bench_relevance(suite, predictions, references, model_name, args.semantic_rows)
+            bench_evaluator(suite, dataset, predictions, references, model_name,
+                            args.semantic_rows, args.report_rows, Path(tmp))
+            report['cases'].extend(suite.cases)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['comparison'] = compare(report['cases'], baseline, args.tolerance, args.min_seconds)
+        regressions = [c for c in report['comparison'] if c['regressed']]
+
+        print(f"\nCompared {len(report['comparison'])} cases against {args.baseline}")
+        for c in report['comparison']:
+            flag = 'REGRESSION' if c['regressed'] else ''
+            print(f"  {c['name']:45s} {c['rows']:>9,d}  {c['baseline_seconds']:9.4f}s -> "
+                  f"{c['seconds']:9.4f}s  x{c['ratio']:.2f} {flag}")
+        if regressions:
+            print(f"FAIL: {len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+            exit_code = 1
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
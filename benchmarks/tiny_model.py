@@ -0,0 +1,64 @@
+"""
+Build a tiny, randomly initialised sentence-transformer for offline benchmarks.
+
+The model is a 2-layer BERT (hidden size 32) with a character vocabulary,
+wrapped with mean pooling. Its embeddings are meaningless but its code path
+(tokenize, forward, pool) is the real one, so it times the pipeline around
+the model without downloading anything.
+
+    python benchmarks/tiny_model.py [output_dir]
+"""
+import os
+import string
+import sys
+import tempfile
+from pathlib import Path
+
+HIDDEN_SIZE = 32
+MAX_SEQ_LENGTH = 128
+
+
+def build_tiny_model(path: str, seed: int = 0, max_position_embeddings: int = MAX_SEQ_LENGTH) -> str:
+    """
+    Create the model under path (if missing) and return its directory.
+
+    max_position_embeddings above MAX_SEQ_LENGTH lets the model encode
+    longer texts once its max_seq_length is raised.
+    """
+    path = Path(path)
+    model_dir = path / 'sentence-transformer'
+    if (model_dir / 'modules.json').exists():
+        return str(model_dir)
+
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    torch.manual_seed(seed)
+    hf_dir = path / 'hf'
+    hf_dir.mkdir(parents=True, exist_ok=True)
+
+    characters = string.ascii_lowercase + string.digits
+    vocab = (['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]']
+             + list(characters + string.punctuation)
+             + ['##' + c for c in characters])
+    (hf_dir / 'vocab.txt').write_text('\n'.join(vocab), encoding='utf-8')
+
+    # Positional: 'vocab_file' in transformers 4, 'vocab' (path or dict) in 5
+    tokenizer = BertTokenizerFast(str(hf_dir / 'vocab.txt'))
+    config = BertConfig(vocab_size=len(vocab), hidden_size=HIDDEN_SIZE, num_hidden_layers=2,
+                        num_attention_heads=2, intermediate_size=2 * HIDDEN_SIZE,
+                        max_position_embeddings=max_position_embeddings)
+    BertModel(config).save_pretrained(str(hf_dir))
+    tokenizer.save_pretrained(str(hf_dir))
+
+    transformer = models.Transformer(str(hf_dir), max_seq_length=MAX_SEQ_LENGTH)
+    dimension = getattr(transformer, 'get_embedding_dimension', None) or transformer.get_word_embedding_dimension
+    pooling = models.Pooling(dimension())
+    SentenceTransformer(modules=[transformer, pooling]).save(str(model_dir))
+    return str(model_dir)
+
+
+if __name__ == "__main__":
+    default_dir = os.path.join(tempfile.gettempdir(), 'llm-eval-tiny-model')
+    print(build_tiny_model(sys.argv[1] if len(sys.argv) > 1 else default_dir))
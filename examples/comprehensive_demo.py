@@ -30,11 +30,12 @@ def main():
         # 3. Initialize evaluator with configuration
         print("3. Initializing evaluator...")
         config = EvaluationConfig()
-        evaluator = LLMEvaluator(config.get_metrics_config())
+        evaluator = LLMEvaluator(config.get_metrics_config(), weights=config.get_weights())
         
         # 4. Run evaluation
         print("4. Running evaluation...")
-        results = evaluator.evaluate_batch(predictions, references, sample_ids)
+        groups = {'category': categories, 'difficulty': [item['difficulty'] for item in dataset]}
+        results = evaluator.evaluate_batch(predictions, references, sample_ids, groups=groups)
         
         # 5. Print summary
         print("\n" + "=" * 70)
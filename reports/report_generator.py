@@ -1,25 +1,60 @@
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, TYPE_CHECKING
 import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+def _plotting():
+    """Import matplotlib/seaborn on first plot and apply the report style."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    return plt, sns
+
 class ReportGenerator:
     """Generate comprehensive evaluation reports."""
     
-    def __init__(self, results: Dict[str, Any]):
-        self.results = results
-        self.df = self._create_dataframe()
+    def __init__(self, results: Dict[str, Any], df: 'pd.DataFrame' = None):
+        """
+        Args:
+            results: evaluate_batch results (per_sample is only read when df is None).
+            df: Prebuilt per-sample DataFrame, e.g. from a columnar store.
+        """
+        from src.profiling import Profiler
         
-        # Set style
-        plt.style.use('seaborn-v0_8-darkgrid')
-        sns.set_palette("husl")
+        self.results = results
+        self.profiler = Profiler()
+        with self.profiler.stage('report_dataframe'):
+            self.df = df if df is not None else self._create_dataframe()
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'ReportGenerator':
+        """Build a report from saved results (JSON, or columnar read straight into columns)."""
+        from src.storage import ColumnarResults, is_columnar
+        
+        if not is_columnar(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        
+        import pandas as pd
+        
+        store = ColumnarResults(path)
+        data = {column: store.text(column) for column in store.text_columns}
+        data.update({metric: np.asarray(store.scores(metric)) for metric in store.score_columns})
+        results = {'metadata': store.metadata, 'aggregate': store.aggregate}
+        if store.groups:
+            results['groups'] = store.groups
+        return cls(results, df=pd.DataFrame(data))
     
-    def _create_dataframe(self) -> pd.DataFrame:
+    def _create_dataframe(self) -> 'pd.DataFrame':
         """Convert results to pandas DataFrame."""
+        import pandas as pd
+        
         rows = []
         for sample in self.results['per_sample']:
             row = {
@@ -47,28 +82,41 @@ class ReportGenerator:
         viz_path = output_path.parent / "visualizations"
         viz_path.mkdir(exist_ok=True)
         
+        rows = len(self.df)
+        stage = self.profiler.stage
+        
         # Create visualizations
-        self._create_score_distribution_plot(viz_path / "score_distribution.png")
-        self._create_correlation_heatmap(viz_path / "correlation_heatmap.png")
-        self._create_metric_comparison_plot(viz_path / "metric_comparison.png")
+        with stage('report_score_distribution', rows):
+            self._create_score_distribution_plot(viz_path / "score_distribution.png")
+        with stage('report_correlation_heatmap', rows):
+            self._create_correlation_heatmap(viz_path / "correlation_heatmap.png")
+        with stage('report_metric_comparison', rows):
+            self._create_metric_comparison_plot(viz_path / "metric_comparison.png")
         
         # Generate markdown
-        md_content = self._build_markdown_content(viz_path)
+        with stage('report_markdown', rows):
+            md_content = self._build_markdown_content(viz_path)
         
         # Save report with UTF-8 encoding
-        try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(md_content)
-        except UnicodeEncodeError:
-            # Fallback: ASCII with replacements
-            with open(output_path, 'w', encoding='ascii', errors='replace') as f:
-                f.write(md_content)
+        with stage('report_write'):
+            try:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(md_content)
+            except UnicodeEncodeError:
+                # Fallback: ASCII with replacements
+                with open(output_path, 'w', encoding='ascii', errors='replace') as f:
+                    f.write(md_content)
+        
+        # Report phases sit next to the evaluation's own stages
+        profile = self.results['metadata'].setdefault('profile', {})
+        profile['report'] = self.profiler.summary()['stages']
         
         print(f"Report generated: {output_path}")
         return md_content
     
     def _create_score_distribution_plot(self, save_path: Path):
         """Create histogram of overall scores."""
+        plt, _ = _plotting()
         plt.figure(figsize=(10, 6))
         
         # Plot overall scores
@@ -97,6 +145,7 @@ class ReportGenerator:
         
         correlation_matrix = self.df[score_columns].corr()
         
+        plt, sns = _plotting()
         plt.figure(figsize=(10, 8))
         sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', 
                    center=0, square=True, linewidths=1, fmt='.2f')
@@ -115,6 +164,9 @@ class ReportGenerator:
         if not score_columns:
             return
         
+        import pandas as pd
+        plt, sns = _plotting()
+        
         # Melt dataframe for seaborn
         melted_df = pd.melt(self.df[score_columns], var_name='Metric', value_name='Score')
         
@@ -164,6 +216,16 @@ class ReportGenerator:
         
         lines.append("")
         
+        # Per-group slices (evaluate_batch with groups=...)
+        groups = self.results.get('groups')
+        if groups:
+            from src.grouping import format_groups
+            
+            confidence = self.results['metadata'].get('bootstrap', {}).get('confidence')
+            lines.append("## Scores by Group")
+            lines.append("")
+            lines.extend(format_groups(groups, confidence=confidence))
+        
         # Visualizations
         lines.append("## Visualizations")
         lines.append("")
@@ -201,6 +263,21 @@ class ReportGenerator:
             lines.append(f"- Reference: {row['reference']}")
             lines.append("")
         
+        # Performance profile
+        profile = self.results['metadata'].get('profile')
+        if profile or self.profiler.stages:
+            from src.profiling import format_profile
+            
+            lines.append("## Performance Profile")
+            lines.append("")
+            if profile:
+                lines.append("### Evaluation")
+                lines.extend(format_profile(profile))
+                lines.append("")
+            lines.append("### Report")
+            lines.extend(format_profile({'stages': self.profiler.summary()['stages']}))
+            lines.append("")
+        
         # Recommendations
         lines.append("## Recommendations")
         lines.append("")
@@ -1,7 +1,16 @@
 # run_eval.py in project root
+import argparse
+
 from src.evaluator import LLMEvaluator
 
 def main():
+    parser = argparse.ArgumentParser(description="Run a small evaluation.")
+    parser.add_argument('--server', default=None,
+                        help="Score via a running scoring server (e.g. http://127.0.0.1:8765) "
+                             "instead of loading models in this process")
+    parser.add_argument('--unix-socket', default=None, help="Scoring server Unix socket path")
+    args = parser.parse_args()
+    
     # Sample data
     predictions = [
         "The capital of France is Paris.",
@@ -15,11 +24,20 @@ def main():
         "The moon is composed primarily of silicate minerals."
     ]
     
+    if args.server or args.unix_socket:
+        from src.server import ScoringClient
+        
+        client = ScoringClient(args.server or 'http://127.0.0.1:8765', unix_socket=args.unix_socket)
+        for sample in client.evaluate(predictions, references):
+            print(f"{sample['sample_id']}: {sample['scores']['overall_score']:.3f}")
+        client.close()
+        return
+    
     # Initialize evaluator
     evaluator = LLMEvaluator()
     
     # Run evaluation
-    results = evaluator.evaluator_batch(predictions, references)
+    results = evaluator.evaluate_batch(predictions, references)
     
     print("Aggregate Results:")
     for key, value in results['aggregate'].items():
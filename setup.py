@@ -40,6 +40,11 @@ setup(
             "flake8>=5.0.0",
             "pytest-cov>=4.0.0",
         ],
+        # ONNX Runtime encoder backend (semantic_similarity.backend: onnx)
+        "onnx": [
+            "onnxruntime>=1.16.0",
+            "optimum>=1.17.0",
+        ],
     },
     keywords="llm evaluation ai nlp machine-learning",
     project_urls={
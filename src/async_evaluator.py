@@ -0,0 +1,222 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from .evaluator import LLMEvaluator
+
+def validate_request(prediction: Any, reference: Any, required_keywords: Any = None):
+    """
+    Raise TypeError for a request the scorers cannot handle.
+
+    Requests share micro-batches, so a bad one must be rejected before it
+    is queued rather than fail the batch it lands in.
+    """
+    if not isinstance(prediction, str):
+        raise TypeError(f"prediction must be a string, got {type(prediction).__name__}")
+    if isinstance(reference, list):
+        if not reference or not all(isinstance(ref, str) for ref in reference):
+            raise TypeError("reference must be a string or a non-empty list of strings")
+    elif not isinstance(reference, str):
+        raise TypeError(f"reference must be a string or a list of strings, got {type(reference).__name__}")
+    if required_keywords is not None and (
+            not isinstance(required_keywords, list) or not all(isinstance(k, str) for k in required_keywords)):
+        raise TypeError("required_keywords must be a list of strings")
+
+class AsyncEvaluator:
+    """
+    asyncio front end for LLMEvaluator.
+
+    All scoring runs on an executor so the event loop is never blocked by
+    model encoding or Levenshtein work. Concurrent evaluate_single_async
+    calls are coalesced into micro-batches: a batch is dispatched once it
+    holds max_batch_size requests or its oldest request has waited
+    max_wait_ms, whichever comes first. While one batch is being scored the
+    next one keeps filling, so batches grow with load while per-request
+    latency stays bounded by max_wait_ms plus one batch's scoring time.
+
+    Strict requests are scored column-wise together; 'fast' cascade requests
+    in a batch go through LLMEvaluator.evaluate_single, which owns the
+    cascade logic. Either way pass_threshold adds the 'passed' flag.
+    aclose() scores every request already queued before it returns.
+    """
+
+    def __init__(self, evaluator: Optional[LLMEvaluator] = None, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, executor: Optional[Executor] = None):
+        """
+        Args:
+            evaluator: Evaluator to wrap; a default LLMEvaluator if None.
+            max_batch_size: Upper bound on requests scored together.
+            max_wait_ms: Longest a request waits for others to join its batch.
+            executor: Where scoring runs. Defaults to a single worker thread,
+                which also serializes access to the (non thread-safe) evaluator.
+        """
+        self.evaluator = evaluator or LLMEvaluator()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='llm-eval')
+        self._owns_executor = executor is None
+
+        self._queue = None
+        self._batcher = None
+        self._closed = False
+
+        self.stats = {'requests': 0, 'batches': 0, 'batched_requests': 0}
+
+    async def __aenter__(self) -> 'AsyncEvaluator':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def evaluate_single_async(self, prediction: str, reference: str,
+                                    sample_id: Optional[str] = None,
+                                    required_keywords: Optional[List[str]] = None,
+                                    cascade: Optional[str] = None,
+                                    pass_threshold: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Evaluate one prediction; same result shape as LLMEvaluator.evaluate_single.
+        The request is scored in a micro-batch with other concurrent requests;
+        malformed requests raise TypeError here, before they are queued.
+
+        Args:
+            cascade, pass_threshold: As for evaluate_single; default to the
+                wrapped evaluator's settings.
+        """
+        if self._closed:
+            raise RuntimeError("AsyncEvaluator is closed")
+        validate_request(prediction, reference, required_keywords)
+        cascade = cascade or self.evaluator.cascade
+        if cascade not in ('strict', 'fast'):
+            raise ValueError(f"Unknown cascade mode: {cascade}")
+        if pass_threshold is None:
+            pass_threshold = self.evaluator.pass_threshold
+
+        self._ensure_batcher()
+        future = asyncio.get_running_loop().create_future()
+        self.stats['requests'] += 1
+        request = (prediction, reference, sample_id, required_keywords, cascade, pass_threshold)
+        await self._queue.put((request, future))
+        return await future
+
+    async def evaluate_batch_async(self, predictions: List[str], references: List[str],
+                                   sample_ids: Optional[List[str]] = None,
+                                   required_keywords: Optional[List[Optional[List[str]]]] = None) -> Dict[str, Any]:
+        """LLMEvaluator.evaluate_batch, run on the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            lambda: self.evaluator.evaluate_batch(predictions, references, sample_ids, required_keywords)
+        )
+
+    async def aclose(self):
+        """Score the requests already queued, stop the batcher and release the executor."""
+        self._closed = True
+        if self._batcher is not None:
+            if not self._batcher.done():
+                # The batcher stops at this marker, after everything queued before it
+                await self._queue.put(None)
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        if self._queue is not None:
+            # Only left over if the batcher died; never leave an awaiter hanging
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not None and not item[1].done():
+                    item[1].set_exception(RuntimeError("AsyncEvaluator closed before scoring the request"))
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    def _ensure_batcher(self):
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[tuple]):
+        """Score one batch and resolve its futures; a failure only fails its own request."""
+        loop = asyncio.get_running_loop()
+        # Drop requests whose callers already gave up
+        batch = [(request, future) for request, future in batch if not future.done()]
+        if not batch:
+            return
+
+        self.stats['batches'] += 1
+        self.stats['batched_requests'] += len(batch)
+
+        requests = [request for request, _ in batch]
+        try:
+            samples = await loop.run_in_executor(self._executor, self._score, requests)
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            # Rescore one by one so only the request that fails gets the error
+            for request, future in batch:
+                try:
+                    sample = (await loop.run_in_executor(self._executor, self._score, [request]))[0]
+                except Exception as single_error:
+                    if not future.done():
+                        future.set_exception(single_error)
+                else:
+                    if not future.done():
+                        future.set_result(sample)
+            return
+
+        for (_, future), sample in zip(batch, samples):
+            if not future.done():
+                future.set_result(sample)
+
+    def _score(self, requests: List[tuple]) -> List[Dict[str, Any]]:
+        """Score one micro-batch (runs on the executor)."""
+        evaluator = self.evaluator
+        samples = [None] * len(requests)
+        strict = []
+        for i, (prediction, reference, sample_id, keywords, cascade, pass_threshold) in enumerate(requests):
+            if cascade == 'fast':
+                # Per-sample early exit; nothing to share with the rest of the batch
+                samples[i] = evaluator.evaluate_single(prediction, reference, sample_id, keywords,
+                                                       cascade='fast', pass_threshold=pass_threshold)
+            else:
+                strict.append(i)
+        if not strict:
+            return samples
+
+        predictions, references, sample_ids, required_keywords, _, thresholds = (
+            list(c) for c in zip(*(requests[i] for i in strict))
+        )
+        columns = evaluator._score_all(predictions, references, required_keywords)
+        columns['overall_score'] = evaluator._overall_scores(columns, len(predictions))
+        scored = evaluator._per_sample_results(columns, predictions, references, sample_ids)
+        for i, sample, pass_threshold in zip(strict, scored, thresholds):
+            if pass_threshold is not None:
+                sample['passed'] = sample['scores']['overall_score'] >= pass_threshold
+            samples[i] = sample
+        return samples
@@ -0,0 +1,318 @@
+import json
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+import numpy as np
+
+# Part of every ScoreCache metric fingerprint. Bump it whenever a metric's
+# implementation changes the scores it returns, so stale entries are missed
+# rather than served.
+SCORE_CACHE_VERSION = 1
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model_name, normalized text).
+
+    Vectors live in a memory-mapped float16/float32 store on disk with a JSON
+    hash index next to it. A small LRU dict in front of the store keeps hot
+    vectors in memory. When the store reaches max_entries, the least recently
+    used slot is evicted and reused.
+    """
+
+    INDEX_FILE = 'index.json'
+    VECTORS_FILE = 'vectors.bin'
+
+    def __init__(self, cache_dir: str, model_name: str, dtype: str = 'float32',
+                 max_entries: int = 1_000_000, memory_entries: int = 10_000):
+        """
+        Args:
+            cache_dir: Root directory; each model gets its own subdirectory.
+            dtype: 'float32' (lossless) or 'float16' (half the disk size).
+            max_entries: Size cap of the on-disk store.
+            memory_entries: Size of the in-memory LRU tier.
+        """
+        if dtype not in ('float16', 'float32'):
+            raise ValueError(f"Unsupported cache dtype: {dtype}")
+
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        slug = hashlib.sha1(model_name.encode('utf-8')).hexdigest()[:16]
+        self.path = Path(cache_dir) / f"{Path(model_name).name}-{slug}"
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._memory = OrderedDict()
+        self._slots = {}            # key -> slot
+        self._lru = OrderedDict()   # slot -> key, least recently used first
+        self._dim = None
+        self._capacity = 0
+        self._vectors = None
+        self._dirty = False
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Unicode NFC with collapsed whitespace; embeddings don't depend on either."""
+        return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+    def key(self, text: str) -> str:
+        """Hash key for a text under this cache's model."""
+        payload = f"{self.model_name}\0{self.normalize_text(text)}"
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up texts; returns a vector (float32) or None per text."""
+        found = []
+        for text in texts:
+            k = self.key(text)
+            vector = self._memory.get(k)
+            if vector is not None:
+                self._memory.move_to_end(k)
+                self._lru.move_to_end(self._slots[k])
+                self.hits += 1
+                self.memory_hits += 1
+            elif k in self._slots:
+                slot = self._slots[k]
+                vector = np.array(self._vectors[slot], dtype=np.float32)
+                self._lru.move_to_end(slot)
+                self._remember(k, vector)
+                self.hits += 1
+            else:
+                self.misses += 1
+            found.append(vector)
+        return found
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Store freshly encoded vectors (rows aligned with texts)."""
+        if len(texts) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+        elif vectors.shape[1] != self._dim:
+            raise ValueError(
+                f"Embedding dim {vectors.shape[1]} does not match cache dim {self._dim}"
+            )
+
+        for text, vector in zip(texts, vectors):
+            k = self.key(text)
+            if k in self._slots:
+                slot = self._slots[k]
+            else:
+                slot = self._allocate_slot()
+                self._slots[k] = slot
+            self._vectors[slot] = vector
+            self._lru[slot] = k
+            self._lru.move_to_end(slot)
+            # Keep what a later disk read would return, so both tiers agree
+            self._remember(k, np.array(self._vectors[slot], dtype=np.float32))
+        self._dirty = True
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for results metadata."""
+        lookups = self.hits + self.misses
+        return {
+            'model_name': self.model_name,
+            'hits': self.hits,
+            'memory_hits': self.memory_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._slots)
+        }
+
+    def flush(self):
+        """Persist the vector store and index."""
+        if not self._dirty:
+            return
+        self._vectors.flush()
+        index = {
+            'model_name': self.model_name,
+            'dtype': self.dtype.name,
+            'dim': self._dim,
+            'capacity': self._capacity,
+            # Least recently used first, so the order survives a reload
+            'entries': [[k, slot] for slot, k in self._lru.items()]
+        }
+        tmp_path = self.path / (self.INDEX_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        tmp_path.replace(self.path / self.INDEX_FILE)
+        self._dirty = False
+
+    def _load(self):
+        index_path = self.path / self.INDEX_FILE
+        if not index_path.exists():
+            return
+
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+        if index['dtype'] != self.dtype.name:
+            raise ValueError(
+                f"Cache at {self.path} stores {index['dtype']}, not {self.dtype.name}"
+            )
+
+        self._dim = index['dim']
+        for k, slot in index['entries']:
+            self._slots[k] = slot
+            self._lru[slot] = k
+        self._open_vectors(index['capacity'])
+
+    def _open_vectors(self, capacity: int):
+        vectors_path = self.path / self.VECTORS_FILE
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+
+        # Grow the (sparse) backing file, then map it
+        row_bytes = self._dim * self.dtype.itemsize
+        with open(vectors_path, 'ab') as f:
+            if f.tell() < capacity * row_bytes:
+                f.truncate(capacity * row_bytes)
+
+        self._vectors = np.memmap(vectors_path, dtype=self.dtype, mode='r+',
+                                  shape=(capacity, self._dim))
+        self._capacity = capacity
+
+    def _allocate_slot(self) -> int:
+        used = len(self._slots)
+        if used < self._capacity:
+            return used
+
+        if self._capacity < self.max_entries:
+            self._open_vectors(min(self.max_entries, max(1024, self._capacity * 2)))
+            return used
+
+        # Full: evict the least recently used slot
+        slot, old_key = self._lru.popitem(last=False)
+        del self._slots[old_key]
+        self._memory.pop(old_key, None)
+        self.evictions += 1
+        return slot
+
+    def _remember(self, k: str, vector: np.ndarray):
+        if self.memory_entries <= 0:
+            return
+        self._memory[k] = vector
+        self._memory.move_to_end(k)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+class ScoreCache:
+    """
+    Persistent, content-addressed cache of per-metric scores.
+
+    Each score is stored under (metric fingerprint, pair digest). The metric
+    fingerprint hashes SCORE_CACHE_VERSION, the metric name, its
+    score-affecting config and the model name; the pair digest hashes the prediction, the reference and any
+    per-sample keywords. Scores are written as they are computed and committed
+    at every checkpoint, so an interrupted run loses at most one checkpoint
+    interval and reruns only score what is missing.
+    """
+
+    # Config keys that change performance, never scores
+    IGNORED_CONFIG_KEYS = frozenset({
+        'enabled', 'batch_size', 'cache_dir', 'cache_dtype', 'cache_max_entries', 'cache_memory_entries',
+        'encode_workers', 'threads_per_worker', 'encode_batch_size'
+    })
+
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        import sqlite3
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Accessed from one thread at a time (e.g. AsyncEvaluator's executor)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS scores ('
+            ' metric BLOB NOT NULL, pair BLOB NOT NULL, value REAL NOT NULL,'
+            ' PRIMARY KEY (metric, pair)) WITHOUT ROWID'
+        )
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.checkpoints = 0
+
+    def metric_fingerprint(self, metric: str, config: Dict[str, Any],
+                           model_name: Optional[str] = None) -> bytes:
+        """Digest of everything about a metric that can change its scores."""
+        relevant = {k: v for k, v in config.items() if k not in self.IGNORED_CONFIG_KEYS}
+        payload = json.dumps([SCORE_CACHE_VERSION, metric, relevant, model_name], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+    @staticmethod
+    def pair_digests(predictions: List[str], references: List[str],
+                     required_keywords: Optional[List[Optional[List[str]]]] = None) -> List[bytes]:
+        """Digest per (prediction, reference[, keywords]) row."""
+        if required_keywords is None:
+            required_keywords = [None] * len(predictions)
+        digests = []
+        for pred, ref, keywords in zip(predictions, references, required_keywords):
+            payload = f"{pred}\0{ref}"
+            if keywords is not None:
+                payload += "\0" + json.dumps(list(keywords))
+            digests.append(hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest())
+        return digests
+
+    def get_many(self, fingerprint: bytes, digests: List[bytes]) -> List[Optional[float]]:
+        """Cached score per digest, or None."""
+        found = {}
+        unique = list(dict.fromkeys(digests))
+        for start in range(0, len(unique), self._LOOKUP_CHUNK):
+            chunk = unique[start:start + self._LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._db.execute(
+                f'SELECT pair, value FROM scores WHERE metric = ? AND pair IN ({placeholders})',
+                [fingerprint, *chunk]
+            )
+            found.update(rows)
+
+        values = [found.get(digest) for digest in digests]
+        hits = sum(1 for value in values if value is not None)
+        self.hits += hits
+        self.misses += len(values) - hits
+        return values
+
+    def put_many(self, fingerprint: bytes, digests: List[bytes], values: List[float]):
+        """Stage scores; they become durable at the next checkpoint()."""
+        self._db.executemany(
+            'INSERT OR REPLACE INTO scores (metric, pair, value) VALUES (?, ?, ?)',
+            [(fingerprint, digest, float(value)) for digest, value in zip(digests, values)]
+        )
+        self.writes += len(values)
+
+    def checkpoint(self):
+        """Commit everything written so far."""
+        self._db.commit()
+        self.checkpoints += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for results metadata."""
+        lookups = self.hits + self.misses
+        return {
+            'path': str(self.path),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'writes': self.writes,
+            'checkpoints': self.checkpoints
+        }
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
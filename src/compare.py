@@ -0,0 +1,386 @@
+"""
+Paired run-to-run comparison and regression gate.
+
+Two saved runs (JSON, per-sample JSONL from evaluate_stream, or .evalcols)
+are aligned by sample_id through a hash index on the baseline's ids, and
+every metric present in both is compared pair by pair (candidate minus
+baseline):
+
+    mean delta      with a paired bootstrap percentile interval
+    p-value         two-sided sign-flip permutation test of the mean delta
+    top regressions the k pairs with the most negative delta, picked by
+                    np.argpartition (no full sort)
+
+Both resampling tests are vectorized: each block of replicates is one
+random matrix. The permutation test draws one random bit per pair and gets
+every flipped sum from a single matrix product. The bootstrap gathers
+(replicates x pairs) index matrices. Runs longer than bootstrap_rows are
+bootstrapped on a random subset of that many pairs, with the spread scaled
+to the full run (see paired_bootstrap), which bounds the cost.
+
+The gate fails (exit code 1) when a gated metric's mean drops by
+significantly more than its allowed drop: a one-sided sign-flip test of
+H0: mean delta >= -max_drop (run on deltas + max_drop) rejects at alpha.
+A significant drop that may still be within the tolerance passes.
+
+    python -m src.compare baseline.evalcols candidate.evalcols --gate overall_score=0
+    python -m src.compare old.json new.json --gate overall_score=0.01,exact_match=0.02 --alpha 0.01
+    python -m src.compare old.evalcols new.evalcols --config configs/eval.yaml --output diff.json
+"""
+import argparse
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+from .storage import ColumnarResults, is_columnar
+from .reweight import load_score_matrix
+from .grouping import bootstrap_group_means
+
+# Random matrix elements drawn at a time by the resampling tests
+BLOCK_ELEMENTS = 1 << 22
+
+# Pairs resampled by the bootstrap; longer runs use a random subset this size
+BOOTSTRAP_ROWS = 100_000
+
+class Run(NamedTuple):
+    """Sample ids and (rows, metrics) score matrix of a saved run (NaN where missing)."""
+    sample_ids: List[Any]
+    scores: np.ndarray
+    metrics: List[str]
+
+def load_run(path: str) -> Run:
+    """Load the ids and score columns of saved results (JSON, JSONL or columnar)."""
+    if is_columnar(path):
+        store = ColumnarResults(path)
+        scores, metrics = load_score_matrix(store, list(store.score_columns))
+        return Run(store.text('sample_id'), scores, metrics)
+
+    if Path(path).suffix == '.jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            per_sample = [json.loads(line) for line in f if line.strip()]
+        results = {'per_sample': per_sample}
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+        per_sample = results.get('per_sample')
+        if per_sample is None:
+            raise ValueError(f"{path} has no per-sample scores; compare its per-sample file instead")
+
+    metrics = list(dict.fromkeys(m for sample in per_sample for m in sample['scores']))
+    scores, metrics = load_score_matrix(results, metrics)
+    return Run([sample['sample_id'] for sample in per_sample], scores, metrics)
+
+def align(baseline_ids: List[Any], candidate_ids: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row indices of the pairs shared by two runs, in candidate order.
+
+    Baseline ids go into a dict (hash index), so alignment is one pass over
+    each run. Runs written in the same order skip the lookup entirely.
+    """
+    if baseline_ids == candidate_ids:
+        if len(set(baseline_ids)) != len(baseline_ids):
+            raise ValueError("Duplicate sample_id in both runs; cannot pair samples")
+        rows = np.arange(len(baseline_ids))
+        return rows, rows
+
+    index = dict(zip(baseline_ids, range(len(baseline_ids))))
+    if len(index) != len(baseline_ids):
+        raise ValueError("Duplicate sample_id in the baseline run; cannot pair samples")
+
+    baseline_rows = np.fromiter(map(index.get, candidate_ids, itertools.repeat(-1)),
+                                dtype=np.int64, count=len(candidate_ids))
+    candidate_rows = np.flatnonzero(baseline_rows >= 0)
+    baseline_rows = baseline_rows[candidate_rows]
+    if len(baseline_rows) and np.bincount(baseline_rows).max() > 1:
+        raise ValueError("Duplicate sample_id in the candidate run; cannot pair samples")
+    return baseline_rows, candidate_rows
+
+def sign_flip_test(deltas: np.ndarray, n_permutations: int = 1000, seed: int = 0,
+                   alternative: str = 'two-sided') -> np.ndarray:
+    """
+    Paired permutation p-value of the mean delta, per column.
+
+    Under the null the two runs are exchangeable within a pair, so every
+    delta's sign is a coin flip. A block of replicates is one random +-1
+    matrix (64 signs per random word) and its flipped sums for all columns
+    are one float32 matrix product. NaN deltas (missing scores) are left out
+    of their column.
+
+    Args:
+        alternative: 'two-sided' (mean delta != 0) or 'less' (mean delta < 0).
+    """
+    if alternative not in ('two-sided', 'less'):
+        raise ValueError(f"alternative must be 'two-sided' or 'less', got {alternative!r}")
+    present = ~np.isnan(deltas)
+    filled = np.where(present, deltas, 0.0)
+    counts = np.maximum(present.sum(axis=0), 1)
+    observed = filled.sum(axis=0) / counts
+    # Flipped sums stay near zero, so float32 rounding is far below their spread
+    filled = filled.astype(np.float32)
+
+    rows = len(deltas)
+    words = (rows + 63) // 64
+    bit_generator = np.random.default_rng(seed).bit_generator
+    extreme = np.zeros(deltas.shape[1])
+    block = max(1, BLOCK_ELEMENTS // max(rows, 1))
+    for first in range(0, n_permutations, block):
+        b = min(block, n_permutations - first)
+        bits = np.unpackbits(bit_generator.random_raw((b, words)).view(np.uint8), axis=1, count=rows)
+        signs = (bits.view(np.int8) * np.int8(2) - np.int8(1)).astype(np.float32)
+        flipped = (signs @ filled).astype(np.float64) / counts
+        # Slack so a replicate equal to the observed mean counts despite float32 rounding
+        slack = 1e-6 * np.abs(observed)
+        if alternative == 'less':
+            extreme += np.count_nonzero(flipped <= observed + slack, axis=0)
+        else:
+            extreme += np.count_nonzero(np.abs(flipped) >= np.abs(observed) - slack, axis=0)
+    return (extreme + 1) / (n_permutations + 1)
+
+def paired_bootstrap(deltas: np.ndarray, n_boot: int = 1000, confidence: float = 0.95, seed: int = 0,
+                     max_rows: int = BOOTSTRAP_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap interval of the mean delta, per column.
+
+    Pairs are resampled as units, all columns from one index matrix (see
+    grouping.bootstrap_group_means). With more than max_rows pairs the
+    replicates resample a fixed random subset of max_rows pairs, small
+    enough to stay in cache; their deviations from the subset mean are
+    scaled by sqrt(max_rows / pairs) around the full mean, which keeps the
+    replicate variance that of a full-size resample.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    rows, metrics = deltas.shape
+    present = ~np.isnan(deltas)
+    filled = np.where(present, deltas, 0.0)
+    observed = filled.sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+    complete = bool(present.all())
+    # With missing scores each replicate divides by the present pairs it drew
+    values = filled if complete else np.hstack([filled, present.astype(np.float64)])
+
+    subset_seed, boot_seed = np.random.SeedSequence(seed).spawn(2)
+    draws = min(rows, max_rows)
+    if draws < rows:
+        subset = np.random.default_rng(subset_seed).choice(rows, draws, replace=False)
+        values = values[np.sort(subset)]
+
+    # All pairs form one group; every column reads the same draws, which keeps the pairing
+    boot = bootstrap_group_means(values, np.zeros(draws, dtype=np.int64), 1, n_boot=n_boot,
+                                 seed=boot_seed)[:, 0]
+    center = values.mean(axis=0)
+    if not complete:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            boot = boot[:, :metrics] / boot[:, metrics:]
+        center = center[:metrics] / center[metrics:]
+    replicates = observed + (boot - center) * np.sqrt(draws / rows)
+
+    alpha = 1 - confidence
+    low, high = np.nanquantile(replicates, [alpha / 2, 1 - alpha / 2], axis=0)
+    return low, high
+
+def top_regressions(deltas: np.ndarray, k: int) -> np.ndarray:
+    """Rows of the k most negative deltas (only negative ones), most regressed first."""
+    keyed = np.where(np.isnan(deltas), np.inf, deltas)
+    k = min(k, int(np.count_nonzero(keyed < 0)))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    rows = np.argpartition(keyed, k - 1)[:k]
+    return rows[np.argsort(keyed[rows], kind='stable')]
+
+def compare_runs(baseline: Run, candidate: Run, metrics: Optional[List[str]] = None,
+                 n_boot: int = 1000, n_permutations: int = 1000, confidence: float = 0.95,
+                 top_k: int = 10, rank_metric: str = 'overall_score', seed: int = 0,
+                 bootstrap_rows: int = BOOTSTRAP_ROWS, max_drops: Optional[Dict[str, float]] = None,
+                 alpha: float = 0.05) -> Dict[str, Any]:
+    """
+    Paired comparison of two runs (candidate minus baseline).
+
+    Args:
+        metrics: Score columns to compare; every column both runs have if None.
+        n_boot, n_permutations: Replicates of the bootstrap interval and the
+            permutation test (0 skips either).
+        rank_metric: Metric whose deltas pick the top regressions.
+        bootstrap_rows: Most pairs the bootstrap resamples (see paired_bootstrap).
+        max_drops, alpha: Regression gate, see regression_gate.
+
+    Returns: a report with the pair counts, per-metric statistics under
+        'metrics', the most regressed pairs under 'top_regressions' and,
+        with max_drops, the gate decision under 'gate'.
+    """
+    if metrics is None:
+        metrics = [m for m in baseline.metrics if m in candidate.metrics]
+    missing = [m for m in metrics if m not in baseline.metrics or m not in candidate.metrics]
+    if missing:
+        raise ValueError(f"Metrics {missing} are not in both runs")
+
+    baseline_rows, candidate_rows = align(baseline.sample_ids, candidate.sample_ids)
+    if len(baseline_rows) == 0:
+        raise ValueError("The runs share no sample_id")
+
+    base = baseline.scores[:, [baseline.metrics.index(m) for m in metrics]][baseline_rows]
+    cand = candidate.scores[:, [candidate.metrics.index(m) for m in metrics]][candidate_rows]
+    deltas = cand - base
+
+    if n_boot:
+        ci_low, ci_high = paired_bootstrap(deltas, n_boot, confidence, seed, bootstrap_rows)
+    if n_permutations:
+        p_values = sign_flip_test(deltas, n_permutations, seed)
+
+    report = {
+        'pairs': len(deltas),
+        'only_in_baseline': len(baseline.sample_ids) - len(deltas),
+        'only_in_candidate': len(candidate.sample_ids) - len(deltas),
+        'confidence': confidence,
+        'bootstrap_replicates': n_boot,
+        'permutations': n_permutations,
+        'metrics': {},
+    }
+    for j, metric in enumerate(metrics):
+        present = ~np.isnan(deltas[:, j])
+        entry = {
+            'pairs': int(present.sum()),
+            'baseline_mean': float(np.mean(base[present, j])) if present.any() else float('nan'),
+            'candidate_mean': float(np.mean(cand[present, j])) if present.any() else float('nan'),
+            'mean_delta': float(np.mean(deltas[present, j])) if present.any() else float('nan'),
+            'improved': int(np.count_nonzero(deltas[present, j] > 0)),
+            'regressed': int(np.count_nonzero(deltas[present, j] < 0)),
+        }
+        entry['unchanged'] = entry['pairs'] - entry['improved'] - entry['regressed']
+        if n_boot:
+            entry['ci_low'], entry['ci_high'] = float(ci_low[j]), float(ci_high[j])
+        if n_permutations:
+            entry['p_value'] = float(p_values[j])
+        report['metrics'][metric] = entry
+
+    if rank_metric in metrics and top_k:
+        j = metrics.index(rank_metric)
+        report['top_regressions'] = [
+            {
+                'sample_id': candidate.sample_ids[candidate_rows[row]],
+                'baseline': float(base[row, j]),
+                'candidate': float(cand[row, j]),
+                'delta': float(deltas[row, j])
+            }
+            for row in top_regressions(deltas[:, j], top_k).tolist()
+        ]
+    if max_drops:
+        report['gate'] = regression_gate(deltas, metrics, max_drops, alpha=alpha,
+                                         n_permutations=n_permutations, seed=seed)
+    return report
+
+def regression_gate(deltas: np.ndarray, metrics: List[str], max_drops: Dict[str, float],
+                    alpha: float = 0.05, n_permutations: int = 1000, seed: int = 0) -> Dict[str, Any]:
+    """
+    Decide which gated metrics regressed beyond their allowed drop.
+
+    A metric fails when its mean delta is significantly below -max_drop:
+    the one-sided sign-flip test of H0: mean delta >= -max_drop, run on
+    deltas + max_drop, gives p_value < alpha. Testing against 0 instead
+    would fail any significant drop near the tolerance, however small.
+
+    Args:
+        deltas: (pairs, metrics) candidate minus baseline scores.
+        max_drops: Allowed mean drop per gated metric (0 allows none).
+    """
+    if not n_permutations:
+        raise ValueError("The regression gate needs the permutation test (permutations > 0)")
+    checks = {}
+    for metric, max_drop in max_drops.items():
+        if metric not in metrics:
+            raise ValueError(f"Gated metric '{metric}' was not compared")
+        column = deltas[:, [metrics.index(metric)]]
+        mean_delta = float(np.nanmean(column))
+        p_value = float(sign_flip_test(column + max_drop, n_permutations, seed, alternative='less')[0])
+        checks[metric] = {
+            'max_drop': max_drop,
+            'mean_delta': mean_delta,
+            'p_value': p_value,
+            'failed': bool(mean_delta < -max_drop and p_value < alpha)
+        }
+    return {
+        'rule': 'one-sided sign-flip test of H0: mean delta >= -max_drop, fail if p_value < alpha',
+        'alpha': alpha,
+        'checks': checks,
+        'failed': any(c['failed'] for c in checks.values())
+    }
+
+def _parse_gate(text: str) -> Dict[str, float]:
+    gate = {}
+    for item in text.split(','):
+        name, _, value = item.partition('=')
+        gate[name.strip()] = float(value) if value else 0.0
+    return gate
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two evaluation runs pair by pair and gate on regressions.")
+    parser.add_argument('baseline', help="Baseline results (JSON, per-sample JSONL or .evalcols)")
+    parser.add_argument('candidate', help="Candidate results, same formats")
+    parser.add_argument('--metrics', default=None, help="Comma-separated metrics to compare (default: all shared)")
+    parser.add_argument('--gate', default=None,
+                        help="metric=max_drop,... failing when the drop is significantly larger than max_drop "
+                             "(e.g. overall_score=0.01; a bare metric allows no drop)")
+    parser.add_argument('--config', default=None, help="Take the gate from an EvaluationConfig file")
+    parser.add_argument('--alpha', type=float, default=None, help="Significance level of the gate (default 0.05)")
+    parser.add_argument('--bootstrap', type=int, default=1000, help="Bootstrap replicates (0 to skip)")
+    parser.add_argument('--permutations', type=int, default=1000, help="Permutation test replicates")
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--top', type=int, default=10, help="Most regressed samples to list")
+    parser.add_argument('--rank-metric', default='overall_score')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Write the JSON report here")
+    args = parser.parse_args()
+
+    gate, alpha = {}, 0.05
+    if args.config:
+        from .config import EvaluationConfig
+        settings = EvaluationConfig(args.config).get_regression_gate()
+        gate, alpha = dict(settings['metrics']), settings['alpha']
+    if args.gate:
+        gate = _parse_gate(args.gate)
+    if args.alpha is not None:
+        alpha = args.alpha
+
+    baseline, candidate = load_run(args.baseline), load_run(args.candidate)
+    metrics = args.metrics.split(',') if args.metrics else None
+    report = compare_runs(baseline, candidate, metrics=metrics, n_boot=args.bootstrap,
+                          n_permutations=args.permutations, confidence=args.confidence,
+                          top_k=args.top, rank_metric=args.rank_metric, seed=args.seed,
+                          max_drops=gate or None, alpha=alpha)
+
+    print(f"Compared {report['pairs']} paired samples "
+          f"({report['only_in_baseline']} only in baseline, {report['only_in_candidate']} only in candidate)")
+    for metric, entry in report['metrics'].items():
+        line = (f"  {metric:20s} {entry['baseline_mean']:.4f} -> {entry['candidate_mean']:.4f}  "
+                f"delta {entry['mean_delta']:+.4f}")
+        if 'ci_low' in entry:
+            line += f" [{entry['ci_low']:+.4f}, {entry['ci_high']:+.4f}]"
+        if 'p_value' in entry:
+            line += f"  p={entry['p_value']:.4f}"
+        print(line + f"  (+{entry['improved']} / -{entry['regressed']})")
+
+    if report.get('top_regressions'):
+        print(f"\nMost regressed samples ({args.rank_metric}):")
+        for entry in report['top_regressions']:
+            print(f"  {entry['sample_id']}: {entry['baseline']:.3f} -> {entry['candidate']:.3f} "
+                  f"({entry['delta']:+.3f})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to {args.output}")
+
+    if gate:
+        print(f"Gate rule: {report['gate']['rule']}")
+        for metric, check in report['gate']['checks'].items():
+            status = "FAIL" if check['failed'] else "ok"
+            print(f"Gate {metric}: {status} (delta {check['mean_delta']:+.4f}, allowed drop "
+                  f"{check['max_drop']:g}, one-sided p={check['p_value']:.4f}, alpha={alpha:g})")
+        if report['gate']['failed']:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
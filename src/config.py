@@ -18,10 +18,21 @@ class EvaluationConfig:
             'metrics': {
                 'exact_match': {'enabled': True, 'normalize': True},
                 'fuzzy_match': {'enabled': True, 'threshold': 0.7},
-                'keyword_match': {'enabled': True},
+                'fuzzy_similarity': {'enabled': False},
+                'keyword_match': {'enabled': True, 'match_mode': 'token'},
                 'semantic_similarity': {
                     'enabled': True, 
-                    'model_name': 'all-MiniLM-L6-v2'
+                    'model_name': 'all-MiniLM-L6-v2',
+                    'batch_size': 64,
+                    'encode_workers': 1,
+                    'threads_per_worker': None,
+                    'long_text': 'window',
+                    'window_overlap': 32,
+                    'encode_batch_size': 64,
+                    'backend': 'torch',
+                    'onnx_file': None,
+                    'cache_dir': None,
+                    'cache_dtype': 'float32'
                 }
             },
             'weights': {
@@ -30,6 +41,21 @@ class EvaluationConfig:
                 'keyword_match': 0.2,
                 'semantic_similarity': 0.3
             },
+            'execution': {
+                'num_workers': 1,
+                'chunk_size': 2000,
+                'score_cache': None,
+                'checkpoint_every': 10000,
+                'cascade': 'strict',
+                'pass_threshold': None,
+                'reference_reduce': 'max',
+                'profile_memory': False,
+                'cprofile_path': None
+            },
+            'regression_gate': {
+                'metrics': {'overall_score': 0.0},
+                'alpha': 0.05
+            },
             'output': {
                 'save_results': True,
                 'output_dir': 'data/results',
@@ -73,6 +99,14 @@ class EvaluationConfig:
         
         return metrics_config
     
+    def get_execution_config(self) -> Dict[str, Any]:
+        """Get execution settings (worker count, chunk size) for the evaluator."""
+        return self.config['execution']
+    
+    def get_regression_gate(self) -> Dict[str, Any]:
+        """Get the run comparison gate: allowed drop per metric and significance level."""
+        return self.config['regression_gate']
+    
     def get_weights(self) -> Dict[str, float]:
         """Get weights for score aggregation."""
         return self.config['weights']
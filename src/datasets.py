@@ -1,8 +1,7 @@
 import json
 import csv
-import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Iterator, Optional, Sequence
 import random
 
 class DatasetLoader:
@@ -19,10 +18,72 @@ class DatasetLoader:
         return data
     
     @staticmethod
-    def load_csv(file_path: str) -> List[Dict[str, Any]]:
-        """Load dataset from CSV file."""
+    def parse_list_field(value: Any, separator: str = ';') -> Optional[List[str]]:
+        """
+        Turn a CSV cell into a list of strings, the shape JSON/JSONL datasets use.
+        
+        A cell holding a JSON array ('["Paris", "France"]') is parsed as JSON;
+        any other text is split on separator. Empty cells become None.
+        """
+        if isinstance(value, list) or value is None:
+            return value
+        if not isinstance(value, str):
+            # pandas reads empty cells as NaN
+            return None
+        value = value.strip()
+        if value.startswith('['):
+            items = json.loads(value)
+            if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+                raise ValueError(f"Expected a JSON array of strings, got {value!r}")
+            return items
+        items = [item.strip() for item in value.split(separator)]
+        items = [item for item in items if item]
+        return items or None
+    
+    @staticmethod
+    def load_csv(file_path: str, list_fields: Sequence[str] = ('required_keywords',),
+                 separator: str = ';') -> List[Dict[str, Any]]:
+        """
+        Load dataset from CSV file.
+        
+        Args:
+            list_fields: Columns holding lists, parsed with parse_list_field.
+        """
+        import pandas as pd
+        
         df = pd.read_csv(file_path)
-        return df.to_dict('records')
+        records = df.to_dict('records')
+        for record in records:
+            for field in list_fields:
+                if field in record:
+                    record[field] = DatasetLoader.parse_list_field(record[field], separator)
+        return records
+    
+    @staticmethod
+    def iter_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+        """Stream records from a JSONL file, one dict per non-empty line."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    
+    @staticmethod
+    def iter_csv(file_path: str, list_fields: Sequence[str] = ('required_keywords',),
+                 separator: str = ';') -> Iterator[Dict[str, Any]]:
+        """
+        Stream records from a CSV file without loading it into memory.
+        
+        Args:
+            list_fields: Columns holding lists (e.g. 'paris;france' or a JSON
+                array), parsed with parse_list_field.
+        """
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                for field in list_fields:
+                    if field in row:
+                        row[field] = DatasetLoader.parse_list_field(row[field], separator)
+                yield row
     
     @staticmethod
     def create_qa_dataset(num_samples: int = 10) -> List[Dict[str, Any]]:
@@ -93,6 +154,52 @@ class DatasetLoader:
         # Return requested number of samples
         return qa_pairs[:num_samples]
     
+    @staticmethod
+    def create_synthetic_dataset(num_samples: int, seed: int = 0, correctness_level: float = 0.7,
+                                 max_sentences: int = 12) -> List[Dict[str, Any]]:
+        """
+        Seeded synthetic dataset of any size with varied answer lengths.
+        
+        Each reference is one create_qa_dataset answer followed by a
+        geometric-ish number of extra answers (1 to max_sentences sentences
+        in total), so short and long answers are both represented. Each
+        sentence of the prediction is a paraphrase with probability
+        correctness_level, else a wrong answer. The same seed always gives
+        the same dataset, independent of the global random state.
+        
+        Returns: items with 'sample_id', 'question', 'reference_answer',
+            'prediction', 'category' and 'difficulty'.
+        """
+        rng = random.Random(seed)
+        base = DatasetLoader.create_qa_dataset()
+        dataset = []
+        
+        for i in range(num_samples):
+            item = base[rng.randrange(len(base))]
+            sentences = 1
+            while sentences < max_sentences and rng.random() < 0.6:
+                sentences += 1
+            parts = [item] + [base[rng.randrange(len(base))] for _ in range(sentences - 1)]
+            
+            reference = ' '.join(part['reference_answer'] for part in parts)
+            prediction = ' '.join(
+                DatasetLoader._paraphrase_text(part['reference_answer'], rng)
+                if rng.random() < correctness_level
+                else DatasetLoader._generate_incorrect_answer(part['category'], rng)
+                for part in parts
+            )
+            
+            dataset.append({
+                'sample_id': f"synthetic_{i}",
+                'question': item['question'],
+                'reference_answer': reference,
+                'prediction': prediction,
+                'category': item['category'],
+                'difficulty': item['difficulty']
+            })
+        
+        return dataset
+    
     @staticmethod
     def generate_llm_predictions(dataset: List[Dict[str, Any]], 
                                 correctness_level: float = 0.7) -> List[str]:
@@ -119,8 +226,9 @@ class DatasetLoader:
         return predictions
     
     @staticmethod
-    def _paraphrase_text(text: str) -> str:
+    def _paraphrase_text(text: str, rng: random.Random = None) -> str:
         """Simple paraphrasing for demo purposes."""
+        rng = rng or random
         paraphrases = {
             "Paris is the capital of France.": ["The capital of France is Paris.", "France's capital city is Paris."],
             "Water boils at 100°C at sea level.": ["At sea level, water boils at 100 degrees Celsius.", "The boiling point of water is 100°C."],
@@ -134,12 +242,12 @@ class DatasetLoader:
         
         # Check for exact match
         if text in paraphrases:
-            return random.choice(paraphrases[text])
+            return rng.choice(paraphrases[text])
         
         # Check for substring match (in case of slight variations)
         for original, options in paraphrases.items():
             if original in text or text in original:
-                return random.choice(options)
+                return rng.choice(options)
         
         # Default: simple variation without breaking the sentence
         if len(text) > 20:
@@ -151,8 +259,9 @@ class DatasetLoader:
         return text
     
     @staticmethod
-    def _generate_incorrect_answer(category: str) -> str:
+    def _generate_incorrect_answer(category: str, rng: random.Random = None) -> str:
         """Generate plausible but incorrect answers."""
+        rng = rng or random
         incorrect_answers = {
             "geography": ["The capital is London.", "I believe it's Berlin.", "Madrid is the capital."],
             "science": ["Water boils at 90°C.", "The boiling point is 110 degrees.", "It depends on the altitude."],
@@ -161,4 +270,4 @@ class DatasetLoader:
             "physics": ["About 300,000 km/s.", "186,000 miles per second.", "3 x 10^8 m/s exactly."]
         }
         
-        return random.choice(incorrect_answers.get(category, ["I don't know the answer."]))
+        return rng.choice(incorrect_answers.get(category, ["I don't know the answer."]))
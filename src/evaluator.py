@@ -1,19 +1,54 @@
 import json
-from typing import Dict, List, Any, Optional
+import re
+import time
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Sequence, Union
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
 import numpy as np
 from datetime import datetime
 
 # Import our metrics
-from .metrics.correctness import CorrectnessMetrics
+from .metrics.correctness import CorrectnessMetrics, LEXICAL_METRICS, ProcessedText
 from .metrics.relevance import RelevanceMetrics
+from .cache import EmbeddingCache, ScoreCache
+from .utils import RunningStats
+from .storage import ColumnarResults, ColumnarResultWriter, is_columnar, save_columnar
+from .reweight import weighted_overall
+from .profiling import Profiler
+from .sampling import StratifiedEstimator, allocate, stratify
+from .grouping import grouped
+
+# Weights used for the overall_score weighted average
+DEFAULT_WEIGHTS = {
+    'exact_match': 0.3,
+    'fuzzy_match': 0.2,
+    'keyword_match': 0.2,
+    'semantic_similarity': 0.3
+}
+
+# Relative per-pair cost, used to order metrics in the 'fast' cascade
+METRIC_COSTS = {
+    'exact_match': 1,
+    'keyword_match': 2,
+    'fuzzy_match': 5,
+    'fuzzy_similarity': 10,
+    'semantic_similarity': 1000
+}
 
 class LLMEvaluator:
     """
     Main class to orchestrate evaluation of LLM outputs.
     """
     
-    def __init__(self, metrics_config: Optional[Dict[str, Any]] = None):
+    def __init__(self, metrics_config: Optional[Dict[str, Any]] = None,
+                 num_workers: int = 1, chunk_size: int = 2000,
+                 score_cache: Optional[str] = None, checkpoint_every: int = 10_000,
+                 cascade: str = 'strict', pass_threshold: Optional[float] = None,
+                 weights: Optional[Dict[str, float]] = None,
+                 profile_memory: bool = False, cprofile_path: Optional[str] = None,
+                 reference_reduce: str = 'max'):
         """
         Initialize evaluator with desired metrics.
         
@@ -23,6 +58,29 @@ class LLMEvaluator:
                     'exact_match': {'threshold': 0.8},
                     'semantic_similarity': {'model_name': 'all-MiniLM-L6-v2'}
                 }
+                
+                semantic_similarity also accepts 'batch_size', 'encode_workers'
+                and 'threads_per_worker' (multi-process encoding), 'long_text',
+                'window_overlap', 'encode_batch_size', 'backend' and 'onnx_file'
+                (see RelevanceMetrics) and, to enable the persistent embedding cache, 'cache_dir'
+                (plus 'cache_dtype', 'cache_max_entries', 'cache_memory_entries').
+            num_workers: Processes used for lexical metrics in batch paths;
+                1 keeps everything in-process. Workers are spawned, so scripts
+                using them need an `if __name__ == "__main__":` guard.
+            chunk_size: Rows per work unit sent to a lexical worker.
+            score_cache: Path of a persistent ScoreCache (SQLite). Cached
+                scores are reused and new ones checkpointed, so interrupted
+                or incremental runs only score what is missing.
+            checkpoint_every: Rows scored between score cache checkpoints.
+            cascade, pass_threshold: Defaults for evaluate_single.
+            weights: Metric weights for overall_score, e.g.
+                EvaluationConfig.get_weights(); DEFAULT_WEIGHTS if None.
+            reference_reduce: How per-reference scores combine when a sample
+                has several references: 'max' (best reference per metric)
+                or 'mean'.
+            profile_memory: Trace per-stage Python allocations (tracemalloc)
+                in results['metadata']['profile']; slows evaluation.
+            cprofile_path: Dump cProfile stats of each batch/stream run here.
         """
         self.metrics_config = metrics_config or {
             'exact_match': {'normalize': True},
@@ -31,73 +89,297 @@ class LLMEvaluator:
             'semantic_similarity': {'model_name': 'all-MiniLM-L6-v2'}
         }
         
-        # Initialize metric classes
+        # Initialize metric classes; RelevanceMetrics is built on first use
         self.correctness = CorrectnessMetrics()
-        self.relevance = RelevanceMetrics(
-            model_name=self.metrics_config.get('semantic_similarity', {}).get('model_name', 'all-MiniLM-L6-v2')
-        )
+        self._relevance = None
+        
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        
+        self.score_cache = ScoreCache(score_cache) if score_cache else None
+        self.checkpoint_every = checkpoint_every
+        
+        self.cascade = cascade
+        self.pass_threshold = pass_threshold
+        self.weights = dict(weights) if weights is not None else dict(DEFAULT_WEIGHTS)
+        if reference_reduce not in ('max', 'mean'):
+            raise ValueError(f"reference_reduce must be 'max' or 'mean', got {reference_reduce!r}")
+        self.reference_reduce = reference_reduce
+        
+        # Stage timings; reset at the start of every batch/stream run
+        self.profiler = Profiler(trace_memory=profile_memory, cprofile_path=cprofile_path)
         
         self.results = None
     
-    def evaluate_single(self, prediction: str, reference: str, sample_id: Optional[str] = None) -> Dict[str, Any]:
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Process pool for lexical metrics, started on first parallel batch."""
+        if self._executor is None:
+            # spawn, as in EncoderPool: forking a process that already holds
+            # torch threads (the semantic model) can deadlock the children
+            self._executor = ProcessPoolExecutor(max_workers=self.num_workers,
+                                                 mp_context=get_context('spawn'))
+        return self._executor
+    
+    def close(self):
+        """Shut down the worker pools, persist the caches, stop tracing."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._relevance is not None:
+            self._relevance.close()
+        if self.score_cache is not None:
+            self.score_cache.close()
+            self.score_cache = None
+        self.profiler.close()
+    
+    @property
+    def relevance(self) -> RelevanceMetrics:
+        """Semantic metric backend, created lazily so lexical-only runs never load it."""
+        if self._relevance is None:
+            semantic_config = self.metrics_config.get('semantic_similarity', {})
+            model_name = semantic_config.get('model_name', 'all-MiniLM-L6-v2')
+            
+            self._relevance = RelevanceMetrics(
+                model_name=model_name,
+                batch_size=semantic_config.get('batch_size', 64),
+                profiler=self.profiler,
+                encode_workers=semantic_config.get('encode_workers', 1),
+                threads_per_worker=semantic_config.get('threads_per_worker'),
+                long_text=semantic_config.get('long_text', 'window'),
+                window_overlap=semantic_config.get('window_overlap', 32),
+                encode_batch_size=semantic_config.get('encode_batch_size', 64),
+                backend=semantic_config.get('backend', 'torch'),
+                onnx_file=semantic_config.get('onnx_file')
+            )
+            
+            if semantic_config.get('cache_dir'):
+                # Keyed by encoding_key: windowed and truncated embeddings differ
+                self._relevance.cache = EmbeddingCache(
+                    semantic_config['cache_dir'], self._relevance.encoding_key,
+                    dtype=semantic_config.get('cache_dtype', 'float32'),
+                    max_entries=semantic_config.get('cache_max_entries', 1_000_000),
+                    memory_entries=semantic_config.get('cache_memory_entries', 10_000)
+                )
+        return self._relevance
+    
+    def evaluate_single(self, prediction: str, reference: Union[str, List[str]], sample_id: Optional[str] = None,
+                        required_keywords: Optional[List[str]] = None,
+                        cascade: Optional[str] = None,
+                        pass_threshold: Optional[float] = None) -> Dict[str, Any]:
         """
         Evaluate a single prediction against a reference.
+        
+        Args:
+            reference: One reference, or a list of acceptable references;
+                each metric is then reduced over them (see reference_reduce).
+            required_keywords: Keywords for keyword_match; auto-extracted
+                from the reference when None.
+            cascade: 'strict' runs every enabled metric (the full output);
+                'fast' runs metrics cheapest first and skips the rest once
+                the outcome is decided. Defaults to the evaluator's setting.
+            pass_threshold: overall_score bar for gating. When set, the result
+                gets a 'passed' flag and, in 'fast' mode, metrics are skipped
+                as soon as bounds on overall_score settle which side of the
+                bar the sample is on. overall_score is then None and
+                'overall_score_bound' holds the [low, high] bound.
         """
+        cascade = cascade or self.cascade
+        if pass_threshold is None:
+            pass_threshold = self.pass_threshold
+        if cascade not in ('strict', 'fast'):
+            raise ValueError(f"Unknown cascade mode: {cascade}")
+        
+        start = time.perf_counter()
         results = {
             'sample_id': sample_id,
             'prediction': prediction,
             'reference': reference
         }
-        scores = {}
-        
-        # Exact match
-        if 'exact_match' in self.metrics_config:
-            config = self.metrics_config['exact_match']
-            scores['exact_match'] = self.correctness.exact_match(
-                prediction, reference, 
-                normalize=config.get('normalize', True)
-            )
         
-        # Fuzzy match
-        if 'fuzzy_match' in self.metrics_config:
-            config = self.metrics_config['fuzzy_match']
-            scores['fuzzy_match'] = self.correctness.fuzzy_match(
-                prediction, reference,
-                threshold=config.get('threshold', 0.7)
-            )
-        
-        # Keyword match
-        if 'keyword_match' in self.metrics_config:
-            scores['keyword_match'] = self.correctness.keyword_match(prediction, reference)
-        
-        # Semantic similarity
-        if 'semantic_similarity' in self.metrics_config:
-            scores['semantic_similarity'] = self.relevance.semantic_similarity(prediction, reference)
+        if not isinstance(reference, str) and cascade == 'strict':
+            # Multi-reference: the batched path reduces over references
+            columns = self._score_multi([prediction], [reference],
+                                        [required_keywords] if required_keywords is not None else None)
+            scores = {metric: values[0] for metric, values in columns.items()}
+            scores['overall_score'] = self._overall_score(scores)
+            results['scores'] = scores
+            if pass_threshold is not None:
+                results['passed'] = scores['overall_score'] >= pass_threshold
+            latency = time.perf_counter() - start
+            self.profiler.add('evaluate_single', latency, 1)
+            self.profiler.record_latency(latency)
+            return results
         
-        # Overall score (weighted average)
-        weights = {
-            'exact_match': 0.3,
-            'fuzzy_match': 0.2,
-            'keyword_match': 0.2,
-            'semantic_similarity': 0.3
-        }
+        # Shared lexical preprocessing for all correctness metrics
+        pred_text = self.correctness.preprocess(prediction)
+        if isinstance(reference, str):
+            ref_texts = [self.correctness.preprocess(reference, cache=True)]
+        else:
+            if not reference:
+                raise ValueError("reference list is empty")
+            ref_texts = [self.correctness.preprocess(ref, cache=True) for ref in reference]
+        ref_text = ref_texts[0]
+        self.profiler.add('preprocess', time.perf_counter() - start, 1)
         
-        valid_scores = {k: v for k, v in scores.items() if k in weights}
-        if valid_scores:
-            total_weight = sum(weights[k] for k in valid_scores.keys())
-            scores['overall_score'] = sum(
-                scores[k] * weights[k] for k in valid_scores.keys()
-            ) / total_weight
+        metrics = [m for m in LEXICAL_METRICS + ('semantic_similarity',) if m in self.metrics_config]
+        if cascade == 'strict':
+            scores = {
+                metric: self._single_metric(metric, pred_text, ref_text, required_keywords)
+                for metric in metrics
+            }
+            scores['overall_score'] = self._overall_score(scores)
         else:
-            scores['overall_score'] = 0.0
+            scores, cascade_info = self._cascade_scores(metrics, pred_text, ref_texts,
+                                                        required_keywords, pass_threshold)
         
         results['scores'] = scores
+        if cascade == 'fast':
+            results['cascade'] = cascade_info
+            if cascade_info['bound'] is not None:
+                results['overall_score_bound'] = cascade_info['bound']
+        if pass_threshold is not None:
+            if scores['overall_score'] is None:
+                # Skipped metrics: the bound lies entirely on one side of the bar
+                results['passed'] = results['overall_score_bound'][0] >= pass_threshold
+            else:
+                results['passed'] = scores['overall_score'] >= pass_threshold
+        
+        latency = time.perf_counter() - start
+        self.profiler.add('evaluate_single', latency, 1)
+        self.profiler.record_latency(latency)
         return results
     
+    def _single_metric(self, metric: str, pred_text: ProcessedText, ref_text: ProcessedText,
+                       required_keywords: Optional[List[str]] = None) -> float:
+        """Score one metric for one preprocessed pair (timed per metric)."""
+        start = time.perf_counter()
+        value = self._metric_value(metric, pred_text, ref_text, required_keywords)
+        self.profiler.add(metric, time.perf_counter() - start, 1)
+        return value
+    
+    def _metric_value(self, metric: str, pred_text: ProcessedText, ref_text: ProcessedText,
+                      required_keywords: Optional[List[str]] = None) -> float:
+        config = self.metrics_config[metric]
+        if metric == 'exact_match':
+            return self.correctness.exact_match(pred_text, ref_text,
+                                               normalize=config.get('normalize', True))
+        if metric == 'fuzzy_match':
+            return self.correctness.fuzzy_match(pred_text, ref_text,
+                                               threshold=config.get('threshold', 0.7))
+        if metric == 'fuzzy_similarity':
+            # Continuous fuzzy similarity (reported, not weighted by default)
+            return self.correctness.fuzzy_similarity(pred_text, ref_text)
+        if metric == 'keyword_match':
+            return self.correctness.keyword_match(pred_text, ref_text,
+                                                 required_keywords=required_keywords,
+                                                 match_mode=config.get('match_mode', 'token'))
+        if metric == 'semantic_similarity':
+            return self.relevance.semantic_similarity(pred_text.raw, ref_text.raw)
+        raise ValueError(f"Unknown metric: {metric}")
+    
+    def _reduced_metric(self, metric: str, pred_text: ProcessedText, ref_texts: List[ProcessedText],
+                        required_keywords: Optional[List[str]] = None) -> float:
+        """One metric for one prediction, reduced over its references like _score_multi."""
+        if len(ref_texts) == 1:
+            return self._single_metric(metric, pred_text, ref_texts[0], required_keywords)
+        start = time.perf_counter()
+        if metric == 'semantic_similarity':
+            # One call, so the prediction is encoded once for all references
+            values = self.relevance.batch_semantic_similarity(
+                [pred_text.raw] * len(ref_texts), [ref.raw for ref in ref_texts]
+            )['scores']
+        else:
+            values = [self._metric_value(metric, pred_text, ref, required_keywords) for ref in ref_texts]
+        value = max(values) if self.reference_reduce == 'max' else float(np.add.reduce(values) / len(values))
+        self.profiler.add(metric, time.perf_counter() - start, 1)
+        return value
+    
+    def _cascade_scores(self, metrics: List[str], pred_text: ProcessedText, ref_texts: List[ProcessedText],
+                        required_keywords: Optional[List[str]],
+                        pass_threshold: Optional[float]):
+        """
+        Run metrics cheapest first, stopping once the outcome is decided.
+        
+        With several references each metric is reduced over them
+        (reference_reduce), as in strict mode. A normalized exact match fixes
+        fuzzy_similarity, and fuzzy_match when its threshold is at most 1, at
+        1.0; with several references only under 'max', where one matching
+        reference decides the maximum. Nothing else is imputed. With a
+        pass_threshold, every metric still to run is bounded by [0, 1], so
+        overall_score is bounded too; once the bound is entirely on one side
+        of the threshold the remaining metrics are skipped. overall_score is
+        then None and the bound that decided 'passed' is returned instead.
+        
+        Returns: (scores, {'skipped': [...], 'reason': str or None,
+                  'bound': [low, high] or None})
+        """
+        scores = {}
+        cascade = {'skipped': [], 'reason': None, 'bound': None}
+        pending = sorted(metrics, key=lambda m: METRIC_COSTS.get(m, 0))
+        determined_by_exact = []
+        if len(ref_texts) == 1 or self.reference_reduce == 'max':
+            determined_by_exact.append('fuzzy_similarity')
+            # A threshold above 1 fails even identical texts
+            if self.metrics_config.get('fuzzy_match', {}).get('threshold', 0.7) <= 1.0:
+                determined_by_exact.append('fuzzy_match')
+        
+        while pending:
+            metric = pending.pop(0)
+            scores[metric] = self._reduced_metric(metric, pred_text, ref_texts, required_keywords)
+            
+            # Equal stripped or normalized texts are equal after normalization
+            if metric == 'exact_match' and scores[metric] == 1.0:
+                for determined in determined_by_exact:
+                    if determined in pending:
+                        pending.remove(determined)
+                        scores[determined] = 1.0
+            
+            if pass_threshold is not None and pending:
+                low, high = self._overall_bounds(scores, pending)
+                if high < pass_threshold or low >= pass_threshold:
+                    cascade.update(skipped=pending,
+                                   reason='below_threshold' if high < pass_threshold else 'above_threshold',
+                                   bound=[low, high])
+                    ordered = {m: scores[m] for m in metrics if m in scores}
+                    ordered['overall_score'] = None
+                    return ordered, cascade
+        
+        ordered = {m: scores[m] for m in metrics}
+        ordered['overall_score'] = self._overall_score(ordered)
+        return ordered, cascade
+    
+    def _overall_bounds(self, scores: Dict[str, float], pending: List[str]):
+        """Lowest and highest overall_score reachable when pending metrics score 0 or 1."""
+        weights = self.weights
+        valid = [k for k in list(scores) + pending if k in weights]
+        if not valid:
+            return 0.0, 0.0
+        total_weight = sum(weights[k] for k in valid)
+        known = sum(scores[k] * weights[k] for k in scores if k in weights)
+        unknown = sum(weights[k] for k in pending if k in weights)
+        return known / total_weight, (known + unknown) / total_weight
+    
     def evaluate_batch(self, predictions: List[str], references: List[str], 
-                      sample_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+                      sample_ids: Optional[List[str]] = None,
+                      required_keywords: Optional[List[Optional[List[str]]]] = None,
+                      groups: Optional[Dict[str, Sequence[Any]]] = None,
+                      n_boot: int = 1000, confidence: float = 0.95,
+                      bootstrap_seed: int = 0) -> Dict[str, Any]:
         """
         Evaluate a batch of predictions.
+        
+        Args:
+            required_keywords: Optional per-sample keyword lists (None entries
+                fall back to keywords extracted from the reference).
+            groups: Optional per-sample metadata columns to slice by, e.g.
+                {'category': [...], 'difficulty': [...]}. Each column adds
+                results['groups'][column][value], an aggregate block for the
+                rows with that value plus bootstrap confidence intervals of
+                every metric mean (see src/grouping.py).
+            n_boot: Bootstrap replicates per group column (0 skips the intervals).
+            confidence: Confidence level of the bootstrap intervals.
+            bootstrap_seed: Seed of the bootstrap resampling.
         """
         if len(predictions) != len(references):
             raise ValueError("Predictions and references must have the same length")
@@ -109,58 +391,839 @@ class LLMEvaluator:
             'metadata': {
                 'timestamp': datetime.now().isoformat(),
                 'total_samples': len(predictions),
-                'metrics_used': list(self.metrics_config.keys())
+                'metrics_used': list(self.metrics_config.keys()),
+                'weights': dict(self.weights)
             },
             'per_sample': [],
             'aggregate': {}
         }
         
-        # Evaluate each sample
-        for i, (pred, ref, sid) in enumerate(zip(predictions, references, sample_ids)):
-            sample_result = self.evaluate_single(pred, ref, sid)
-            results['per_sample'].append(sample_result)
-        
-        # Calculate aggregate statistics
-        all_metrics = set()
-        for sample in results['per_sample']:
-            all_metrics.update(sample['scores'].keys())
-        
-        for metric in all_metrics:
-            if metric != 'overall_score':
-                metric_scores = [sample['scores'][metric] for sample in results['per_sample']]
-                results['aggregate'][f'{metric}_mean'] = float(np.mean(metric_scores))
-                results['aggregate'][f'{metric}_std'] = float(np.std(metric_scores))
-                results['aggregate'][f'{metric}_min'] = float(np.min(metric_scores))
-                results['aggregate'][f'{metric}_max'] = float(np.max(metric_scores))
-        
-        # Overall scores
-        overall_scores = [sample['scores']['overall_score'] for sample in results['per_sample']]
-        results['aggregate']['overall_mean'] = float(np.mean(overall_scores))
-        results['aggregate']['overall_std'] = float(np.std(overall_scores))
-        results['aggregate']['overall_min'] = float(np.min(overall_scores))
-        results['aggregate']['overall_max'] = float(np.max(overall_scores))
+        n = len(predictions)
+        profiler = self.profiler
+        profiler.reset()
+        start = time.perf_counter()
+        
+        with profiler.run():
+            # Score every metric column-wise over the whole batch
+            dedup_stats = {}
+            with profiler.stage('score', n):
+                columns = self._score_all(predictions, references, required_keywords, dedup_stats)
+            with profiler.stage('overall_score', n):
+                columns['overall_score'] = self._overall_scores(columns, n)
+            
+            with profiler.stage('per_sample', n):
+                results['per_sample'] = self._per_sample_results(columns, predictions, references, sample_ids)
+            with profiler.stage('aggregate', n):
+                results['aggregate'] = self._aggregate(columns)
+            if groups:
+                with profiler.stage('groups', n):
+                    results['groups'] = grouped(columns, groups, n_boot=n_boot, confidence=confidence,
+                                                seed=bootstrap_seed)
+                results['metadata']['bootstrap'] = {'replicates': n_boot, 'confidence': confidence,
+                                                    'seed': bootstrap_seed}
+            elapsed = time.perf_counter() - start
+        
+        profiler.add('evaluate_batch', elapsed, n)
+        if n:
+            # Column-wise scoring has no per-row timings; every row gets the batch's amortized latency
+            profiler.record_latency(elapsed / n, n)
+        
+        if dedup_stats:
+            results['metadata']['dedup'] = self._dedup_summary(dedup_stats)
+        if self._relevance is not None and self._relevance.cache is not None:
+            self._relevance.flush_cache()
+            results['metadata']['embedding_cache'] = self._relevance.cache.stats()
+        if self.score_cache is not None:
+            results['metadata']['score_cache'] = self.score_cache.stats()
+        results['metadata']['profile'] = profiler.summary()
+        
+        self.results = results
+        return results
+    
+    def evaluate_stream(self, records: Iterable[Dict[str, Any]], output_path: Optional[str] = None,
+                        chunk_size: int = 1000, prediction_key: str = 'prediction',
+                        reference_key: str = 'reference', id_key: str = 'sample_id',
+                        keywords_key: str = 'required_keywords') -> Dict[str, Any]:
+        """
+        Evaluate an iterator of records in bounded memory.
+        
+        Records are scored chunk by chunk. Per-sample results are appended to
+        output_path as JSONL (one per_sample entry per line), or to a columnar
+        store when the path ends in '.evalcols', instead of being kept in
+        memory. Aggregates are maintained with running statistics and
+        match the 'aggregate' block evaluate_batch would produce.
+        
+        Args:
+            records: Iterable of dicts, e.g. DatasetLoader.iter_jsonl(path).
+            output_path: Optional JSONL file for per-sample results.
+            chunk_size: Number of records scored per chunk.
+            keywords_key: Optional record field holding the sample's
+                required_keywords for keyword_match.
+        """
+        results = {
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'total_samples': 0,
+                'metrics_used': list(self.metrics_config.keys()),
+                'weights': dict(self.weights),
+                'per_sample_path': str(output_path) if output_path else None
+            },
+            'aggregate': {}
+        }
+        
+        running = {}
+        dedup_stats = {}
+        out = None
+        columnar = None
+        if output_path:
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            if is_columnar(output_path):
+                columnar = ColumnarResultWriter(output_path)
+            else:
+                out = open(output_path, 'w', encoding='utf-8')
+        
+        profiler = self.profiler
+        profiler.reset()
+        run_start = time.perf_counter()
+        
+        try:
+            with profiler.run():
+                total = 0
+                chunks = self._chunked(records, chunk_size)
+                while True:
+                    with profiler.stage('read'):
+                        chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    
+                    chunk_start = time.perf_counter()
+                    n = len(chunk)
+                    predictions = [record[prediction_key] for record in chunk]
+                    references = [record[reference_key] for record in chunk]
+                    sample_ids = [record.get(id_key, f"sample_{total + i}")
+                                  for i, record in enumerate(chunk)]
+                    
+                    required_keywords = [record.get(keywords_key) for record in chunk]
+                    
+                    with profiler.stage('score', n):
+                        columns = self._score_all(predictions, references, required_keywords, dedup_stats)
+                    with profiler.stage('overall_score', n):
+                        columns['overall_score'] = self._overall_scores(columns, n)
+                    
+                    with profiler.stage('aggregate', n):
+                        for metric, values in columns.items():
+                            running.setdefault(metric, RunningStats()).update(values)
+                    
+                    if out is not None or columnar is not None:
+                        with profiler.stage('write', n):
+                            samples = self._per_sample_results(columns, predictions, references, sample_ids)
+                            if columnar is not None:
+                                columnar.write_samples(samples)
+                            else:
+                                for sample in samples:
+                                    out.write(json.dumps(sample, ensure_ascii=False) + '\n')
+                                out.flush()
+                    
+                    profiler.record_latency((time.perf_counter() - chunk_start) / n, n)
+                    total += n
+                elapsed = time.perf_counter() - run_start
+            
+            profiler.add('evaluate_stream', elapsed, total)
+            results['metadata']['total_samples'] = total
+            for metric, stats in running.items():
+                prefix = 'overall' if metric == 'overall_score' else metric
+                for stat, value in stats.summary().items():
+                    results['aggregate'][f'{prefix}_{stat}'] = value
+            
+            if dedup_stats:
+                results['metadata']['dedup'] = self._dedup_summary(dedup_stats)
+            if self._relevance is not None and self._relevance.cache is not None:
+                self._relevance.flush_cache()
+                results['metadata']['embedding_cache'] = self._relevance.cache.stats()
+            if self.score_cache is not None:
+                results['metadata']['score_cache'] = self.score_cache.stats()
+            results['metadata']['profile'] = profiler.summary()
+        finally:
+            if out is not None:
+                out.close()
+            if columnar is not None:
+                columnar.close(results['metadata'], results['aggregate'])
+        
+        self.results = results
+        return results
+    
+    def evaluate_sampled(self, records: Iterable[Dict[str, Any]], target_half_width: float = 0.01,
+                         confidence: float = 0.95, strata: Sequence[str] = ('category', 'difficulty'),
+                         chunk_size: int = 500, min_samples: int = 100, max_samples: Optional[int] = None,
+                         seed: int = 0, compare_to: Optional[Dict[str, Any]] = None,
+                         prediction_key: str = 'prediction', reference_key: str = 'reference',
+                         keywords_key: str = 'required_keywords') -> Dict[str, Any]:
+        """
+        Estimate aggregates from a stratified random sample, stopping early.
+        
+        Chunks are drawn from the strata in proportion to their sizes (see
+        src/sampling.py) and scored like evaluate_batch. After each chunk the
+        stratified estimate of every metric mean and its confidence interval
+        are updated; sampling stops once overall_mean's interval is within
+        +-target_half_width, or when max_samples or the data run out.
+        
+        Args:
+            records: Dicts with prediction/reference fields plus the strata
+                fields, e.g. DatasetLoader.create_synthetic_dataset items
+                (use reference_key='reference_answer' for those).
+            strata: Record fields to stratify by; missing fields form their
+                own stratum.
+            min_samples: Rows scored before the stopping rule is checked.
+            compare_to: Full-run results (or their 'aggregate' block); adds a
+                'comparison' of each estimate against the full-run mean.
+        
+        Returns:
+            {'metadata': {..., 'sampling': ...}, 'estimate': {metric: {'mean',
+            'half_width', 'ci_low', 'ci_high'}}, 'aggregate': {'<metric>_mean'}}
+        """
+        records = records if isinstance(records, list) else list(records)
+        population = len(records)
+        rng = np.random.default_rng(seed)
+        
+        groups = stratify(records, strata)
+        keys = list(groups)
+        # Each stratum is drawn in a fixed random order, chunk after chunk
+        orders = [rng.permutation(groups[key]) for key in keys]
+        sizes = np.array([len(order) for order in orders], dtype=np.int64)
+        drawn = np.zeros(len(keys), dtype=np.int64)
+        estimator = StratifiedEstimator(dict(zip(keys, sizes.tolist())), confidence)
+        limit = population if max_samples is None else min(max_samples, population)
+        
+        profiler = self.profiler
+        profiler.reset()
+        start = time.perf_counter()
+        history = []
+        reason = 'exhausted'
+        
+        with profiler.run():
+            while drawn.sum() < limit:
+                budget = min(chunk_size, limit - int(drawn.sum()))
+                with profiler.stage('allocate'):
+                    # Two rows per stratum are needed before its variance exists
+                    counts = allocate(budget, sizes, drawn, minimum=min(2, budget // max(1, len(keys))))
+                    rows = []
+                    for h, count in enumerate(counts):
+                        rows.extend(orders[h][drawn[h]:drawn[h] + count].tolist())
+                    drawn += counts
+                
+                n = len(rows)
+                predictions = [records[i][prediction_key] for i in rows]
+                references = [records[i][reference_key] for i in rows]
+                required_keywords = [records[i].get(keywords_key) for i in rows]
+                with profiler.stage('score', n):
+                    columns = self._score_all(predictions, references, required_keywords)
+                with profiler.stage('overall_score', n):
+                    columns['overall_score'] = self._overall_scores(columns, n)
+                
+                with profiler.stage('estimate', n):
+                    # Rows were gathered stratum by stratum, so each stratum is one slice
+                    bounds = np.concatenate(([0], np.cumsum(counts)))
+                    for h in np.flatnonzero(counts):
+                        estimator.update(keys[h], {metric: values[bounds[h]:bounds[h + 1]]
+                                                   for metric, values in columns.items()})
+                    overall = estimator.estimate('overall_score')
+                
+                used = int(drawn.sum())
+                history.append({'samples': used, 'overall_mean': overall['mean'],
+                                'half_width': overall['half_width']})
+                if used >= min_samples and overall['half_width'] <= target_half_width:
+                    reason = 'target_reached'
+                    break
+            else:
+                if limit < population:
+                    reason = 'max_samples'
+            if drawn.sum() == population:
+                # Every row was scored: the estimate is the full-run mean
+                reason = 'exhausted'
+            elapsed = time.perf_counter() - start
+        
+        used = int(drawn.sum())
+        profiler.add('evaluate_sampled', elapsed, used)
+        
+        estimates = estimator.estimates()
+        results = {
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'total_samples': used,
+                'metrics_used': list(self.metrics_config.keys()),
+                'weights': dict(self.weights),
+                'sampling': {
+                    'population': population,
+                    'samples_used': used,
+                    'fraction': used / population if population else 0.0,
+                    'stopped': reason,
+                    'target_half_width': target_half_width,
+                    'confidence': confidence,
+                    'strata_fields': list(strata),
+                    'strata': [{'key': list(key), 'population': int(size), 'sampled': int(count)}
+                               for key, size, count in zip(keys, sizes, drawn)],
+                    'history': history
+                },
+                'profile': profiler.summary()
+            },
+            'estimate': {
+                ('overall' if metric == 'overall_score' else metric): estimate
+                for metric, estimate in estimates.items()
+            },
+            'aggregate': {}
+        }
+        for metric, estimate in results['estimate'].items():
+            results['aggregate'][f'{metric}_mean'] = estimate['mean']
+        
+        if compare_to is not None:
+            full = compare_to.get('aggregate', compare_to)
+            results['comparison'] = {
+                metric: {
+                    'estimate': estimate['mean'],
+                    'full': full[f'{metric}_mean'],
+                    'error': estimate['mean'] - full[f'{metric}_mean'],
+                    'within_ci': bool(estimate['ci_low'] <= full[f'{metric}_mean'] <= estimate['ci_high'])
+                }
+                for metric, estimate in results['estimate'].items() if f'{metric}_mean' in full
+            }
+        
+        if self._relevance is not None:
+            self._relevance.flush_cache()
+        self.results = results
+        return results
+    
+    def evaluate_candidates(self, references: List[Union[str, List[str]]], candidates: Dict[str, List[str]],
+                            sample_ids: Optional[List[Any]] = None,
+                            required_keywords: Optional[List[Optional[List[str]]]] = None,
+                            chunk_size: int = 5000, output_dir: Optional[str] = None,
+                            output_format: str = 'jsonl') -> Dict[str, Any]:
+        """
+        Evaluate several models' predictions against one reference set.
+        
+        Samples are processed in chunks. Per chunk, references are
+        preprocessed and embedded once, then every candidate is scored
+        against them, so adding a model costs only its own predictions.
+        Each candidate goes through the evaluate_batch scoring path (pair
+        dedup, score cache, multi-reference reduction). With a score cache
+        references are not embedded up front, so cached rows never touch
+        the model.
+        Aggregates use running statistics and match what evaluate_batch
+        gives for each model alone (semantic scores up to float32 noise).
+        
+        Args:
+            references: Reference answers, shared by every candidate. An
+                entry may be a list of acceptable references; chunks holding
+                one are scored through _score_multi (reduced per
+                reference_reduce) and share only the embedding cache.
+            candidates: model_name -> predictions aligned with references.
+            chunk_size: Samples per chunk; bounds embedding and text memory.
+            output_dir: If set, each model's per-sample results are written to
+                <output_dir>/<model_name>.<output_format> ('jsonl' or
+                'evalcols') instead of being kept in memory.
+        
+        Returns:
+            {'metadata': ..., 'models': {name: {'aggregate': ..., 'per_sample'
+            or 'per_sample_path': ...}}, 'comparison': [one row per model,
+            best overall_mean first]}
+        """
+        n = len(references)
+        for name, predictions in candidates.items():
+            if len(predictions) != n:
+                raise ValueError(f"Candidate '{name}' has {len(predictions)} predictions for {n} references")
+        if output_format not in ('jsonl', 'evalcols'):
+            raise ValueError(f"output_format must be 'jsonl' or 'evalcols', got {output_format!r}")
+        
+        if sample_ids is None:
+            sample_ids = [f"sample_{i}" for i in range(n)]
+        
+        results = {
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'total_samples': n,
+                'models': list(candidates),
+                'metrics_used': list(self.metrics_config.keys()),
+                'weights': dict(self.weights),
+                'chunk_size': chunk_size
+            },
+            'models': {},
+            'comparison': []
+        }
+        
+        writers, per_sample = {}, {}
+        if output_dir:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            for name in candidates:
+                filename = re.sub(r'[^\w.-]+', '_', name)
+                path = output_dir / f"{filename}.{output_format}"
+                writers[name] = (ColumnarResultWriter(path) if output_format == 'evalcols'
+                                 else open(path, 'w', encoding='utf-8'))
+                results['models'][name] = {'per_sample_path': str(path)}
+        else:
+            per_sample = {name: [] for name in candidates}
+        
+        running = {name: {} for name in candidates}
+        dedup_stats = {}
+        lexical = any(metric in self.metrics_config for metric in LEXICAL_METRICS)
+        semantic = 'semantic_similarity' in self.metrics_config
+        profiler = self.profiler
+        profiler.reset()
+        start = time.perf_counter()
+        
+        try:
+            with profiler.run():
+                for chunk_start in range(0, n, chunk_size):
+                    refs = references[chunk_start:chunk_start + chunk_size]
+                    ids = sample_ids[chunk_start:chunk_start + chunk_size]
+                    keywords = (required_keywords[chunk_start:chunk_start + chunk_size]
+                                if required_keywords is not None else None)
+                    m = len(refs)
+                    multi = not all(isinstance(r, str) for r in refs)
+                    
+                    # The shared side: every candidate reuses these
+                    with profiler.stage('reference_preprocess', m):
+                        processed = ([CorrectnessMetrics.preprocess(r, cache=True) for r in refs]
+                                     if lexical and not multi else refs)
+                    reference_embeddings = None
+                    # With a score cache, encode only the rows it misses (inside _score_all)
+                    if semantic and not multi and self.score_cache is None:
+                        with profiler.stage('reference_encode', m):
+                            index = {}
+                            rows = [index.setdefault(text, len(index)) for text in refs]
+                            reference_embeddings = self.relevance.encode(list(index))[rows]
+                    
+                    for name, predictions in candidates.items():
+                        preds = predictions[chunk_start:chunk_start + chunk_size]
+                        with profiler.stage('score', m):
+                            # Same path as evaluate_batch: pair dedup, score cache, multi-reference
+                            columns = self._score_all(preds, refs if multi else processed, keywords,
+                                                      dedup_stats, reference_embeddings=reference_embeddings)
+                        with profiler.stage('overall_score', m):
+                            columns['overall_score'] = self._overall_scores(columns, m)
+                        with profiler.stage('aggregate', m):
+                            for metric, values in columns.items():
+                                running[name].setdefault(metric, RunningStats()).update(values)
+                        
+                        with profiler.stage('per_sample', m):
+                            samples = self._per_sample_results(columns, preds, refs, ids)
+                            writer = writers.get(name)
+                            if writer is None:
+                                per_sample[name].extend(samples)
+                            elif output_format == 'evalcols':
+                                writer.write_samples(samples)
+                            else:
+                                for sample in samples:
+                                    writer.write(json.dumps(sample, ensure_ascii=False) + '\n')
+                elapsed = time.perf_counter() - start
+            
+            for name in candidates:
+                aggregate = {}
+                for metric, stats in running[name].items():
+                    prefix = 'overall' if metric == 'overall_score' else metric
+                    for stat, value in stats.summary().items():
+                        aggregate[f'{prefix}_{stat}'] = value
+                model_results = results['models'].setdefault(name, {})
+                model_results['aggregate'] = aggregate
+                if name in per_sample:
+                    model_results['per_sample'] = per_sample[name]
+        finally:
+            for name, writer in writers.items():
+                if output_format == 'evalcols':
+                    metadata = dict(results['metadata'], model=name, total_samples=n)
+                    writer.close(metadata, results['models'][name].get('aggregate', {}))
+                else:
+                    writer.close()
+        
+        results['comparison'] = self._comparison_table(results['models'])
+        profiler.add('evaluate_candidates', elapsed, n * len(candidates))
+        if dedup_stats:
+            results['metadata']['dedup'] = self._dedup_summary(dedup_stats)
+        if self._relevance is not None and self._relevance.cache is not None:
+            self._relevance.flush_cache()
+            results['metadata']['embedding_cache'] = self._relevance.cache.stats()
+        if self.score_cache is not None:
+            results['metadata']['score_cache'] = self.score_cache.stats()
+        results['metadata']['profile'] = profiler.summary()
         
         self.results = results
         return results
     
+    @staticmethod
+    def _comparison_table(models: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One row of mean scores per model, ranked by overall_mean."""
+        rows = []
+        for name, model_results in models.items():
+            aggregate = model_results.get('aggregate', {})
+            row = {'model': name}
+            row.update({key: value for key, value in aggregate.items() if key.endswith('_mean')})
+            row['overall_std'] = aggregate.get('overall_std')
+            rows.append(row)
+        rows.sort(key=lambda row: row.get('overall_mean', 0.0), reverse=True)
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+        return rows
+    
+    @staticmethod
+    def print_comparison(results: Dict[str, Any]):
+        """Print the cross-model table from evaluate_candidates."""
+        rows = results['comparison']
+        if not rows:
+            print("No candidates evaluated.")
+            return
+        
+        metrics = [key for key in rows[0] if key.endswith('_mean')]
+        print("=" * 60)
+        print("MODEL COMPARISON")
+        print("=" * 60)
+        print(f"Samples per model: {results['metadata']['total_samples']}")
+        header = f"{'rank':>4s}  {'model':24s}" + "".join(f"{m[:-5][:14]:>15s}" for m in metrics)
+        print(header)
+        print("-" * len(header))
+        for row in rows:
+            print(f"{row['rank']:4d}  {row['model'][:24]:24s}"
+                  + "".join(f"{row[m]:15.3f}" for m in metrics))
+    
+    @staticmethod
+    def _chunked(records: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+        """Yield lists of up to chunk_size items from any iterable."""
+        iterator = iter(records)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _score_all(self, predictions: List[str], references: List[Union[str, ProcessedText, List[str]]],
+                   required_keywords: Optional[List[Optional[List[str]]]] = None,
+                   dedup_stats: Optional[Dict[str, int]] = None,
+                   metrics_config: Optional[Dict[str, Any]] = None,
+                   reference_embeddings: Optional[np.ndarray] = None) -> Dict[str, List[float]]:
+        """
+        Score columns for a whole batch.
+        
+        Identical (prediction, reference, keywords) rows are scored once and
+        their scores fanned back out. With a score cache, the distinct rows
+        are handled in checkpoint_every-sized chunks committed as they finish.
+        Rows whose reference is a list of references go through _score_multi.
+        
+        Args:
+            dedup_stats: Optional counters dict; pair and embedded-text counts
+                are added to it.
+            metrics_config: Subset of metrics to compute; defaults to all enabled.
+            reference_embeddings: Already encoded references, one row per
+                sample (see _score_columns); references may then be
+                preprocessed ProcessedText values.
+        """
+        if not all(isinstance(reference, (str, ProcessedText)) for reference in references):
+            return self._score_multi(predictions, references, required_keywords, dedup_stats, metrics_config)
+        
+        n = len(predictions)
+        with self.profiler.stage('dedup', n):
+            keyword_keys = ([tuple(k) if k is not None else None for k in required_keywords]
+                            if required_keywords is not None else [None] * n)
+            raw_references = [reference.raw if isinstance(reference, ProcessedText) else reference
+                              for reference in references]
+            index = {}
+            inverse = [index.setdefault(key, len(index))
+                       for key in zip(predictions, raw_references, keyword_keys)]
+            
+            if len(index) < n:
+                first = [0] * len(index)
+                for i in range(n - 1, -1, -1):
+                    first[inverse[i]] = i
+                predictions = [predictions[i] for i in first]
+                references = [references[i] for i in first]
+                if required_keywords is not None:
+                    required_keywords = [required_keywords[i] for i in first]
+                if reference_embeddings is not None:
+                    reference_embeddings = reference_embeddings[first]
+        
+        relevance = self._relevance
+        before = (relevance.texts_requested, relevance.texts_encoded) if relevance is not None else (0, 0)
+        
+        if self.score_cache is None:
+            columns = self._score_columns(predictions, references, required_keywords, metrics_config,
+                                          reference_embeddings=reference_embeddings)
+        else:
+            columns = {}
+            step = self.checkpoint_every
+            for start in range(0, len(predictions), step):
+                chunk_columns = self._score_columns_cached(
+                    predictions[start:start + step], references[start:start + step],
+                    required_keywords[start:start + step] if required_keywords is not None else None,
+                    metrics_config,
+                    reference_embeddings[start:start + step] if reference_embeddings is not None else None
+                )
+                for metric, values in chunk_columns.items():
+                    columns.setdefault(metric, []).extend(values)
+        
+        if dedup_stats is not None:
+            relevance = self._relevance
+            after = (relevance.texts_requested, relevance.texts_encoded) if relevance is not None else (0, 0)
+            for key, value in (('total_pairs', n), ('unique_pairs', len(index)),
+                               ('embedded_texts', after[0] - before[0]),
+                               ('unique_embedded_texts', after[1] - before[1])):
+                dedup_stats[key] = dedup_stats.get(key, 0) + value
+        
+        if len(index) < n:
+            with self.profiler.stage('dedup_fan_out', n):
+                columns = {metric: [values[j] for j in inverse] for metric, values in columns.items()}
+        return columns
+    
+    def _score_multi(self, predictions: List[str], references: List[List[str]],
+                     required_keywords: Optional[List[Optional[List[str]]]] = None,
+                     dedup_stats: Optional[Dict[str, int]] = None,
+                     metrics_config: Optional[Dict[str, Any]] = None) -> Dict[str, List[float]]:
+        """
+        Score samples with several references each, reduced per metric.
+        
+        References are laid out ragged: one flat list plus offsets, sample i
+        owning flat rows offsets[i]:offsets[i + 1]. Every (prediction,
+        reference) row is scored by _score_all, which encodes each distinct
+        text of the batch once (a prediction repeated over its references
+        included), and each metric is then reduced per sample with a segment
+        max or mean (reference_reduce).
+        
+        With 'max', a sample whose prediction exactly matches one reference
+        already has fuzzy_match and fuzzy_similarity 1.0, so those are not
+        computed for its other references.
+        """
+        if metrics_config is None:
+            metrics_config = self.metrics_config
+        references = [[reference] if isinstance(reference, str) else list(reference)
+                      for reference in references]
+        
+        n = len(predictions)
+        with self.profiler.stage('reference_layout', n):
+            counts = np.fromiter((len(refs) for refs in references), dtype=np.int64, count=n)
+            if n and counts.min() == 0:
+                raise ValueError(f"Sample {int(np.argmin(counts))} has no references")
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            owner = np.repeat(np.arange(n), counts)
+            flat_references = [reference for refs in references for reference in refs]
+            flat_predictions = [predictions[i] for i in owner]
+            flat_keywords = ([required_keywords[i] for i in owner]
+                             if required_keywords is not None else None)
+        
+        skippable = []
+        if self.reference_reduce == 'max' and 'exact_match' in metrics_config:
+            skippable = [m for m in ('fuzzy_match', 'fuzzy_similarity') if m in metrics_config]
+            # A threshold above 1 fails even identical texts
+            if metrics_config.get('fuzzy_match', {}).get('threshold', 0.7) > 1.0:
+                skippable = [m for m in skippable if m != 'fuzzy_match']
+        
+        first = {m: c for m, c in metrics_config.items() if m not in skippable}
+        flat = {metric: np.asarray(values, dtype=np.float64) for metric, values in
+                self._score_all(flat_predictions, flat_references, flat_keywords, dedup_stats, first).items()}
+        
+        if skippable:
+            matched = np.maximum.reduceat(flat['exact_match'], offsets[:-1]) == 1.0 if n else np.zeros(0, bool)
+            rows = np.flatnonzero(~matched[owner])
+            if len(rows):
+                rest = self._score_all(
+                    [flat_predictions[i] for i in rows], [flat_references[i] for i in rows],
+                    [flat_keywords[i] for i in rows] if flat_keywords is not None else None,
+                    metrics_config={m: metrics_config[m] for m in skippable}
+                )
+            for metric in skippable:
+                # Matched samples' rows stay 1.0: their maximum is already decided
+                column = np.ones(len(owner), dtype=np.float64)
+                if len(rows):
+                    column[rows] = rest[metric]
+                flat[metric] = column
+        
+        with self.profiler.stage('reference_reduce', n):
+            columns = {}
+            for metric in LEXICAL_METRICS + ('semantic_similarity',):
+                if metric not in flat:
+                    continue
+                if not n:
+                    columns[metric] = []
+                elif self.reference_reduce == 'max':
+                    columns[metric] = np.maximum.reduceat(flat[metric], offsets[:-1]).tolist()
+                else:
+                    columns[metric] = (np.add.reduceat(flat[metric], offsets[:-1]) / counts).tolist()
+        return columns
+    
+    @staticmethod
+    def _dedup_summary(dedup_stats: Dict[str, int]) -> Dict[str, Any]:
+        """dedup_stats plus the fraction of rows and texts that were not recomputed."""
+        summary = dict(dedup_stats)
+        total = summary.get('total_pairs', 0)
+        texts = summary.get('embedded_texts', 0)
+        summary['dedup_ratio'] = 1 - summary['unique_pairs'] / total if total else 0.0
+        summary['text_dedup_ratio'] = 1 - summary['unique_embedded_texts'] / texts if texts else 0.0
+        return summary
+    
+    def _score_columns_cached(self, predictions: List[str], references: List[Union[str, ProcessedText]],
+                              required_keywords: Optional[List[Optional[List[str]]]] = None,
+                              metrics_config: Optional[Dict[str, Any]] = None,
+                              reference_embeddings: Optional[np.ndarray] = None) -> Dict[str, List[float]]:
+        """_score_columns that only computes rows missing from the score cache."""
+        cache = self.score_cache
+        if metrics_config is None:
+            metrics_config = self.metrics_config
+        metrics = [m for m in LEXICAL_METRICS + ('semantic_similarity',) if m in metrics_config]
+        raw_references = [reference.raw if isinstance(reference, ProcessedText) else reference
+                          for reference in references]
+        pair_digests = cache.pair_digests(predictions, raw_references)
+        keyword_digests = (cache.pair_digests(predictions, raw_references, required_keywords)
+                           if required_keywords is not None else pair_digests)
+        
+        columns, digests, fingerprints = {}, {}, {}
+        with self.profiler.stage('score_cache_lookup', len(predictions)):
+            for metric in metrics:
+                model_name = self.relevance.encoding_key if metric == 'semantic_similarity' else None
+                fingerprints[metric] = cache.metric_fingerprint(metric, metrics_config[metric], model_name)
+                digests[metric] = keyword_digests if metric == 'keyword_match' else pair_digests
+                columns[metric] = cache.get_many(fingerprints[metric], digests[metric])
+        
+        missing = sorted({i for values in columns.values() for i, v in enumerate(values) if v is None})
+        if missing:
+            stale = {m: metrics_config[m] for m in metrics if any(v is None for v in columns[m])}
+            computed = self._score_columns(
+                [predictions[i] for i in missing], [references[i] for i in missing],
+                [required_keywords[i] for i in missing] if required_keywords is not None else None,
+                metrics_config=stale,
+                reference_embeddings=reference_embeddings[missing] if reference_embeddings is not None else None
+            )
+            with self.profiler.stage('score_cache_write', len(missing)):
+                for metric, values in computed.items():
+                    new_rows = [(i, v) for i, v in zip(missing, values) if columns[metric][i] is None]
+                    for i, v in new_rows:
+                        columns[metric][i] = v
+                    cache.put_many(fingerprints[metric], [digests[metric][i] for i, _ in new_rows],
+                                   [v for _, v in new_rows])
+                cache.checkpoint()
+        
+        return columns
+    
+    def _score_columns(self, predictions: List[str], references: List[str],
+                       required_keywords: Optional[List[Optional[List[str]]]] = None,
+                       metrics_config: Optional[Dict[str, Any]] = None,
+                       reference_embeddings: Optional[np.ndarray] = None) -> Dict[str, List[float]]:
+        """
+        Compute each enabled metric as a column over aligned predictions/references.
+        Produces the same values as evaluate_single does row by row.
+        
+        Args:
+            metrics_config: Subset of metrics to compute; defaults to all enabled.
+            reference_embeddings: Already encoded references (one row per
+                sample); semantic_similarity then only encodes predictions.
+        """
+        if metrics_config is None:
+            metrics_config = self.metrics_config
+        
+        n = len(predictions)
+        if self.num_workers > 1 and n > self.chunk_size:
+            # Workers can't report per-metric stages; time the pool as a whole
+            with self.profiler.stage('lexical_parallel', n):
+                columns = self.correctness.parallel_score_columns(
+                    predictions, references, metrics_config,
+                    self._get_executor(), chunk_size=self.chunk_size,
+                    required_keywords=required_keywords
+                )
+        else:
+            columns = self.correctness.score_columns(
+                predictions, references, metrics_config, required_keywords,
+                profiler=self.profiler
+            )
+        
+        if 'semantic_similarity' in metrics_config:
+            with self.profiler.stage('semantic_similarity', n):
+                if reference_embeddings is not None:
+                    columns['semantic_similarity'] = self.relevance.scores_against(
+                        predictions, reference_embeddings
+                    )
+                else:
+                    raw_references = [reference.raw if isinstance(reference, ProcessedText) else reference
+                                      for reference in references]
+                    columns['semantic_similarity'] = self.relevance.batch_semantic_similarity(
+                        predictions, raw_references
+                    )['scores']
+        
+        return columns
+    
+    @staticmethod
+    def _per_sample_results(columns: Dict[str, List[float]], predictions: List[str],
+                            references: List[str], sample_ids: List[Any]) -> List[Dict[str, Any]]:
+        """Turn score columns back into evaluate_single-shaped per-sample dicts."""
+        return [
+            {
+                'sample_id': sid,
+                'prediction': pred,
+                'reference': ref,
+                'scores': {metric: values[i] for metric, values in columns.items()}
+            }
+            for i, (pred, ref, sid) in enumerate(zip(predictions, references, sample_ids))
+        ]
+    
+    def _overall_score(self, scores: Dict[str, float]) -> float:
+        """Weighted average of the weighted metrics present in scores."""
+        weights = self.weights
+        valid = [k for k in scores if k in weights]
+        if not valid:
+            return 0.0
+        total_weight = sum(weights[k] for k in valid)
+        return sum(scores[k] * weights[k] for k in valid) / total_weight
+    
+    def _overall_scores(self, columns: Dict[str, List[float]], n: int) -> List[float]:
+        """Vectorized _overall_score over score columns (same summation order)."""
+        return weighted_overall(columns, self.weights, n).tolist()
+    
+    @staticmethod
+    def _aggregate(columns: Dict[str, List[float]]) -> Dict[str, float]:
+        """Mean/std/min/max per metric column plus the overall_* block."""
+        aggregate = {}
+        for metric, values in columns.items():
+            prefix = 'overall' if metric == 'overall_score' else metric
+            values = np.asarray(values, dtype=np.float64)
+            aggregate[f'{prefix}_mean'] = float(np.mean(values))
+            aggregate[f'{prefix}_std'] = float(np.std(values))
+            aggregate[f'{prefix}_min'] = float(np.min(values))
+            aggregate[f'{prefix}_max'] = float(np.max(values))
+        return aggregate
+    
     def save_results(self, results: Dict[str, Any], output_path: str):
         """
         Save evaluation results to JSON file.
+        
+        A path ending in '.evalcols' is written in the columnar format
+        instead (typed score columns, compressed text, see src/storage.py).
         """
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
+        if is_columnar(output_path):
+            save_columnar(results, output_path)
+            print(f"Results saved to {output_path}")
+            return
+        
         # Use UTF-8 encoding
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(results, f, indent=2, default=lambda x: float(x) if isinstance(x, np.floating) else x)
         
         print(f"Results saved to {output_path}")
     
+    @staticmethod
+    def load_results(path: str) -> Dict[str, Any]:
+        """Load results saved by save_results (JSON or columnar) in the evaluate_batch shape."""
+        if is_columnar(path):
+            return ColumnarResults(path).to_results()
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     def print_summary(self):
         """Print a clean summary of results."""
         if not self.results:
             print("No results available. Run evaluate_batch() first.")
             return
+        if 'models' in self.results:
+            # evaluate_candidates: one aggregate block per model
+            self.print_comparison(self.results)
+            return
         
         print("=" * 60)
         print("LLM EVALUATION SUMMARY")
@@ -173,8 +1236,32 @@ class LLMEvaluator:
         for key, value in self.results['aggregate'].items():
             if 'mean' in key:
                 metric_name = key.replace('_mean', '')
-                print(f"{metric_name:20s}: {value:.3f} "
-                      f"(±{self.results['aggregate'].get(f'{metric_name}_std', 0):.3f})")
+                std = self.results['aggregate'].get(f'{metric_name}_std')
+                # Sampled runs estimate means only
+                print(f"{metric_name:20s}: {value:.3f}" + (f" (±{std:.3f})" if std is not None else ""))
+        
+        groups = self.results.get('groups')
+        if groups:
+            confidence = self.results['metadata'].get('bootstrap', {}).get('confidence')
+            for column, entries in groups.items():
+                print(f"\nOVERALL SCORE BY {column.upper()}"
+                      + (f" ({confidence:.0%} bootstrap CI):" if confidence else ":"))
+                print("-" * 40)
+                for label, entry in entries.items():
+                    interval = (f" [{entry['overall_ci_low']:.3f}, {entry['overall_ci_high']:.3f}]"
+                                if 'overall_ci_low' in entry else "")
+                    print(f"{label:20s}: {entry['overall_mean']:.3f}{interval} (n={entry['count']})")
+        
+        sampling = self.results['metadata'].get('sampling')
+        if sampling:
+            overall = self.results['estimate']['overall']
+            print(f"\nSampled {sampling['samples_used']} of {sampling['population']} rows "
+                  f"({sampling['stopped']}); overall_mean {sampling['confidence']:.0%} CI "
+                  f"[{overall['ci_low']:.3f}, {overall['ci_high']:.3f}]")
+        
+        if 'per_sample' not in self.results:
+            # Streaming runs keep per-sample results on disk only
+            return
         
         print("\nTOP PERFORMING SAMPLES:")
         print("-" * 40)
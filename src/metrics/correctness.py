@@ -1,6 +1,41 @@
 import Levenshtein
 import re
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, NamedTuple, Optional, Union
+from concurrent.futures import Executor
+
+from .keywords import STOP_WORDS, keyword_terms, get_matcher
+from ..profiling import Profiler, null_stage
+
+# Metrics computed by CorrectnessMetrics (pure CPU, no model)
+LEXICAL_METRICS = ('exact_match', 'fuzzy_match', 'fuzzy_similarity', 'keyword_match')
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+class ProcessedText(NamedTuple):
+    """Every lexical view of a text, computed once and shared by all lexical metrics."""
+    raw: str
+    stripped: str      # raw.strip(), for exact_match(normalize=False)
+    lower: str         # raw.lower()
+    normalized: str    # normalize_text(raw)
+    tokens: List[str]  # lower.split()
+    terms: List[str]   # tokens with edge punctuation trimmed, for keyword_match
+
+# A text argument may be a plain string or an already preprocessed one
+Text = Union[str, ProcessedText]
+
+def _preprocess(text: str) -> ProcessedText:
+    lower = text.lower()
+    normalized = _WHITESPACE_RE.sub(' ', _PUNCTUATION_RE.sub('', lower.strip()))
+    tokens = lower.split()
+    return ProcessedText(text, text.strip(), lower, normalized, tokens, keyword_terms(tokens))
+
+# References are typically scored against many predictions; memoize their side.
+# An entry holds the text several times over (views plus token lists), so keep
+# the count small: a stream of long distinct references would otherwise grow
+# the cache to gigabytes before evicting anything.
+_preprocess_cached = lru_cache(maxsize=2048)(_preprocess)
 
 class CorrectnessMetrics:
     """Metrics for factual correctness against a reference."""
@@ -9,58 +44,242 @@ class CorrectnessMetrics:
     def normalize_text(text: str) -> str:
         """Normalize text for comparison: lowercase, remove extra spaces/punctuation."""
         text = text.lower().strip()
-        text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
-        text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
+        text = _PUNCTUATION_RE.sub('', text)  # Remove punctuation
+        text = _WHITESPACE_RE.sub(' ', text)  # Normalize whitespace
         return text
     
     @staticmethod
-    def exact_match(prediction: str, reference: str, normalize: bool = True) -> float:
+    def preprocess(text: Text, cache: bool = False) -> ProcessedText:
+        """
+        Build the shared lexical representation of a text.
+        
+        Args:
+            cache: Memoize the result; use for reference-side texts that
+                repeat across many predictions.
+        """
+        if isinstance(text, ProcessedText):
+            return text
+        return _preprocess_cached(text) if cache else _preprocess(text)
+    
+    @staticmethod
+    def exact_match(prediction: Text, reference: Text, normalize: bool = True) -> float:
         """
         Returns 1.0 if prediction exactly matches reference.
         
         Args:
             normalize: If True, normalize text before comparison
         """
+        pred = CorrectnessMetrics.preprocess(prediction)
+        ref = CorrectnessMetrics.preprocess(reference, cache=True)
         if normalize:
-            pred_norm = CorrectnessMetrics.normalize_text(prediction)
-            ref_norm = CorrectnessMetrics.normalize_text(reference)
-            return 1.0 if pred_norm == ref_norm else 0.0
+            return 1.0 if pred.normalized == ref.normalized else 0.0
         else:
-            return 1.0 if prediction.strip() == reference.strip() else 0.0
+            return 1.0 if pred.stripped == ref.stripped else 0.0
+    
+    @staticmethod
+    def max_edit_distance(threshold: float, max_len: int) -> int:
+        """
+        Largest edit distance d with 1 - d / max_len >= threshold.
+        
+        Evaluated with the same float expression fuzzy_match uses, so the
+        bounded check takes exactly the same decisions as the full one.
+        Returns -1 when even identical strings would fail the threshold.
+        """
+        k = min(max_len, max(0, int((1 - threshold) * max_len)))
+        while k < max_len and 1 - ((k + 1) / max_len) >= threshold:
+            k += 1
+        while k >= 0 and not 1 - (k / max_len) >= threshold:
+            k -= 1
+        return k
     
     @staticmethod
-    def fuzzy_match(prediction: str, reference: str, threshold: float = 0.8) -> float:
+    def fuzzy_match(prediction: Text, reference: Text, threshold: float = 0.8) -> float:
         """
         Returns 1.0 if normalized Levenshtein similarity >= threshold.
+        
+        The distance is never computed in full: pairs whose length difference
+        already exceeds the allowed edit budget are rejected immediately, and
+        the rest use a cutoff distance that stops once the budget is spent.
         """
-        pred_norm = CorrectnessMetrics.normalize_text(prediction)
-        ref_norm = CorrectnessMetrics.normalize_text(reference)
+        pred_norm = CorrectnessMetrics.preprocess(prediction).normalized
+        ref_norm = CorrectnessMetrics.preprocess(reference, cache=True).normalized
         
         if len(ref_norm) == 0:
             return 1.0 if len(pred_norm) == 0 else 0.0
         
-        distance = Levenshtein.distance(pred_norm, ref_norm)
-        similarity = 1 - (distance / max(len(pred_norm), len(ref_norm)))
+        max_len = max(len(pred_norm), len(ref_norm))
+        max_distance = CorrectnessMetrics.max_edit_distance(threshold, max_len)
         
-        return 1.0 if similarity >= threshold else 0.0
+        if abs(len(pred_norm) - len(ref_norm)) > max_distance:
+            return 0.0
+        
+        distance = Levenshtein.distance(pred_norm, ref_norm, score_cutoff=max_distance)
+        return 1.0 if distance <= max_distance else 0.0
     
     @staticmethod
-    def keyword_match(prediction: str, reference: str, required_keywords: List[str] = None) -> float:
+    def fuzzy_similarity(prediction: Text, reference: Text) -> float:
+        """
+        Continuous normalized Levenshtein similarity (0 to 1), the quantity
+        fuzzy_match thresholds.
+        """
+        pred_norm = CorrectnessMetrics.preprocess(prediction).normalized
+        ref_norm = CorrectnessMetrics.preprocess(reference, cache=True).normalized
+        
+        if len(ref_norm) == 0:
+            return 1.0 if len(pred_norm) == 0 else 0.0
+        
+        distance = Levenshtein.distance(pred_norm, ref_norm)
+        return 1 - (distance / max(len(pred_norm), len(ref_norm)))
+    
+    @staticmethod
+    def keyword_match(prediction: Text, reference: Text, required_keywords: List[str] = None,
+                      match_mode: str = 'token') -> float:
         """
         Check if prediction contains key factual words from reference.
         Returns proportion of required keywords found.
+        
+        Args:
+            required_keywords: Keywords to look for; auto-extracted from the
+                reference (non-stop-words longer than 2 chars) when None.
+            match_mode: 'token' matches whole tokens (multi-word keywords as
+                whole phrases); 'substring' reproduces the legacy
+                `keyword in prediction.lower()` check.
         """
+        pred = CorrectnessMetrics.preprocess(prediction)
+        ref_text = reference.raw if isinstance(reference, ProcessedText) else reference
+        
+        if match_mode == 'token':
+            return get_matcher(ref_text, required_keywords).score(pred.terms)
+        
+        if match_mode != 'substring':
+            raise ValueError(f"Unknown keyword match_mode: {match_mode}")
+        
         if required_keywords is None:
-            # Auto-extract keywords (simple version: nouns/important words)
-            words = set(reference.lower().split())
-            # Filter out common words
-            stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-            required_keywords = [w for w in words if w not in stop_words and len(w) > 2]
+            words = set(CorrectnessMetrics.preprocess(reference, cache=True).tokens)
+            required_keywords = [w for w in words if w not in STOP_WORDS and len(w) > 2]
         
         if not required_keywords:
             return 1.0  # No specific keywords to check
         
-        pred_lower = prediction.lower()
-        matches = sum(1 for keyword in required_keywords if keyword in pred_lower)
+        matches = sum(1 for keyword in required_keywords if keyword in pred.lower)
+        
+        return matches / len(required_keywords)
+    
+    @staticmethod
+    def batch_exact_match(predictions: List[Text], references: List[Text], normalize: bool = True) -> List[float]:
+        """Column-wise exact_match over aligned predictions/references."""
+        return [CorrectnessMetrics.exact_match(p, r, normalize=normalize)
+                for p, r in zip(predictions, references)]
+    
+    @staticmethod
+    def batch_fuzzy_match(predictions: List[Text], references: List[Text], threshold: float = 0.8) -> List[float]:
+        """Column-wise fuzzy_match over aligned predictions/references."""
+        return [CorrectnessMetrics.fuzzy_match(p, r, threshold=threshold)
+                for p, r in zip(predictions, references)]
+    
+    @staticmethod
+    def batch_fuzzy_similarity(predictions: List[Text], references: List[Text]) -> List[float]:
+        """Column-wise fuzzy_similarity over aligned predictions/references."""
+        return [CorrectnessMetrics.fuzzy_similarity(p, r)
+                for p, r in zip(predictions, references)]
+    
+    @staticmethod
+    def batch_keyword_match(predictions: List[Text], references: List[Text],
+                            required_keywords: Optional[List[Optional[List[str]]]] = None,
+                            match_mode: str = 'token') -> List[float]:
+        """
+        Column-wise keyword_match over aligned predictions/references.
+        required_keywords, if given, holds one keyword list (or None) per sample.
+        """
+        if required_keywords is None:
+            required_keywords = [None] * len(predictions)
+        return [CorrectnessMetrics.keyword_match(p, r, required_keywords=k, match_mode=match_mode)
+                for p, r, k in zip(predictions, references, required_keywords)]
+    
+    @staticmethod
+    def score_columns(predictions: List[str], references: List[str],
+                      metrics_config: Dict[str, Dict[str, Any]],
+                      required_keywords: Optional[List[Optional[List[str]]]] = None,
+                      profiler: Optional[Profiler] = None) -> Dict[str, List[float]]:
+        """
+        Compute every enabled lexical metric as a column.
+        Non-lexical entries of metrics_config are ignored.
+        
+        Args:
+            profiler: Optional Profiler; preprocessing and each metric are timed
+                as separate stages.
+        """
+        columns = {}
+        if not any(metric in metrics_config for metric in LEXICAL_METRICS):
+            return columns
+        
+        stage = profiler.stage if profiler is not None else null_stage
+        n = len(predictions)
+        
+        # Preprocess each pair once; every lexical metric below reuses it
+        with stage('preprocess', n):
+            predictions = [CorrectnessMetrics.preprocess(p) for p in predictions]
+            references = [CorrectnessMetrics.preprocess(r, cache=True) for r in references]
+        
+        if 'exact_match' in metrics_config:
+            config = metrics_config['exact_match']
+            with stage('exact_match', n):
+                columns['exact_match'] = CorrectnessMetrics.batch_exact_match(
+                    predictions, references,
+                    normalize=config.get('normalize', True)
+                )
         
-        return matches / len(required_keywords)
\ No newline at end of file
+        if 'fuzzy_match' in metrics_config:
+            config = metrics_config['fuzzy_match']
+            with stage('fuzzy_match', n):
+                columns['fuzzy_match'] = CorrectnessMetrics.batch_fuzzy_match(
+                    predictions, references,
+                    threshold=config.get('threshold', 0.7)
+                )
+        
+        if 'fuzzy_similarity' in metrics_config:
+            with stage('fuzzy_similarity', n):
+                columns['fuzzy_similarity'] = CorrectnessMetrics.batch_fuzzy_similarity(predictions, references)
+        
+        if 'keyword_match' in metrics_config:
+            config = metrics_config['keyword_match']
+            with stage('keyword_match', n):
+                columns['keyword_match'] = CorrectnessMetrics.batch_keyword_match(
+                    predictions, references,
+                    required_keywords=required_keywords,
+                    match_mode=config.get('match_mode', 'token')
+                )
+        
+        return columns
+    
+    @staticmethod
+    def parallel_score_columns(predictions: List[str], references: List[str],
+                               metrics_config: Dict[str, Dict[str, Any]],
+                               executor: Executor, chunk_size: int = 2000,
+                               required_keywords: Optional[List[Optional[List[str]]]] = None) -> Dict[str, List[float]]:
+        """
+        score_columns distributed over an executor (e.g. a ProcessPoolExecutor).
+        
+        Rows are split into contiguous chunks and reassembled with
+        Executor.map, so the output order is the input order regardless of
+        which worker finishes first.
+        """
+        lexical_config = {m: c for m, c in metrics_config.items() if m in LEXICAL_METRICS}
+        columns = {m: [] for m in LEXICAL_METRICS if m in lexical_config}
+        
+        tasks = [
+            (predictions[start:start + chunk_size], references[start:start + chunk_size], lexical_config,
+             required_keywords[start:start + chunk_size] if required_keywords is not None else None)
+            for start in range(0, len(predictions), chunk_size)
+        ]
+        for chunk_columns in executor.map(_score_columns_task, tasks):
+            for metric, values in chunk_columns.items():
+                columns[metric].extend(values)
+        
+        return columns
+
+
+def _score_columns_task(task):
+    """Top-level (picklable) worker entry point for parallel_score_columns."""
+    predictions, references, metrics_config, required_keywords = task
+    return CorrectnessMetrics.score_columns(predictions, references, metrics_config, required_keywords)
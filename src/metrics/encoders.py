@@ -0,0 +1,211 @@
+"""
+Encoder backends for semantic similarity.
+
+    torch       full-precision PyTorch (the reference)
+    torch-int8  torch dynamic quantization: Linear weights stored as int8,
+                activations quantized on the fly; no calibration data needed
+    onnx        ONNX Runtime via sentence-transformers' ONNX backend; the
+                model is exported on first load unless it ships an ONNX file
+                (needs onnxruntime and optimum)
+
+Reduced-precision backends move scores slightly. Check the drift against
+torch on your own data before switching:
+
+    python -m src.metrics.encoders --model all-MiniLM-L6-v2 --backend torch-int8
+    python -m src.metrics.encoders --model /path/to/model --backend onnx --data pairs.json
+"""
+import argparse
+import json
+import sys
+import time
+import warnings
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+ENCODER_BACKENDS = ('torch', 'torch-int8', 'onnx')
+
+def load_encoder(model_name: str, backend: str = 'torch', onnx_file: Optional[str] = None):
+    """
+    Load a SentenceTransformer running on the given backend.
+
+    Args:
+        onnx_file: For backend='onnx', the ONNX file inside the model
+            directory to use (e.g. 'onnx/model_qint8_avx512.onnx').
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'; choose from {list(ENCODER_BACKENDS)}")
+
+    from sentence_transformers import SentenceTransformer
+
+    if backend == 'onnx':
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "The 'onnx' encoder backend needs onnxruntime and optimum: "
+                "pip install 'llm-evaluation-toolkit[onnx]'"
+            ) from e
+        model_kwargs = {'file_name': onnx_file} if onnx_file else None
+        return SentenceTransformer(model_name, backend='onnx', model_kwargs=model_kwargs)
+
+    model = SentenceTransformer(model_name)
+    if backend == 'torch-int8':
+        import torch
+        with warnings.catch_warnings():
+            # Eager-mode quantization still works but warns about its move to torchao
+            warnings.simplefilter('ignore', DeprecationWarning)
+            warnings.simplefilter('ignore', UserWarning)
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+def split_windows(model, texts: List[str], window_overlap: int = 32):
+    """
+    Split texts longer than the model's max_seq_length into overlapping windows.
+
+    Windows hold at most capacity tokens (max_seq_length less the special
+    tokens) and start every capacity - window_overlap tokens; the last one
+    holds whatever remains, so it can be shorter.
+
+    Returns (segments, owners, weights): the texts to encode, the input
+    row each segment belongs to and its token count. owners and weights
+    are None when no text needs splitting.
+    """
+    texts = list(texts)
+    tokenizer = model.tokenizer
+    capacity = model.max_seq_length - tokenizer.num_special_tokens_to_add()
+    # A token never spans less than one UTF-8 byte, so shorter texts fit as they are
+    candidates = [i for i, text in enumerate(texts) if len(text.encode('utf-8')) > capacity]
+    if not candidates:
+        return texts, None, None
+
+    encoding = tokenizer(
+        [texts[i] for i in candidates], add_special_tokens=False, return_offsets_mapping=True,
+        return_attention_mask=False, return_token_type_ids=False, verbose=False
+    )
+    long_rows = {i: offsets for i, offsets in zip(candidates, encoding['offset_mapping'])
+                 if len(offsets) > capacity}
+    if not long_rows:
+        return texts, None, None
+
+    stride = max(1, capacity - window_overlap)
+    segments, owners, weights = [], [], []
+    for i, text in enumerate(texts):
+        offsets = long_rows.get(i)
+        if offsets is None:
+            segments.append(text)
+            owners.append(i)
+            weights.append(1.0)
+            continue
+
+        count = len(offsets)
+        start = 0
+        while True:
+            end = min(start + capacity, count)
+            segments.append(text[offsets[start][0]:offsets[end - 1][1]])
+            owners.append(i)
+            weights.append(float(end - start))
+            if end == count:
+                break
+            start += stride
+
+    return segments, np.asarray(owners), np.asarray(weights)
+
+def encode_texts(model, texts: List[str], batch_size: int = 64, long_text: str = 'truncate',
+                 window_overlap: int = 32) -> np.ndarray:
+    """
+    Encode texts into a (len(texts), dim) float32 array.
+
+    Args:
+        long_text: 'window' averages the embeddings of overlapping windows
+            (weighted by their token counts) for texts past max_seq_length;
+            'truncate' leaves them to the model, which keeps the first
+            max_seq_length tokens.
+    """
+    if long_text == 'window':
+        segments, owners, weights = split_windows(model, texts, window_overlap)
+    else:
+        segments, owners, weights = list(texts), None, None
+    # encode() already sorts by length before batching (windows included),
+    # so each forward pass pads little; sorting here as well would gain nothing
+    vectors = model.encode(segments, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    if owners is None:
+        return vectors
+
+    # Mean of each text's windows weighted by their token counts
+    pooled = np.zeros((len(texts), vectors.shape[1]), dtype=np.float64)
+    np.add.at(pooled, owners, vectors * weights[:, None])
+    pooled /= np.bincount(owners, weights=weights, minlength=len(texts))[:, None]
+    return pooled.astype(np.float32)
+
+def score_drift(model_name: str, backend: str, predictions: List[str], references: List[str],
+                onnx_file: Optional[str] = None, tolerance: float = 0.02) -> Dict[str, Any]:
+    """
+    Compare semantic similarity scores of `backend` against torch (fp32).
+
+    Returns drift statistics (absolute score differences), the rank
+    correlation between the two score lists, throughput of both backends,
+    and whether the largest drift is within `tolerance`.
+    """
+    from .relevance import RelevanceMetrics
+
+    scores, rates = {}, {}
+    for name in ('torch', backend):
+        relevance = RelevanceMetrics(model_name=model_name, backend=name,
+                                     onnx_file=onnx_file if name == 'onnx' else None)
+        relevance.encode(predictions[:2])
+        start = time.perf_counter()
+        scores[name] = np.asarray(relevance.batch_semantic_similarity(predictions, references)['scores'])
+        rates[name] = 2 * len(predictions) / (time.perf_counter() - start)
+
+    drift = np.abs(scores[backend] - scores['torch'])
+    ranks = [np.argsort(np.argsort(s, kind='stable'), kind='stable') for s in (scores['torch'], scores[backend])]
+    rank_correlation = float(np.corrcoef(ranks)[0, 1]) if len(drift) > 1 else 1.0
+    return {
+        'model_name': model_name,
+        'backend': backend,
+        'pairs': len(drift),
+        'max_abs_drift': float(drift.max()) if len(drift) else 0.0,
+        'mean_abs_drift': float(drift.mean()) if len(drift) else 0.0,
+        'p99_abs_drift': float(np.percentile(drift, 99)) if len(drift) else 0.0,
+        'mean_score_shift': float((scores[backend] - scores['torch']).mean()) if len(drift) else 0.0,
+        'rank_correlation': rank_correlation,
+        'texts_per_second': {'torch': rates['torch'], backend: rates[backend]},
+        'speedup': rates[backend] / rates['torch'],
+        'tolerance': tolerance,
+        'within_tolerance': bool(len(drift) == 0 or drift.max() <= tolerance)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Report semantic score drift of an encoder backend versus torch.")
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help="Sentence-transformer name or local path")
+    parser.add_argument('--backend', default='torch-int8', choices=ENCODER_BACKENDS)
+    parser.add_argument('--onnx-file', default=None)
+    parser.add_argument('--data', default=None,
+                        help="JSON list of {prediction, reference} (default: synthetic reference set)")
+    parser.add_argument('--samples', type=int, default=1000, help="Synthetic reference set size")
+    parser.add_argument('--tolerance', type=float, default=0.02, help="Largest acceptable absolute drift")
+    parser.add_argument('--output', default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    from ..datasets import DatasetLoader
+
+    if args.data:
+        items = DatasetLoader.load_json(args.data)
+        predictions = [item['prediction'] for item in items]
+        references = [item.get('reference', item.get('reference_answer')) for item in items]
+    else:
+        items = DatasetLoader.create_synthetic_dataset(args.samples)
+        predictions = [item['prediction'] for item in items]
+        references = [item['reference_answer'] for item in items]
+
+    report = score_drift(args.model, args.backend, predictions, references,
+                         onnx_file=args.onnx_file, tolerance=args.tolerance)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if not report['within_tolerance']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Multi-process sentence encoding for CPU-only machines.
+
+One SentenceTransformer process stops scaling well past a few torch threads.
+EncoderPool instead runs several worker processes, each loading the model
+once and running with its own (smaller) intra-op thread count. Texts are
+sorted by length and split into contiguous shards; each worker writes its embeddings straight
+into a shared-memory float32 array, so only the texts and a row offset
+cross the process boundary, never the tensors.
+
+Workers are spawned, not forked, so scripts that enable the pool (directly
+or via semantic_similarity.encode_workers) need the usual
+`if __name__ == "__main__":` guard.
+
+    with EncoderPool('all-MiniLM-L6-v2', num_workers=4) as pool:
+        embeddings = pool.encode(texts)
+
+See benchmarks/bench_encode_pool.py for throughput against in-process encode.
+"""
+import math
+import os
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+import numpy as np
+
+from .encoders import encode_texts, load_encoder
+
+# Per-worker state, set once by _init_worker
+_worker_model = None
+_worker_long_text = ('truncate', 0)
+_worker_buffers = {}
+
+def _init_worker(model_name: str, threads: int, backend: str, onnx_file: Optional[str],
+                 long_text: str, window_overlap: int):
+    global _worker_model, _worker_long_text
+    import torch
+    torch.set_num_threads(threads)
+    _worker_model = load_encoder(model_name, backend, onnx_file)
+    _worker_long_text = (long_text, window_overlap)
+
+def _worker_dim() -> int:
+    model = _worker_model
+    dimension = getattr(model, 'get_embedding_dimension', None) or model.get_sentence_embedding_dimension
+    return dimension()
+
+def _worker_encode(task) -> int:
+    shm_name, capacity, dim, start, texts, batch_size = task
+
+    # Attach to the parent's buffer once per buffer, not once per shard
+    buffer = _worker_buffers.get(shm_name)
+    if buffer is None:
+        for old in _worker_buffers.values():
+            old[0].close()
+        _worker_buffers.clear()
+        shm = SharedMemory(name=shm_name)
+        buffer = _worker_buffers[shm_name] = (shm, np.ndarray((capacity, dim), dtype=np.float32, buffer=shm.buf))
+
+    out = buffer[1]
+    long_text, window_overlap = _worker_long_text
+    out[start:start + len(texts)] = encode_texts(_worker_model, texts, batch_size=batch_size,
+                                                 long_text=long_text, window_overlap=window_overlap)
+    return len(texts)
+
+class EncoderPool:
+    """Pool of encoder processes writing into one shared-memory array."""
+
+    def __init__(self, model_name: str, num_workers: int, threads_per_worker: Optional[int] = None,
+                 batch_size: int = 64, shards_per_worker: int = 2, backend: str = 'torch',
+                 onnx_file: Optional[str] = None, long_text: str = 'truncate',
+                 window_overlap: int = 32):
+        """
+        Args:
+            num_workers: Encoder processes; each holds its own copy of the model.
+            threads_per_worker: torch intra-op threads per worker. Defaults to
+                an even split of the machine's cores.
+            batch_size: Forward-pass batch size inside a worker.
+            shards_per_worker: Shards per worker per encode() call; more
+                shards balance uneven text lengths, fewer cut overhead.
+            backend, onnx_file: Encoder backend each worker loads (see encoders).
+            long_text, window_overlap: Long-text handling, applied inside the
+                workers (see encoders.encode_texts), so the parent process
+                never needs the model or its tokenizer.
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+
+        self.model_name = model_name
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        self.batch_size = batch_size
+        self.shards_per_worker = shards_per_worker
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.long_text = long_text
+        self.window_overlap = window_overlap
+
+        self._pool = None
+        self._shm = None
+        self._capacity = 0
+        self.dim = None
+
+    def __enter__(self) -> 'EncoderPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """Start the workers and load the model in each (done lazily by encode)."""
+        if self._pool is not None:
+            return
+        # spawn: forking a process that already holds torch threads is unsafe
+        self._pool = get_context('spawn').Pool(
+            self.num_workers, initializer=_init_worker,
+            initargs=(self.model_name, self.threads_per_worker, self.backend, self.onnx_file,
+                      self.long_text, self.window_overlap)
+        )
+        self.dim = self._pool.apply(_worker_dim)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into a (len(texts), dim) float32 array, in input order."""
+        self.start()
+        n = len(texts)
+        if n == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        self._ensure_capacity(n)
+        # encode() only sorts within one call, i.e. within a shard; sorting
+        # before sharding keeps short and long texts out of the same shard
+        order = sorted(range(n), key=lambda i: len(texts[i]))
+        shard_size = max(1, math.ceil(n / (self.num_workers * self.shards_per_worker)))
+        tasks = [
+            (self._shm.name, self._capacity, self.dim, start,
+             [texts[i] for i in order[start:start + shard_size]], self.batch_size)
+            for start in range(0, n, shard_size)
+        ]
+        written = sum(self._pool.imap_unordered(_worker_encode, tasks))
+        if written != n:
+            raise RuntimeError(f"Encoder workers wrote {written} of {n} embeddings")
+
+        # Scatter back to input order; this also copies out of the reused buffer
+        view = np.ndarray((self._capacity, self.dim), dtype=np.float32, buffer=self._shm.buf)
+        embeddings = np.empty((n, self.dim), dtype=np.float32)
+        embeddings[order] = view[:n]
+        return embeddings
+
+    def close(self):
+        """Stop the workers and release the shared buffer."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self._capacity = 0
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+        capacity = max(rows, 2 * self._capacity, 1024)
+        self._shm = SharedMemory(create=True, size=capacity * self.dim * 4)
+        self._capacity = capacity
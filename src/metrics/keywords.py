@@ -0,0 +1,131 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Common words ignored when keywords are extracted from a reference
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'
+})
+
+_EDGE_PUNCTUATION_RE = re.compile(r'^\W+|\W+$')
+
+def keyword_terms(lower_tokens: Iterable[str]) -> List[str]:
+    """Lowercase whitespace tokens with leading/trailing punctuation trimmed."""
+    terms = []
+    for token in lower_tokens:
+        if token[0].isalnum() and token[-1].isalnum():
+            terms.append(token)
+            continue
+        term = _EDGE_PUNCTUATION_RE.sub('', token)
+        if term:
+            terms.append(term)
+    return terms
+
+class KeywordMatcher:
+    """
+    Keywords of one reference (or one caller-supplied list), compiled once.
+
+    Single-word keywords are matched by hashed token-set membership, so
+    'art' no longer matches inside 'start'. Multi-word keywords are matched
+    as whole token sequences with an Aho-Corasick automaton built over
+    tokens, which scans the prediction once regardless of how many phrases
+    there are.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        phrases = []
+        seen = set()
+        for keyword in keywords:
+            phrase = tuple(keyword_terms(keyword.lower().split()))
+            if phrase and phrase not in seen:
+                seen.add(phrase)
+                phrases.append(phrase)
+
+        self.keywords = [' '.join(phrase) for phrase in phrases]
+        self.single = frozenset(phrase[0] for phrase in phrases if len(phrase) == 1)
+        self.phrases = [phrase for phrase in phrases if len(phrase) > 1]
+        self._goto, self._fail, self._output = self._build_automaton(self.phrases)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    @classmethod
+    def from_reference_terms(cls, terms: Iterable[str]) -> 'KeywordMatcher':
+        """Auto-extract keywords: distinct non-stop-word terms longer than 2 chars."""
+        return cls(t for t in dict.fromkeys(terms) if t not in STOP_WORDS and len(t) > 2)
+
+    def count(self, terms: List[str]) -> int:
+        """Number of distinct keywords present in a tokenized prediction."""
+        found = len(self.single.intersection(terms)) if self.single else 0
+        if self.phrases:
+            found += len(self._scan(terms))
+        return found
+
+    def score(self, terms: List[str]) -> float:
+        """Proportion of keywords found; 1.0 when there are none to check."""
+        if not self.keywords:
+            return 1.0
+        return self.count(terms) / len(self.keywords)
+
+    def _scan(self, terms: List[str]) -> Set[int]:
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        matched = set()
+        for term in terms:
+            while node and term not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(term, 0)
+            if output[node]:
+                matched |= output[node]
+        return matched
+
+    @staticmethod
+    def _build_automaton(phrases: List[Tuple[str, ...]]):
+        goto: List[Dict[str, int]] = [{}]
+        fail = [0]
+        output: List[Set[int]] = [set()]
+
+        # Trie over token sequences
+        for phrase_id, phrase in enumerate(phrases):
+            node = 0
+            for term in phrase:
+                child = goto[node].get(term)
+                if child is None:
+                    goto.append({})
+                    fail.append(0)
+                    output.append(set())
+                    child = len(goto) - 1
+                    goto[node][term] = child
+                node = child
+            output[node].add(phrase_id)
+
+        # Failure links, breadth first
+        queue = list(goto[0].values())
+        for node in queue:
+            for term, child in goto[node].items():
+                state = fail[node]
+                while state and term not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(term, 0)
+                output[child] |= output[fail[child]]
+                queue.append(child)
+
+        return goto, fail, output
+
+# Matchers for long references carry a goto/fail automaton over all their
+# terms; a small entry count bounds memory on streams of distinct references
+@lru_cache(maxsize=2048)
+def reference_matcher(reference: str) -> KeywordMatcher:
+    """KeywordMatcher auto-extracted from a reference, built once per distinct reference."""
+    return KeywordMatcher.from_reference_terms(keyword_terms(reference.lower().split()))
+
+@lru_cache(maxsize=2048)
+def keywords_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """KeywordMatcher for a caller-supplied keyword list (as a tuple, for caching)."""
+    return KeywordMatcher(keywords)
+
+def get_matcher(reference: str, required_keywords: Optional[Iterable[str]] = None) -> KeywordMatcher:
+    """Matcher for a sample: its required_keywords if given, else the reference's keywords."""
+    if required_keywords is None:
+        return reference_matcher(reference)
+    return keywords_matcher(tuple(required_keywords))
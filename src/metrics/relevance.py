@@ -1,40 +1,228 @@
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
+from typing import List, Optional
+
+from ..cache import EmbeddingCache
+from ..profiling import Profiler, null_stage
+from .encoders import ENCODER_BACKENDS, encode_texts, load_encoder
+from .encoding_pool import EncoderPool
 
 class RelevanceMetrics:
     """Metrics for semantic relevance, not just lexical overlap."""
-    
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', batch_size: int = 64,
+                 cache: Optional[EmbeddingCache] = None, profiler: Optional[Profiler] = None,
+                 encode_workers: int = 1, threads_per_worker: Optional[int] = None,
+                 long_text: str = 'window', window_overlap: int = 32, encode_batch_size: int = 64,
+                 backend: str = 'torch', onnx_file: Optional[str] = None):
         """
-        Initialize the sentence transformer model.
+        Configure the sentence transformer model; it is loaded lazily.
         'all-MiniLM-L6-v2' is small but effective for English.
+
+        Args:
+            batch_size: Pairs scored per cosine chunk in
+                batch_semantic_similarity; distinct texts go to encode() in
+                calls of 2 * batch_size.
+            cache: Optional EmbeddingCache; cached texts are never re-encoded.
+                New entries are persisted by flush_cache() or close().
+            profiler: Optional Profiler for model load / encode / cosine stages.
+            encode_workers: Encoder processes (EncoderPool); 1 encodes in-process.
+                Pays off only when each encode call carries enough texts, so
+                raise batch_size along with it.
+            threads_per_worker: torch intra-op threads per encoder process.
+            long_text: 'window' splits texts longer than the model's
+                max_seq_length into overlapping windows and averages their
+                embeddings (weighted by token count); 'truncate' keeps only
+                the first max_seq_length tokens, as the model itself does.
+                Windowing costs one forward pass per window.
+            window_overlap: Tokens shared by consecutive windows.
+            encode_batch_size: Texts per forward pass. Texts are sorted by
+                length first, so each forward pass pads very little.
+            backend: 'torch', 'torch-int8' or 'onnx' (see metrics.encoders);
+                check score drift with `python -m src.metrics.encoders`.
+            onnx_file: ONNX file within the model directory for backend='onnx'.
+        """
+        if backend not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown encoder backend '{backend}'; choose from {list(ENCODER_BACKENDS)}")
+        if long_text not in ('window', 'truncate'):
+            raise ValueError(f"long_text must be 'window' or 'truncate', got {long_text!r}")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = cache
+        self.profiler = profiler
+        self._model = None
+        self.long_text = long_text
+        self.window_overlap = window_overlap
+        self.encode_batch_size = encode_batch_size
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self._pool = None
+        if encode_workers > 1:
+            self._pool = EncoderPool(model_name, encode_workers, threads_per_worker=threads_per_worker,
+                                     batch_size=encode_batch_size, backend=backend, onnx_file=onnx_file,
+                                     long_text=long_text, window_overlap=window_overlap)
+
+        # Texts passed to batch_semantic_similarity vs distinct texts encoded
+        self.texts_requested = 0
+        self.texts_encoded = 0
+
+    @property
+    def model(self):
+        """The SentenceTransformer on the chosen backend, loaded on first use."""
+        if self._model is None:
+            with self._stage('model_load'):
+                self._model = load_encoder(self.model_name, self.backend, self.onnx_file)
+        return self._model
+
+    @property
+    def encoding_key(self) -> str:
+        """Model name plus the settings that change embeddings (cache key)."""
+        key = self.model_name
+        if self.backend != 'torch':
+            key += f"@{self.backend}" + (f":{self.onnx_file}" if self.onnx_file else "")
+        if self.long_text == 'window':
+            key += f"@window{self.window_overlap}"
+        return key
+
+    def flush_cache(self):
+        """
+        Persist the embedding cache, if any.
+
+        The cache rewrites its whole index on flush, so callers flush once
+        per run (LLMEvaluator does at the end of each batch, stream and on
+        close), never per encode call.
+        """
+        if self.cache is not None:
+            self.cache.flush()
+
+    def close(self):
+        """Persist the embedding cache and stop the encoder processes, if any."""
+        self.flush_cache()
+        if self._pool is not None:
+            self._pool.close()
+
+    def _stage(self, name: str, samples: int = 0):
+        return self.profiler.stage(name, samples) if self.profiler is not None else null_stage(name)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into a (len(texts), dim) float32 array."""
+        if self.cache is None:
+            return self._encode(texts)
+
+        vectors = self.cache.get_many(texts)
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(texts[i], []).append(i)
+
+        if missing:
+            # Only texts the cache has never seen reach the model
+            new_texts = list(missing)
+            new_vectors = self._encode(new_texts)
+            self.cache.put_many(new_texts, new_vectors)
+            for text, vector in zip(new_texts, new_vectors):
+                for i in missing[text]:
+                    vectors[i] = vector
+
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self._pool is not None and self._pool.dim is None:
+            with self._stage('model_load'):
+                self._pool.start()
+
+        with self._stage('encode', len(texts)):
+            if self._pool is not None:
+                # Workers window long texts themselves; the parent never loads the model
+                return self._pool.encode(texts)
+            return encode_texts(self.model, texts, batch_size=self.encode_batch_size,
+                                long_text=self.long_text, window_overlap=self.window_overlap)
+
+    @staticmethod
+    def paired_cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Row-wise cosine similarity between a[i] and b[i].
+        Only the diagonal is computed, never the full N x N matrix.
         """
-        self.model = SentenceTransformer(model_name)
-    
+        # Same eps as util.cos_sim (torch.nn.functional.normalize)
+        a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+        b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+        return np.einsum('ij,ij->i', a, b)
+
     def semantic_similarity(self, prediction: str, reference: str) -> float:
         """
         Returns cosine similarity between embedding vectors (0 to 1).
         """
-        embeddings = self.model.encode([prediction, reference], convert_to_tensor=True)
-        similarity = util.cos_sim(embeddings[0], embeddings[1]).item()
-        return max(0.0, min(1.0, similarity))  # Clamp to [0, 1]
-    
-    def batch_semantic_similarity(self, predictions: list, references: list) -> dict:
+        return self.batch_semantic_similarity([prediction], [reference])['scores'][0]
+
+    def _encode_unique(self, texts: list, batch_size: int):
+        """
+        Encode each distinct text once, in encode() calls of at most
+        2 * batch_size distinct texts.
+
+        Returns (embeddings, rows): one embedding per distinct text and, for
+        every input text, the row of its embedding.
+        """
+        index = {}
+        rows = np.fromiter((index.setdefault(text, len(index)) for text in texts),
+                           dtype=np.int64, count=len(texts))
+        distinct = list(index)
+        step = 2 * batch_size
+        embeddings = [self.encode(distinct[start:start + step]) for start in range(0, len(distinct), step)]
+        self.texts_requested += len(rows)
+        self.texts_encoded += len(distinct)
+        embeddings = np.concatenate(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+        return embeddings, rows
+
+    def batch_semantic_similarity(self, predictions: list, references: list,
+                                  batch_size: int = None) -> dict:
         """
         Calculate semantic similarity for a batch.
+
+        Every distinct text of the batch, prediction or reference, is encoded
+        exactly once (in chunks of 2 * batch_size distinct texts), however
+        many pairs share it. Each score is clamped to [0, 1], exactly as
+        semantic_similarity does.
         Returns: {"semantic_similarity": float, "scores": list}
         """
-        # Encode all at once for efficiency
-        all_texts = predictions + references
-        embeddings = self.model.encode(all_texts, convert_to_tensor=True)
-        
-        pred_embeddings = embeddings[:len(predictions)]
-        ref_embeddings = embeddings[len(predictions):]
-        
-        similarities = util.cos_sim(pred_embeddings, ref_embeddings)
-        scores = [similarities[i, i].item() for i in range(len(predictions))]
-        
+        if len(predictions) != len(references):
+            raise ValueError("Predictions and references must have the same length")
+
+        batch_size = batch_size or self.batch_size
+        n = len(predictions)
+        embeddings, rows = self._encode_unique(list(predictions) + list(references), batch_size)
+
+        scores = []
+        # Gather pairs chunk by chunk so only the distinct embeddings are held whole
+        for start in range(0, n, batch_size):
+            stop = min(start + batch_size, n)
+            sims = self.paired_cosine(embeddings[rows[start:stop]], embeddings[rows[n + start:n + stop]])
+            scores.extend(float(s) for s in np.clip(sims, 0.0, 1.0))
+
+
         return {
-            "semantic_similarity": np.mean(scores) if scores else 0.0,
+            "semantic_similarity": float(np.mean(scores)) if scores else 0.0,
             "scores": scores
-        }
\ No newline at end of file
+        }
+
+    def scores_against(self, predictions: list, reference_embeddings: np.ndarray,
+                       batch_size: int = None) -> list:
+        """
+        Semantic similarity of each prediction against an already encoded
+        reference (row i of reference_embeddings, e.g. from encode()).
+
+        Lets many candidate prediction sets share one reference encoding.
+        Distinct predictions are encoded once each. Scores are clamped to
+        [0, 1] like batch_semantic_similarity.
+        """
+        if len(predictions) != len(reference_embeddings):
+            raise ValueError("Predictions and reference embeddings must have the same length")
+
+        batch_size = batch_size or self.batch_size
+        embeddings, rows = self._encode_unique(list(predictions), batch_size)
+        scores = []
+        for start in range(0, len(predictions), batch_size):
+            sims = self.paired_cosine(embeddings[rows[start:start + batch_size]],
+                                      reference_embeddings[start:start + batch_size])
+            scores.extend(float(s) for s in np.clip(sims, 0.0, 1.0))
+
+        return scores
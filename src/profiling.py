@@ -0,0 +1,227 @@
+"""
+Lightweight stage instrumentation for evaluation runs.
+
+A Profiler collects, per named stage, wall time, call count and samples
+processed, plus process-wide peak RSS. Memory tracing (tracemalloc) and
+cProfile are opt-in because both slow the code they observe. Per-sample
+latencies go into a fixed log-spaced histogram, so memory use does not grow
+with the number of samples.
+"""
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+# Histogram bucket upper edges in seconds: 10us .. 100s on a 1-2-5 series
+LATENCY_EDGES = np.array([m * 10.0 ** e for e in range(-5, 2) for m in (1, 2, 5)] + [100.0])
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, if the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return int(peak if sys.platform == 'darwin' else peak * 1024)
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return int(getattr(info, 'peak_wset', info.rss))
+
+def null_stage(name: str, samples: int = 0):
+    """Stand-in for Profiler.stage when no profiler is attached."""
+    return nullcontext()
+
+class Profiler:
+    """
+    Per-stage wall time, call counts, throughput and memory.
+
+    Stages nest; each stage's time includes its children. With
+    trace_memory=True, tracemalloc runs for the profiler's lifetime and each
+    stage records the peak traced allocation above its starting point.
+    """
+
+    def __init__(self, trace_memory: bool = False, cprofile_path: Optional[str] = None):
+        """
+        Args:
+            trace_memory: Record per-stage peak Python allocations (tracemalloc).
+            cprofile_path: If set, run() collects cProfile data and dumps it here.
+        """
+        self.trace_memory = trace_memory
+        self.cprofile_path = cprofile_path
+        self.stages = {}
+        self.latency_counts = np.zeros(len(LATENCY_EDGES) + 1, dtype=np.int64)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._stack = []
+        self._cprofile = None
+        self._cprofile_top = None
+        self._started_tracing = False
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def reset(self):
+        """Clear collected stats (tracemalloc, if on, keeps running)."""
+        self.stages = {}
+        self.latency_counts[:] = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._cprofile_top = None
+
+    @contextmanager
+    def stage(self, name: str, samples: int = 0):
+        """Time a block of work that processes `samples` samples."""
+        frame = self._enter()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._exit(name, samples, time.perf_counter() - start, frame)
+
+    def add(self, name: str, seconds: float, samples: int = 0, calls: int = 1):
+        """Record time measured elsewhere (e.g. inside a hot loop)."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = {'seconds': 0.0, 'calls': 0, 'samples': 0}
+        stats['seconds'] += seconds
+        stats['calls'] += calls
+        stats['samples'] += samples
+
+    def record_latency(self, seconds: float, count: int = 1):
+        """Add `count` samples of one per-sample latency to the histogram."""
+        self.latency_counts[np.searchsorted(LATENCY_EDGES, seconds)] += count
+        self.latency_total += seconds * count
+        self.latency_max = max(self.latency_max, seconds)
+
+    @contextmanager
+    def run(self):
+        """Wrap a whole evaluation; collects cProfile data when enabled."""
+        if self.cprofile_path is None:
+            yield
+            return
+
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+        try:
+            yield
+        finally:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile_top = self._top_functions(self._cprofile)
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def summary(self) -> Dict[str, Any]:
+        """Profile block for results['metadata']['profile']."""
+        stages = {}
+        for name, stats in self.stages.items():
+            entry = dict(stats)
+            entry['samples_per_second'] = (stats['samples'] / stats['seconds']
+                                           if stats['samples'] and stats['seconds'] else None)
+            stages[name] = entry
+
+        profile = {'stages': stages, 'peak_rss_bytes': peak_rss_bytes()}
+        if self.trace_memory and tracemalloc.is_tracing():
+            profile['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+
+        count = int(self.latency_counts.sum())
+        if count:
+            profile['latency_histogram'] = {
+                'count': count,
+                'mean_seconds': self.latency_total / count,
+                'max_seconds': self.latency_max,
+                # Upper edge of each bucket; the last bucket is open-ended
+                'bucket_le_seconds': LATENCY_EDGES.tolist() + [None],
+                'counts': self.latency_counts.tolist()
+            }
+
+        if self._cprofile_top is not None:
+            profile['cprofile'] = {'path': str(self.cprofile_path), 'top': self._cprofile_top}
+        return profile
+
+    def _enter(self) -> Optional[List[int]]:
+        if not self.trace_memory:
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        # Hand the peak so far to the enclosing stages before resetting it
+        for parent in self._stack:
+            parent[1] = max(parent[1], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        frame = [current, current]
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, name: str, samples: int, seconds: float, frame: Optional[List[int]]):
+        self.add(name, seconds, samples)
+        if frame is None:
+            return
+
+        self._stack.pop()
+        peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+        for parent in self._stack:
+            parent[1] = max(parent[1], peak)
+        stats = self.stages[name]
+        stats['peak_traced_bytes'] = max(stats.get('peak_traced_bytes', 0), peak - frame[0])
+
+    @staticmethod
+    def _top_functions(profile: cProfile.Profile, limit: int = 20) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'tottime': tottime,
+                'cumtime': cumtime
+            })
+        rows.sort(key=lambda row: row['cumtime'], reverse=True)
+        return rows[:limit]
+
+def format_profile(profile: Dict[str, Any]) -> List[str]:
+    """Markdown lines for a profile block (used by ReportGenerator)."""
+    lines = ["| Stage | Calls | Seconds | Samples/s | Peak traced MB |",
+             "|-------|-------|---------|-----------|----------------|"]
+    for name, stats in profile.get('stages', {}).items():
+        rate = stats.get('samples_per_second')
+        traced = stats.get('peak_traced_bytes')
+        lines.append(
+            f"| {name} | {stats['calls']} | {stats['seconds']:.4f} | "
+            f"{f'{rate:,.0f}' if rate else '-'} | "
+            f"{f'{traced / 2 ** 20:.1f}' if traced is not None else '-'} |"
+        )
+
+    if profile.get('peak_rss_bytes'):
+        lines.append("")
+        lines.append(f"Peak RSS: {profile['peak_rss_bytes'] / 2 ** 20:.1f} MB")
+
+    histogram = profile.get('latency_histogram')
+    if histogram:
+        lines.append("")
+        lines.append(f"Per-sample latency: mean {histogram['mean_seconds'] * 1000:.3f} ms, "
+                     f"max {histogram['max_seconds'] * 1000:.3f} ms over {histogram['count']} samples")
+        lines.append("")
+        lines.append("| Latency <= | Samples |")
+        lines.append("|------------|---------|")
+        for edge, count in zip(histogram['bucket_le_seconds'], histogram['counts']):
+            if count:
+                label = f"{edge * 1000:g} ms" if edge is not None else "> 100 s"
+                lines.append(f"| {label} | {count} |")
+    return lines
@@ -0,0 +1,343 @@
+"""
+Re-weight stored results without rescoring.
+
+overall_score is a weighted average of per-metric scores, so it can be
+recomputed from stored score columns under any weights. A single weighting
+re-derives overall_score and the aggregate block exactly as evaluate_batch
+would have; a sweep evaluates many weight vectors at once as one matrix
+product over the (rows x metrics) score matrix, in row chunks.
+
+    python -m src.reweight data/results/eval.json --weights exact_match=0.5,semantic_similarity=0.5
+    python -m src.reweight data/results/eval.evalcols --config configs/eval.yaml --output reweighted.json
+    python -m src.reweight data/results/eval.evalcols --weights exact_match=1 --output reweighted.evalcols
+    python -m src.reweight data/results/eval.evalcols --sweep-step 0.1 --top 10
+"""
+import argparse
+import itertools
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .storage import ColumnarResults, is_columnar, save_columnar
+
+# Elements of the (rows x weight vectors) block held at once during a sweep
+SWEEP_BLOCK_ELEMENTS = 1 << 24
+
+def weighted_overall(columns: Dict[str, Any], weights: Dict[str, float], n: int) -> np.ndarray:
+    """
+    Per-row weighted average of the weighted metric columns.
+
+    Columns are accumulated one at a time in column order, so the result is
+    bit-identical to summing each row's scores in Python. NaN marks a score a
+    row does not have; that row is averaged over the metrics it does have.
+    """
+    valid = [k for k in columns if k in weights]
+    if not valid:
+        return np.zeros(n)
+
+    total = np.zeros(n)
+    total_weight = np.zeros(n)
+    for k in valid:
+        values = np.asarray(columns[k], dtype=np.float64)
+        present = ~np.isnan(values)
+        total = total + np.where(present, values, 0.0) * weights[k]
+        total_weight = total_weight + np.where(present, weights[k], 0.0)
+    return np.divide(total, total_weight, out=np.zeros(n), where=total_weight > 0)
+
+def load_score_matrix(results: Union[str, Dict[str, Any], ColumnarResults],
+                      metrics: Optional[List[str]] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    (rows, metrics) float64 score matrix of stored results, NaN where missing.
+
+    Args:
+        results: A results dict, a ColumnarResults, or a path to either format.
+            Columnar score columns are read straight from their memory maps.
+        metrics: Columns to load; every metric except overall_score if None.
+    """
+    if isinstance(results, str):
+        results = ColumnarResults(results) if is_columnar(results) else _load_json(results)
+
+    if isinstance(results, ColumnarResults):
+        if metrics is None:
+            metrics = [m for m in results.score_columns if m != 'overall_score']
+        return results.score_matrix(metrics), metrics
+
+    per_sample = results.get('per_sample')
+    if per_sample is None:
+        raise ValueError("Results have no per-sample scores (streamed to disk?); load the per-sample file")
+    if metrics is None:
+        metrics = list(dict.fromkeys(
+            m for sample in per_sample for m in sample['scores'] if m != 'overall_score'
+        ))
+    matrix = np.empty((len(per_sample), len(metrics)), dtype=np.float64)
+    for j, metric in enumerate(metrics):
+        matrix[:, j] = [sample['scores'].get(metric, np.nan) for sample in per_sample]
+    return matrix, metrics
+
+def reaggregate(results: Union[str, Dict[str, Any], ColumnarResults],
+                weights: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Recompute overall_score and the aggregate block under new weights.
+
+    Returns a results dict in the evaluate_batch shape. Per-sample entries are
+    included (with the new overall_score) when the input has them; for
+    columnar input only metadata and aggregate are returned, so millions of
+    rows never leave the memory maps.
+    """
+    from .evaluator import LLMEvaluator
+
+    if isinstance(results, str):
+        results = ColumnarResults(results) if is_columnar(results) else _load_json(results)
+
+    matrix, metrics = load_score_matrix(results)
+    columns = {metric: matrix[:, j] for j, metric in enumerate(metrics)}
+    columns['overall_score'] = weighted_overall(columns, weights, len(matrix))
+
+    metadata = dict(results.metadata if isinstance(results, ColumnarResults) else results['metadata'])
+    metadata['weights'] = dict(weights)
+    reweighted = {'metadata': metadata, 'aggregate': LLMEvaluator._aggregate(columns)}
+
+    if not isinstance(results, ColumnarResults):
+        overall = columns['overall_score'].tolist()
+        reweighted['per_sample'] = [
+            dict(sample, scores=dict(sample['scores'], overall_score=score))
+            for sample, score in zip(results['per_sample'], overall)
+        ]
+    return reweighted
+
+def reweight_columnar(source: Union[str, ColumnarResults], path: Union[str, Path],
+                      weights: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Write a re-weighted copy of a columnar store and return its metadata/aggregate.
+
+    Text and per-metric columns are copied unchanged; only the overall_score
+    column and the header are rewritten. The source's groups block is
+    dropped, since its overall statistics no longer apply.
+    """
+    store = ColumnarResults(source) if not isinstance(source, ColumnarResults) else source
+    path = Path(path)
+    if path.resolve() == store.path.resolve():
+        raise ValueError("Write the re-weighted store to a new path, not over its source")
+
+    results = reaggregate(store, weights)
+    matrix, metrics = load_score_matrix(store)
+    overall = weighted_overall({m: matrix[:, j] for j, m in enumerate(metrics)}, weights, len(matrix))
+
+    shutil.copytree(store.path, path, dirs_exist_ok=True)
+    overall.astype('<f8').tofile(path / 'scores' / 'overall_score.f8')
+    header = {key: value for key, value in store.header.items() if key != 'groups'}
+    header['metadata'] = results['metadata']
+    header['aggregate'] = results['aggregate']
+    if 'overall_score' not in header['score_columns']:
+        header['score_columns'] = header['score_columns'] + ['overall_score']
+    with open(path / 'header.json', 'w', encoding='utf-8') as f:
+        json.dump(header, f, indent=2, ensure_ascii=False)
+    return results
+
+def weight_matrix(weight_vectors: Sequence[Dict[str, float]], metrics: List[str]) -> np.ndarray:
+    """(len(weight_vectors), len(metrics)) array; metrics a vector omits get weight 0."""
+    return np.array([[float(w.get(m, 0.0)) for m in metrics] for w in weight_vectors], dtype=np.float64)
+
+def sweep(matrix: np.ndarray, metrics: List[str], weight_vectors: Sequence[Dict[str, float]],
+          pass_threshold: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Aggregate overall_score under many weightings at once.
+
+    Each weight vector is one column of W, so a row chunk's overall scores
+    for every vector come from a single matrix product S @ W. When no score
+    is missing, overall is linear in the scores, so mean and std follow in
+    closed form from the column means and covariance of S (w'mu and
+    w' Cov w) and the chunks are only needed for min, max and pass rate.
+    Otherwise rows are averaged over the metrics they have,
+    (S @ W) / (present @ W), and per-vector statistics are merged across
+    chunks. Memory stays at one chunk x len(weight_vectors) block.
+
+    Returns: arrays of length len(weight_vectors) under 'mean', 'std', 'min',
+        'max' and, with a pass_threshold, 'pass_rate'.
+    """
+    W = weight_matrix(weight_vectors, metrics).T
+    m = W.shape[1]
+    rows = len(matrix)
+    if rows == 0:
+        summary = {stat: np.zeros(m) for stat in ('mean', 'std', 'min', 'max')}
+        if pass_threshold is not None:
+            summary['pass_rate'] = np.zeros(m)
+        return summary
+
+    chunk_rows = max(1, SWEEP_BLOCK_ELEMENTS // max(1, m))
+    complete = not any(np.isnan(matrix[start:start + chunk_rows]).any()
+                       for start in range(0, rows, chunk_rows))
+    if complete:
+        totals = W.sum(axis=0)
+        W = np.divide(W, totals, out=np.zeros_like(W), where=totals > 0)
+
+    count = 0
+    mean = np.zeros(m)
+    m2 = np.zeros(m)
+    low = np.full(m, np.inf)
+    high = np.full(m, -np.inf)
+    passed = np.zeros(m)
+
+    for start in range(0, rows, chunk_rows):
+        block = np.asarray(matrix[start:start + chunk_rows], dtype=np.float64)
+        if complete:
+            overall = block @ W
+        else:
+            present = ~np.isnan(block)
+            numerator = np.where(present, block, 0.0) @ W
+            denominator = present.astype(np.float64) @ W
+            overall = np.divide(numerator, denominator, out=np.zeros_like(numerator),
+                                where=denominator > 0)
+
+            # Chan et al. merge of the chunk's mean/M2 into the running totals
+            n_b = len(block)
+            mean_b = overall.mean(axis=0)
+            m2_b = ((overall - mean_b) ** 2).sum(axis=0)
+            delta = mean_b - mean
+            total = count + n_b
+            mean = mean + delta * (n_b / total)
+            m2 = m2 + m2_b + delta ** 2 * (count * n_b / total)
+            count = total
+
+        low = np.minimum(low, overall.min(axis=0))
+        high = np.maximum(high, overall.max(axis=0))
+        if pass_threshold is not None:
+            passed += np.count_nonzero(overall >= pass_threshold, axis=0)
+
+    if complete:
+        column_means, covariance = _column_moments(matrix, chunk_rows)
+        mean = column_means @ W
+        variance = np.einsum('km,kl,lm->m', W, covariance, W)
+    else:
+        variance = m2 / count
+
+    summary = {
+        'mean': mean,
+        'std': np.sqrt(np.maximum(variance, 0.0)),
+        'min': low,
+        'max': high
+    }
+    if pass_threshold is not None:
+        summary['pass_rate'] = passed / rows
+    return summary
+
+def _column_moments(matrix: np.ndarray, chunk_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column means and (population) covariance of a score matrix, chunk by chunk."""
+    k = matrix.shape[1]
+    count = 0
+    mean = np.zeros(k)
+    comoment = np.zeros((k, k))
+    for start in range(0, len(matrix), chunk_rows):
+        block = np.asarray(matrix[start:start + chunk_rows], dtype=np.float64)
+        n_b = len(block)
+        mean_b = block.mean(axis=0)
+        centered = block - mean_b
+        delta = mean_b - mean
+        total = count + n_b
+        comoment += centered.T @ centered + np.outer(delta, delta) * (count * n_b / total)
+        mean = mean + delta * (n_b / total)
+        count = total
+    return mean, comoment / count
+
+def simplex_grid(metrics: List[str], step: float) -> List[Dict[str, float]]:
+    """Every weighting of metrics on a grid of the given step whose weights sum to 1."""
+    if not metrics:
+        raise ValueError("No weighted metrics to sweep")
+    units = int(round(1.0 / step))
+    if units <= 0 or abs(units * step - 1.0) > 1e-9:
+        raise ValueError(f"Sweep step must divide 1 evenly, got {step}")
+    grid = []
+    for cuts in itertools.combinations(range(units + len(metrics) - 1), len(metrics) - 1):
+        bounds = (-1,) + cuts + (units + len(metrics) - 1,)
+        parts = [bounds[i + 1] - bounds[i] - 1 for i in range(len(metrics))]
+        grid.append({metric: part / units for metric, part in zip(metrics, parts)})
+    return grid
+
+def _load_json(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _parse_weights(text: str) -> Dict[str, float]:
+    weights = {}
+    for item in text.split(','):
+        name, _, value = item.partition('=')
+        if not value:
+            raise ValueError(f"Expected metric=weight, got '{item}'")
+        weights[name.strip()] = float(value)
+    return weights
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-weight stored evaluation results without rescoring.")
+    parser.add_argument('results', help="Results saved by save_results (JSON or .evalcols)")
+    parser.add_argument('--weights', default=None, help="metric=weight,... (e.g. exact_match=0.5,semantic_similarity=0.5)")
+    parser.add_argument('--config', default=None, help="Take weights from an EvaluationConfig file")
+    parser.add_argument('--output', default=None, help="Write the re-weighted results here")
+    parser.add_argument('--sweep', default=None, help="JSON file with a list of weight dicts to compare")
+    parser.add_argument('--sweep-step', type=float, default=None,
+                        help="Sweep every weighting on a grid of this step (weights sum to 1)")
+    parser.add_argument('--pass-threshold', type=float, default=None)
+    parser.add_argument('--sort-by', default='mean', help="Sweep statistic to rank by")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.sweep or args.sweep_step:
+        matrix, metrics = load_score_matrix(args.results)
+        if args.sweep:
+            with open(args.sweep, 'r', encoding='utf-8') as f:
+                vectors = json.load(f)
+        else:
+            from .evaluator import DEFAULT_WEIGHTS
+            vectors = simplex_grid([m for m in metrics if m in DEFAULT_WEIGHTS], args.sweep_step)
+
+        summary = sweep(matrix, metrics, vectors, pass_threshold=args.pass_threshold)
+        if args.sort_by not in summary:
+            raise ValueError(f"Cannot sort by '{args.sort_by}'; choose from {sorted(summary)}")
+        order = np.argsort(-summary[args.sort_by], kind='stable')
+        ranked = [
+            dict({'weights': vectors[i]}, **{stat: float(values[i]) for stat, values in summary.items()})
+            for i in order
+        ]
+
+        print(f"Swept {len(vectors)} weightings over {len(matrix)} rows")
+        for entry in ranked[:args.top]:
+            weights = ', '.join(f"{m}={w:g}" for m, w in entry['weights'].items())
+            print(f"  {args.sort_by}={entry[args.sort_by]:.4f}  {weights}")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump({'rows': len(matrix), 'metrics': metrics, 'runs': ranked}, f, indent=2)
+            print(f"Sweep saved to {args.output}")
+        return
+
+    if args.weights:
+        weights = _parse_weights(args.weights)
+    elif args.config:
+        from .config import EvaluationConfig
+        weights = EvaluationConfig(args.config).get_weights()
+    else:
+        parser.error("Give --weights, --config, --sweep or --sweep-step")
+
+    # Columnar in, columnar out: copy the store with a new overall_score column
+    columnar_copy = bool(args.output) and is_columnar(args.output) and is_columnar(args.results)
+    if columnar_copy:
+        results = reweight_columnar(args.results, args.output, weights)
+    else:
+        results = reaggregate(args.results, weights)
+    print("Aggregate Results:")
+    for key, value in results['aggregate'].items():
+        print(f"  {key}: {value:.3f}")
+
+    if args.output:
+        if columnar_copy:
+            pass  # already written by reweight_columnar
+        elif is_columnar(args.output):
+            save_columnar(results, args.output)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
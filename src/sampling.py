@@ -0,0 +1,98 @@
+"""
+Stratified sampling with confidence-interval early stopping.
+
+Records are split into strata by metadata fields (e.g. category and
+difficulty). Each chunk draws from every stratum in proportion to its size,
+without replacement, so the sample mirrors the population's mix. Means are
+estimated with the stratified estimator
+
+    mean = sum_h W_h * mean_h,    var = sum_h W_h^2 * s_h^2 / n_h * (1 - n_h / N_h)
+
+(W_h = N_h / N, with the finite-population correction), and the normal
+confidence interval mean +- z * sqrt(var) is tracked after every chunk.
+"""
+from statistics import NormalDist
+from typing import Any, Dict, Hashable, List, Sequence
+import numpy as np
+
+from .utils import RunningStats
+
+def z_value(confidence: float) -> float:
+    """Two-sided normal critical value, e.g. 1.96 for 0.95."""
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+def stratify(records: Sequence[Dict[str, Any]], keys: Sequence[str]) -> Dict[Hashable, np.ndarray]:
+    """Row indices per stratum (tuple of the records' values for keys)."""
+    strata = {}
+    for i, record in enumerate(records):
+        strata.setdefault(tuple(record.get(key) for key in keys), []).append(i)
+    return {stratum: np.asarray(rows, dtype=np.int64) for stratum, rows in strata.items()}
+
+def allocate(chunk_size: int, sizes: np.ndarray, drawn: np.ndarray, minimum: int = 0) -> np.ndarray:
+    """
+    Rows to draw from each stratum for the next chunk.
+
+    Proportional to stratum size (largest remainder), topped up so every
+    stratum has at least `minimum` rows drawn, and capped by what is left.
+    """
+    remaining = sizes - drawn
+    counts = np.minimum(np.maximum(minimum - drawn, 0), remaining)
+
+    budget = chunk_size - int(counts.sum())
+    available = remaining - counts > 0
+    while budget > 0 and available.any():
+        share = budget * sizes * available / sizes[available].sum()
+        extra = np.floor(share).astype(np.int64)
+        # Hand the leftover rows to the largest fractional parts
+        leftover = budget - int(extra.sum())
+        if leftover:
+            order = np.argsort(-(share - extra), kind='stable')
+            extra[order[:leftover]] += 1
+        extra = np.minimum(extra, remaining - counts)
+        counts += extra
+        budget -= int(extra.sum())
+        available = remaining - counts > 0
+    return counts
+
+class StratifiedEstimator:
+    """Running stratified means and confidence intervals for score columns."""
+
+    def __init__(self, sizes: Dict[Hashable, int], confidence: float = 0.95):
+        self.sizes = dict(sizes)
+        self.population = sum(self.sizes.values())
+        self.z = z_value(confidence)
+        self.stats = {stratum: {} for stratum in self.sizes}
+
+    def update(self, stratum: Hashable, columns: Dict[str, Sequence[float]]):
+        """Fold a stratum's newly scored rows into its running statistics."""
+        for metric, values in columns.items():
+            self.stats[stratum].setdefault(metric, RunningStats()).update(values)
+
+    def estimate(self, metric: str) -> Dict[str, float]:
+        """Stratified mean of a metric with its confidence interval."""
+        mean, variance = 0.0, 0.0
+        for stratum, size in self.sizes.items():
+            stats = self.stats[stratum].get(metric)
+            n = stats.count if stats is not None else 0
+            if n == 0 or (n == 1 and size > 1):
+                # Not enough rows in this stratum to estimate its variance yet
+                return {'mean': float('nan'), 'half_width': float('inf'),
+                        'ci_low': float('nan'), 'ci_high': float('nan')}
+
+            weight = size / self.population
+            mean += weight * stats.mean
+            if n < size:
+                sample_variance = stats.std ** 2 * n / (n - 1)
+                variance += weight ** 2 * sample_variance / n * (1 - n / size)
+
+        half_width = self.z * float(np.sqrt(variance))
+        return {'mean': mean, 'half_width': half_width,
+                'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+    def estimates(self) -> Dict[str, Dict[str, float]]:
+        metrics: List[str] = []
+        for stats in self.stats.values():
+            metrics.extend(m for m in stats if m not in metrics)
+        return {metric: self.estimate(metric) for metric in metrics}
@@ -0,0 +1,288 @@
+"""
+Long-running scoring server.
+
+Loads the evaluator (and its embedding model) once, then serves JSON
+evaluation requests over local HTTP or a Unix socket. Records from all
+clients go through one AsyncEvaluator, so concurrent requests are scored in
+shared micro-batches.
+
+    python -m src.server --port 8765
+    python -m src.server --unix-socket /tmp/llm-eval.sock --config configs/eval.yaml
+
+Endpoints:
+    POST /evaluate  {"prediction": ..., "reference": ...} or {"records": [...]}
+    GET  /stats     throughput and latency counters
+    GET  /health
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import socket
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from .async_evaluator import AsyncEvaluator, validate_request
+from .config import EvaluationConfig
+from .evaluator import LLMEvaluator
+
+class ScoringServer:
+    """Asyncio HTTP/1.1 server in front of an AsyncEvaluator."""
+
+    MAX_BODY_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, evaluator: Optional[LLMEvaluator] = None, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, latency_window: int = 10_000):
+        """
+        Args:
+            max_batch_size, max_wait_ms: Micro-batching knobs, see AsyncEvaluator.
+            latency_window: Number of recent request latencies kept for percentiles.
+        """
+        self.scorer = AsyncEvaluator(evaluator, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self._server = None
+        self._started_at = None
+        self._latencies = deque(maxlen=latency_window)
+        self.counters = {'http_requests': 0, 'records': 0, 'errors': 0}
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765, unix_socket: Optional[str] = None):
+        """Warm the models up, then start listening."""
+        # Pay the model load once, before the first client request
+        await self.scorer.evaluate_batch_async(['warm up'], ['warm up'])
+
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._started_at = time.monotonic()
+        return self._server
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.scorer.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput and latency counters."""
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        scorer_stats = self.scorer.stats
+        latencies = np.fromiter(self._latencies, dtype=np.float64)
+
+        stats = dict(self.counters)
+        stats.update({
+            'uptime_seconds': uptime,
+            'records_per_second': self.counters['records'] / uptime if uptime else 0.0,
+            'batches': scorer_stats['batches'],
+            'mean_batch_size': (scorer_stats['batched_requests'] / scorer_stats['batches']
+                                if scorer_stats['batches'] else 0.0),
+        })
+        if latencies.size:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000.0
+            stats.update({
+                'latency_ms_mean': float(latencies.mean() * 1000.0),
+                'latency_ms_p50': float(p50),
+                'latency_ms_p95': float(p95),
+                'latency_ms_p99': float(p99),
+            })
+        return stats
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body, keep_alive = request
+
+                self.counters['http_requests'] += 1
+                try:
+                    status, payload = await self._dispatch(method, path, body)
+                except (ValueError, KeyError, TypeError) as e:
+                    self.counters['errors'] += 1
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    self.counters['errors'] += 1
+                    status, payload = 500, {'error': str(e)}
+
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes, bool]]:
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+
+        lines = head.decode('latin-1').split('\r\n')
+        method, path, version = lines[0].split(' ', 2)
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        if length > self.MAX_BODY_BYTES:
+            raise ConnectionError("Request body too large")
+        body = await reader.readexactly(length) if length else b''
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method, path, headers, body, keep_alive
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        path = path.split('?', 1)[0]
+
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats()
+        if method == 'POST' and path == '/evaluate':
+            payload = json.loads(body.decode('utf-8'))
+            records = payload['records'] if 'records' in payload else [payload]
+            return 200, {'results': await self._evaluate_records(records)}
+
+        return 404, {'error': f"No route for {method} {path}"}
+
+    async def _evaluate_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Reject the whole request (400) before any of its records joins a shared batch
+        if not isinstance(records, list):
+            raise TypeError("'records' must be a list")
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise TypeError(f"Record {i} must be an object")
+            for field in ('prediction', 'reference'):
+                if field not in record:
+                    raise ValueError(f"Record {i} is missing '{field}'")
+            try:
+                validate_request(record['prediction'], record['reference'], record.get('required_keywords'))
+            except TypeError as e:
+                raise TypeError(f"Record {i}: {e}") from e
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            self.scorer.evaluate_single_async(
+                record['prediction'], record['reference'],
+                sample_id=record.get('sample_id'),
+                required_keywords=record.get('required_keywords')
+            )
+            for record in records
+        ])
+        self._latencies.append(time.perf_counter() - start)
+        self.counters['records'] += len(records)
+        return results
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        reason = http.client.responses.get(status, '')
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ScoringClient:
+    """Blocking client for ScoringServer, for scripts that shouldn't load models themselves."""
+
+    def __init__(self, url: str = 'http://127.0.0.1:8765', unix_socket: Optional[str] = None,
+                 timeout: float = 60.0):
+        if unix_socket:
+            self._connection = _UnixHTTPConnection(unix_socket, timeout=timeout)
+        else:
+            parsed = urlparse(url)
+            self._connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+
+    def evaluate(self, predictions: List[str], references: List[str],
+                 sample_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Score aligned predictions/references; returns evaluate_single-shaped results."""
+        if len(predictions) != len(references):
+            raise ValueError("Predictions and references must have the same length")
+        if sample_ids is None:
+            sample_ids = [f"sample_{i}" for i in range(len(predictions))]
+
+        records = [
+            {'prediction': pred, 'reference': ref, 'sample_id': sid}
+            for pred, ref, sid in zip(predictions, references, sample_ids)
+        ]
+        return self._request('POST', '/evaluate', {'records': records})['results']
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request('GET', '/stats')
+
+    def close(self):
+        self._connection.close()
+
+    def _request(self, method: str, path: str, payload: Any = None) -> Any:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        self._connection.request(method, path, body=body, headers=headers)
+        response = self._connection.getresponse()
+        data = json.loads(response.read().decode('utf-8'))
+        if response.status != 200:
+            raise RuntimeError(f"Scoring server returned {response.status}: {data.get('error')}")
+        return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the LLM evaluation scoring server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', default=None)
+    parser.add_argument('--config', default=None, help="YAML/JSON EvaluationConfig file")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    config = EvaluationConfig(args.config)
+    evaluator = LLMEvaluator(config.get_metrics_config(), weights=config.get_weights(),
+                             **config.get_execution_config())
+    server = ScoringServer(evaluator, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    async def run():
+        await server.start(args.host, args.port, args.unix_socket)
+        where = args.unix_socket or f"http://{args.host}:{args.port}"
+        print(f"Scoring server listening on {where}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
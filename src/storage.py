@@ -0,0 +1,223 @@
+"""
+Columnar result store.
+
+A result set is a directory (conventionally named *.evalcols):
+
+    header.json              format version, row count, column layout,
+                             metadata, aggregate and (optional) groups blocks
+    scores/<metric>.f8       one little-endian float64 array per score column
+    text/<column>.codes.i4   int32 dictionary code per row
+    text/<column>.values.gz  gzip'd JSON lines, each distinct value stored once
+
+Score columns can be memory-mapped without reading any text. Text columns
+(sample_id, prediction, reference, ...) are dictionary encoded, so repeated
+references cost four bytes per row. Values are stored as JSON, so
+to_results() reproduces the evaluate_batch dict exactly.
+"""
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+
+FORMAT_VERSION = 1
+COLUMNAR_SUFFIX = '.evalcols'
+
+def _json_default(x):
+    return float(x) if isinstance(x, np.floating) else x
+
+def is_columnar(path: Union[str, Path]) -> bool:
+    """True if path is (or is named like) a columnar result directory."""
+    path = Path(path)
+    return path.suffix == COLUMNAR_SUFFIX or (path / 'header.json').exists()
+
+class ColumnarResultWriter:
+    """
+    Streaming writer: append per-sample results chunk by chunk, then close()
+    with the metadata and aggregate blocks. Memory use is one dictionary entry
+    per distinct text value, not per row.
+    """
+
+    def __init__(self, path: Union[str, Path], compresslevel: int = 6):
+        self.path = Path(path)
+        (self.path / 'scores').mkdir(parents=True, exist_ok=True)
+        (self.path / 'text').mkdir(parents=True, exist_ok=True)
+        self.compresslevel = compresslevel
+
+        self.num_rows = 0
+        self.text_columns = None
+        self.score_columns = None
+        self._dictionaries = {}
+        self._files = {}
+        self._closed = False
+
+    def __enter__(self) -> 'ColumnarResultWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._closed:
+            self.close()
+
+    def write_samples(self, samples: List[Dict[str, Any]]):
+        """Append evaluate_single-shaped per-sample dicts."""
+        if not samples:
+            return
+        if self.text_columns is None:
+            self._open_columns(samples[0])
+
+        extra = set().union(*(sample['scores'] for sample in samples)) - set(self.score_columns)
+        if extra:
+            raise ValueError(f"Score columns changed mid-stream: {sorted(extra)}")
+
+        for column in self.score_columns:
+            values = np.fromiter(
+                (sample['scores'].get(column, np.nan) for sample in samples),
+                dtype='<f8', count=len(samples)
+            )
+            self._files[('scores', column)].write(values.tobytes())
+
+        for column in self.text_columns:
+            dictionary = self._dictionaries[column]
+            new_values = []
+            codes = np.empty(len(samples), dtype='<i4')
+            for i, sample in enumerate(samples):
+                value = sample.get(column)
+                # Strings key the dictionary directly; anything else by its JSON
+                key = value if type(value) is str else (None, json.dumps(value, default=_json_default))
+                code = dictionary.get(key)
+                if code is None:
+                    code = dictionary[key] = len(dictionary)
+                    new_values.append(json.dumps(value, ensure_ascii=False, default=_json_default))
+                codes[i] = code
+            if new_values:
+                self._files[('values', column)].write('\n'.join(new_values) + '\n')
+            self._files[('codes', column)].write(codes.tobytes())
+
+        self.num_rows += len(samples)
+
+    def close(self, metadata: Optional[Dict[str, Any]] = None,
+              aggregate: Optional[Dict[str, Any]] = None,
+              groups: Optional[Dict[str, Any]] = None):
+        """Finish the column files and write the header (groups: the per-group aggregates, if any)."""
+        for f in self._files.values():
+            f.close()
+
+        header = {
+            'format_version': FORMAT_VERSION,
+            'num_rows': self.num_rows,
+            'text_columns': self.text_columns or [],
+            'score_columns': self.score_columns or [],
+            'distinct_values': {c: len(d) for c, d in self._dictionaries.items()},
+            'metadata': metadata or {},
+            'aggregate': aggregate or {}
+        }
+        if groups:
+            header['groups'] = groups
+        with open(self.path / 'header.json', 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2, ensure_ascii=False, default=_json_default)
+        self._closed = True
+
+    def _open_columns(self, first: Dict[str, Any]):
+        self.text_columns = [key for key in first if key != 'scores']
+        self.score_columns = list(first['scores'])
+
+        for column in self.score_columns:
+            self._files[('scores', column)] = open(self.path / 'scores' / f'{column}.f8', 'wb')
+        for column in self.text_columns:
+            self._dictionaries[column] = {}
+            self._files[('codes', column)] = open(self.path / 'text' / f'{column}.codes.i4', 'wb')
+            self._files[('values', column)] = gzip.open(
+                self.path / 'text' / f'{column}.values.gz', 'wt',
+                encoding='utf-8', compresslevel=self.compresslevel
+            )
+
+class ColumnarResults:
+    """Read side of the columnar store; score columns are memory-mapped."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path / 'header.json', 'r', encoding='utf-8') as f:
+            self.header = json.load(f)
+
+        if self.header['format_version'] > FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format version {self.header['format_version']}")
+
+        self.num_rows = self.header['num_rows']
+        self.metadata = self.header['metadata']
+        self.aggregate = self.header['aggregate']
+        self.groups = self.header.get('groups')
+        self.score_columns = self.header['score_columns']
+        self.text_columns = self.header['text_columns']
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def scores(self, metric: str) -> np.ndarray:
+        """Memory-mapped float64 column (read-only)."""
+        if metric not in self.score_columns:
+            raise KeyError(f"No score column '{metric}'")
+        if self.num_rows == 0:
+            return np.empty(0, dtype='<f8')
+        return np.memmap(self.path / 'scores' / f'{metric}.f8', dtype='<f8', mode='r',
+                         shape=(self.num_rows,))
+
+    def score_matrix(self, metrics: Optional[List[str]] = None) -> np.ndarray:
+        """(num_rows, len(metrics)) float64 matrix of the requested score columns."""
+        metrics = metrics or self.score_columns
+        matrix = np.empty((self.num_rows, len(metrics)), dtype=np.float64)
+        for j, metric in enumerate(metrics):
+            matrix[:, j] = self.scores(metric)
+        return matrix
+
+    def codes(self, column: str) -> np.ndarray:
+        """Memory-mapped int32 dictionary codes of a text column."""
+        if column not in self.text_columns:
+            raise KeyError(f"No text column '{column}'")
+        if self.num_rows == 0:
+            return np.empty(0, dtype='<i4')
+        return np.memmap(self.path / 'text' / f'{column}.codes.i4', dtype='<i4', mode='r',
+                         shape=(self.num_rows,))
+
+    def dictionary(self, column: str) -> List[Any]:
+        """Distinct values of a text column, indexed by code."""
+        with gzip.open(self.path / 'text' / f'{column}.values.gz', 'rt', encoding='utf-8') as f:
+            lines = f.read()
+        # Encoded values never contain a raw newline, so one parse decodes them all
+        return json.loads('[' + lines.rstrip('\n').replace('\n', ',') + ']')
+
+    def text(self, column: str) -> List[Any]:
+        """Decoded values of a text column, one per row."""
+        values = self.dictionary(column)
+        return [values[code] for code in self.codes(column).tolist()]
+
+    def to_results(self) -> Dict[str, Any]:
+        """Rebuild the evaluate_batch results dict (lossless round-trip)."""
+        texts = {column: self.text(column) for column in self.text_columns}
+        scores = {metric: self.scores(metric).tolist() for metric in self.score_columns}
+
+        per_sample = []
+        for i in range(self.num_rows):
+            sample = {column: texts[column][i] for column in self.text_columns}
+            # NaN marks a score the sample did not have
+            sample['scores'] = {
+                metric: scores[metric][i] for metric in self.score_columns
+                if scores[metric][i] == scores[metric][i]
+            }
+            per_sample.append(sample)
+
+        results = {
+            'metadata': self.metadata,
+            'per_sample': per_sample,
+            'aggregate': self.aggregate
+        }
+        if self.groups:
+            results['groups'] = self.groups
+        return results
+
+def save_columnar(results: Dict[str, Any], path: Union[str, Path], chunk_size: int = 10_000):
+    """Write an in-memory results dict in the columnar format."""
+    with ColumnarResultWriter(path) as writer:
+        per_sample = results.get('per_sample', [])
+        for start in range(0, len(per_sample), chunk_size):
+            writer.write_samples(per_sample[start:start + chunk_size])
+        writer.close(results.get('metadata'), results.get('aggregate'), results.get('groups'))
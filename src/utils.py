@@ -0,0 +1,44 @@
+from typing import Dict, Iterable
+import numpy as np
+
+class RunningStats:
+    """
+    Streaming mean/std/min/max in O(1) memory.
+
+    Chunks are folded in with the parallel form of Welford's algorithm
+    (Chan et al.), so each update is vectorized over the chunk. std is the
+    population std, matching np.std as used by evaluate_batch.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+    
+    def update(self, values: Iterable[float]):
+        """Fold a chunk of values into the running statistics."""
+        values = np.asarray(values, dtype=np.float64)
+        n = values.size
+        if n == 0:
+            return
+        
+        chunk_mean = float(np.mean(values))
+        chunk_m2 = float(np.sum((values - chunk_mean) ** 2))
+        
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+    
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self._m2 / self.count)) if self.count else 0.0
+    
+    def summary(self) -> Dict[str, float]:
+        return {'mean': self.mean, 'std': self.std, 'min': self.min, 'max': self.max}
@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+
+@pytest.fixture(scope='session')
+def tiny_model(tmp_path_factory):
+    """Directory of a tiny random sentence-transformer (no download)."""
+    pytest.importorskip('sentence_transformers')
+    from tiny_model import build_tiny_model
+    return build_tiny_model(str(tmp_path_factory.mktemp('tiny-model')))
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from src.async_evaluator import AsyncEvaluator, validate_request
+from src.evaluator import LLMEvaluator
+
+LEXICAL = {
+    'exact_match': {'normalize': True},
+    'fuzzy_match': {'threshold': 0.7},
+    'keyword_match': {}
+}
+
+PREDICTIONS = [
+    "Paris is the capital of France.",
+    "The capital of France is Paris",
+    "Water boils at 100 degrees Celsius",
+    "I am not sure.",
+    "Berlin",
+    "water boils at 100 degrees celsius!",
+]
+REFERENCES = [
+    "Paris is the capital of France.",
+    "Paris is the capital of France.",
+    "Water boils at 100 degrees Celsius at sea level",
+    "The mitochondria is the powerhouse of the cell",
+    "Berlin is the capital of Germany",
+    "Water boils at 100 degrees Celsius at sea level",
+]
+
+
+def gather_singles(scorer, **options):
+    async def run():
+        async with scorer:
+            return await asyncio.gather(*(
+                scorer.evaluate_single_async(pred, ref, sample_id=str(i), **options)
+                for i, (pred, ref) in enumerate(zip(PREDICTIONS, REFERENCES))
+            ))
+    return asyncio.run(run())
+
+
+def test_concurrent_requests_share_batches_and_match_single():
+    evaluator = LLMEvaluator(LEXICAL)
+    scorer = AsyncEvaluator(evaluator, max_batch_size=4, max_wait_ms=50)
+    results = gather_singles(scorer)
+
+    assert scorer.stats['requests'] == len(PREDICTIONS)
+    assert scorer.stats['batches'] < len(PREDICTIONS)
+    for i, (result, pred, ref) in enumerate(zip(results, PREDICTIONS, REFERENCES)):
+        expected = evaluator.evaluate_single(pred, ref, sample_id=str(i))
+        assert result['sample_id'] == str(i)
+        assert result['scores'] == pytest.approx(expected['scores'])
+
+
+def test_failing_request_only_fails_itself(monkeypatch):
+    evaluator = LLMEvaluator(LEXICAL)
+    score_all = evaluator._score_all
+
+    def flaky(predictions, *args, **kwargs):
+        if 'boom' in predictions:
+            raise RuntimeError("scorer failed")
+        return score_all(predictions, *args, **kwargs)
+
+    monkeypatch.setattr(evaluator, '_score_all', flaky)
+
+    async def run():
+        async with AsyncEvaluator(evaluator, max_batch_size=8, max_wait_ms=50) as scorer:
+            return await asyncio.gather(
+                scorer.evaluate_single_async(PREDICTIONS[0], REFERENCES[0]),
+                scorer.evaluate_single_async('boom', REFERENCES[1]),
+                scorer.evaluate_single_async(PREDICTIONS[2], REFERENCES[2]),
+                return_exceptions=True
+            ), scorer.stats
+
+    (first, failed, third), stats = asyncio.run(run())
+    assert stats['batches'] == 1
+    assert isinstance(failed, RuntimeError)
+    assert first['scores']['exact_match'] == 1.0
+    assert third['scores'] == pytest.approx(
+        evaluator.evaluate_single(PREDICTIONS[2], REFERENCES[2])['scores'])
+
+
+def test_malformed_request_rejected_before_queueing():
+    with pytest.raises(TypeError):
+        validate_request(None, "reference")
+    with pytest.raises(TypeError):
+        validate_request("prediction", "reference", required_keywords="paris")
+
+    async def run():
+        async with AsyncEvaluator(LLMEvaluator(LEXICAL)) as scorer:
+            with pytest.raises(TypeError):
+                await scorer.evaluate_single_async("prediction", 3)
+            with pytest.raises(ValueError):
+                await scorer.evaluate_single_async("prediction", "reference", cascade='eager')
+            return scorer.stats
+
+    assert asyncio.run(run())['requests'] == 0
+
+
+@pytest.mark.parametrize('cascade', ['strict', 'fast'])
+def test_cascade_and_threshold_match_single(cascade):
+    evaluator = LLMEvaluator(LEXICAL, cascade=cascade, pass_threshold=0.6)
+    results = gather_singles(AsyncEvaluator(evaluator, max_wait_ms=20))
+
+    for result, pred, ref in zip(results, PREDICTIONS, REFERENCES):
+        expected = evaluator.evaluate_single(pred, ref)
+        assert result['passed'] == expected['passed']
+        assert result.get('cascade') == expected.get('cascade')
+
+
+def test_aclose_scores_queued_requests():
+    async def run():
+        scorer = AsyncEvaluator(LLMEvaluator(LEXICAL), max_batch_size=2, max_wait_ms=1000)
+        tasks = [asyncio.ensure_future(scorer.evaluate_single_async(pred, ref))
+                 for pred, ref in zip(PREDICTIONS, REFERENCES)]
+        await asyncio.sleep(0)
+        await scorer.aclose()
+        assert all(task.done() for task in tasks)
+        with pytest.raises(RuntimeError):
+            await scorer.evaluate_single_async(PREDICTIONS[0], REFERENCES[0])
+        return [task.result() for task in tasks]
+
+    results = asyncio.run(run())
+    assert len(results) == len(PREDICTIONS)
+    assert results[0]['scores']['exact_match'] == 1.0
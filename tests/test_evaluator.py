@@ -0,0 +1,405 @@
+import csv
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.compare import compare_runs, load_run
+from src.datasets import DatasetLoader
+from src.evaluator import LLMEvaluator
+from src.grouping import group_aggregates
+from src.reweight import reaggregate
+from src.sampling import allocate
+from src.storage import ColumnarResults, save_columnar
+
+LEXICAL = {
+    'exact_match': {'normalize': True},
+    'fuzzy_match': {'threshold': 0.7},
+    'keyword_match': {}
+}
+
+PREDICTIONS = [
+    "Paris is the capital of France.",
+    "The capital of France is Paris",
+    "Water boils at 100 degrees Celsius",
+    "Photosynthesis turns light into chemical energy",
+    "I am not sure.",
+    "Paris is the capital of France.",
+    "Berlin",
+    "water boils at 100 degrees celsius!",
+]
+REFERENCES = [
+    "Paris is the capital of France.",
+    "Paris is the capital of France.",
+    "Water boils at 100 degrees Celsius at sea level",
+    "Plants convert light energy into chemical energy",
+    "The mitochondria is the powerhouse of the cell",
+    "Paris is the capital of France.",
+    "Berlin is the capital of Germany",
+    "Water boils at 100 degrees Celsius at sea level",
+]
+
+
+def semantic_config(model_dir, **options):
+    return dict(LEXICAL, semantic_similarity=dict({'model_name': model_dir}, **options))
+
+
+def score_rows(results):
+    return [sample['scores'] for sample in results['per_sample']]
+
+
+class NoModel:
+    """Stands in for the encoder; any use of it fails the test."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"model.{name} used although every text was cached")
+
+
+def test_batch_matches_single(tiny_model):
+    evaluator = LLMEvaluator(semantic_config(tiny_model))
+    batch = evaluator.evaluate_batch(PREDICTIONS, REFERENCES)
+    for sample, prediction, reference in zip(batch['per_sample'], PREDICTIONS, REFERENCES):
+        single = evaluator.evaluate_single(prediction, reference)['scores']
+        assert sample['scores'] == pytest.approx(single, abs=1e-6)
+
+
+def test_parallel_lexical_matches_serial():
+    predictions = [f"{prediction} ({i})" for i, prediction in enumerate(PREDICTIONS * 3)]
+    references = REFERENCES * 3
+    keywords = [['paris'], None, ['water', 'boils']] * 8
+    serial = LLMEvaluator(LEXICAL).evaluate_batch(predictions, references, required_keywords=keywords)
+
+    evaluator = LLMEvaluator(LEXICAL, num_workers=2, chunk_size=5)
+    try:
+        parallel = evaluator.evaluate_batch(predictions, references, required_keywords=keywords)
+    finally:
+        evaluator.close()
+
+    assert 'lexical_parallel' in parallel['metadata']['profile']['stages']
+    assert len(parallel['per_sample']) == len(serial['per_sample'])
+    for fast, slow in zip(parallel['per_sample'], serial['per_sample']):
+        assert fast['sample_id'] == slow['sample_id']
+        assert list(fast['scores']) == list(slow['scores'])
+        assert fast['scores'] == slow['scores']
+    assert parallel['aggregate'] == pytest.approx(serial['aggregate'])
+
+
+def test_stream_matches_batch(tmp_path):
+    evaluator = LLMEvaluator(LEXICAL)
+    batch = evaluator.evaluate_batch(PREDICTIONS, REFERENCES)
+    records = [{'prediction': p, 'reference': r} for p, r in zip(PREDICTIONS, REFERENCES)]
+    output = tmp_path / 'per_sample.jsonl'
+    stream = evaluator.evaluate_stream(iter(records), output_path=str(output), chunk_size=3)
+
+    assert stream['aggregate'] == pytest.approx(batch['aggregate'])
+    with open(output, 'r', encoding='utf-8') as f:
+        streamed = [json.loads(line)['scores'] for line in f]
+    assert streamed == score_rows(batch)
+
+
+def test_csv_keywords_parsed_like_json(tmp_path):
+    path = tmp_path / 'data.csv'
+    keyword_cells = ['paris; france', '["water", "boils"]', '']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['prediction', 'reference', 'required_keywords'])
+        for prediction, reference, cell in zip(PREDICTIONS, REFERENCES, keyword_cells):
+            writer.writerow([prediction, reference, cell])
+
+    keywords = [['paris', 'france'], ['water', 'boils'], None]
+    records = list(DatasetLoader.iter_csv(str(path)))
+    assert [record['required_keywords'] for record in records] == keywords
+    assert [record['required_keywords'] for record in DatasetLoader.load_csv(str(path))] == keywords
+
+    evaluator = LLMEvaluator(LEXICAL)
+    stream = evaluator.evaluate_stream(DatasetLoader.iter_csv(str(path)))
+    batch = evaluator.evaluate_batch(PREDICTIONS[:3], REFERENCES[:3], required_keywords=keywords)
+    assert stream['aggregate'] == pytest.approx(batch['aggregate'])
+
+
+def test_columnar_round_trip(tmp_path):
+    evaluator = LLMEvaluator(LEXICAL)
+    results = evaluator.evaluate_batch(PREDICTIONS, REFERENCES, groups={'half': [i % 2 for i in range(8)]},
+                                       n_boot=50)
+    path = tmp_path / 'run.evalcols'
+    save_columnar(results, path)
+
+    restored = ColumnarResults(path).to_results()
+    assert restored['per_sample'] == json.loads(json.dumps(results['per_sample']))
+    assert restored['aggregate'] == pytest.approx(results['aggregate'])
+    assert restored['groups'] == json.loads(json.dumps(results['groups']))
+
+
+def test_dedup_fans_scores_out():
+    evaluator = LLMEvaluator(LEXICAL)
+    predictions = PREDICTIONS * 3
+    references = REFERENCES * 3
+    results = evaluator.evaluate_batch(predictions, references)
+    unique = len(set(zip(PREDICTIONS, REFERENCES)))
+
+    assert results['metadata']['dedup']['total_pairs'] == len(predictions)
+    assert results['metadata']['dedup']['unique_pairs'] == unique
+    single = score_rows(evaluator.evaluate_batch(PREDICTIONS, REFERENCES))
+    assert score_rows(results) == single * 3
+
+
+def test_embedding_cache_hit_skips_model(tiny_model, tmp_path):
+    config = semantic_config(tiny_model, cache_dir=str(tmp_path / 'embeddings'))
+    first = LLMEvaluator(config).evaluate_batch(PREDICTIONS, REFERENCES)
+
+    evaluator = LLMEvaluator(config)
+    evaluator.relevance._model = NoModel()
+    second = evaluator.evaluate_batch(PREDICTIONS, REFERENCES)
+    assert score_rows(second) == pytest.approx(score_rows(first))
+
+
+def test_embedding_cache_index_written_per_run_not_per_call(tiny_model, tmp_path):
+    config = semantic_config(tiny_model, cache_dir=str(tmp_path / 'embeddings'))
+    evaluator = LLMEvaluator(config)
+    for prediction, reference in zip(PREDICTIONS, REFERENCES):
+        evaluator.evaluate_single(prediction, reference)
+    # Single calls leave the (whole-index) rewrite to close()
+    assert not list((tmp_path / 'embeddings').glob('*/index.json'))
+    evaluator.close()
+    assert len(list((tmp_path / 'embeddings').glob('*/index.json'))) == 1
+
+    cached = LLMEvaluator(config)
+    cached.relevance._model = NoModel()
+    cached.evaluate_batch(PREDICTIONS, REFERENCES)
+
+
+def test_score_cache_hit_skips_model(tiny_model, tmp_path):
+    config = semantic_config(tiny_model)
+    path = str(tmp_path / 'scores.sqlite')
+    evaluator = LLMEvaluator(config, score_cache=path)
+    first = evaluator.evaluate_batch(PREDICTIONS, REFERENCES)
+    evaluator.close()
+
+    evaluator = LLMEvaluator(config, score_cache=path)
+    evaluator.relevance._model = NoModel()
+    second = evaluator.evaluate_batch(PREDICTIONS, REFERENCES)
+    evaluator.close()
+    assert score_rows(second) == score_rows(first)
+
+
+def test_score_cache_version_invalidates_entries(tmp_path, monkeypatch):
+    import src.cache
+
+    path = str(tmp_path / 'scores.sqlite')
+
+    def run():
+        evaluator = LLMEvaluator(LEXICAL, score_cache=path)
+        try:
+            return evaluator.evaluate_batch(PREDICTIONS, REFERENCES)['metadata']['score_cache']
+        finally:
+            evaluator.close()
+
+    assert run()['hits'] == 0
+    assert run()['misses'] == 0
+    monkeypatch.setattr(src.cache, 'SCORE_CACHE_VERSION', src.cache.SCORE_CACHE_VERSION + 1)
+    # Entries written by an older metric implementation are never served
+    assert run()['hits'] == 0
+
+
+def test_candidates_match_separate_batches(tiny_model, tmp_path):
+    config = semantic_config(tiny_model)
+    candidates = {'copy': list(REFERENCES), 'model': list(PREDICTIONS), 'short': [p[:12] for p in PREDICTIONS]}
+    evaluator = LLMEvaluator(config, score_cache=str(tmp_path / 'scores.sqlite'))
+    results = evaluator.evaluate_candidates(REFERENCES, candidates, chunk_size=3)
+
+    assert evaluator.results is results
+    assert results['metadata']['score_cache']['writes'] > 0
+    for name, predictions in candidates.items():
+        separate = LLMEvaluator(config).evaluate_batch(predictions, REFERENCES)
+        assert results['models'][name]['aggregate'] == pytest.approx(separate['aggregate'], abs=1e-6)
+        for row, expected in zip(score_rows(results['models'][name]), score_rows(separate)):
+            assert row == pytest.approx(expected, abs=1e-6)
+
+    # A rerun is served from the score cache alone
+    evaluator.relevance._model = NoModel()
+    rerun = evaluator.evaluate_candidates(REFERENCES, {'model': list(PREDICTIONS)})
+    assert rerun['models']['model']['aggregate'] == pytest.approx(results['models']['model']['aggregate'])
+    evaluator.close()
+
+
+def test_reweight_matches_fresh_run():
+    weights = {'exact_match': 0.5, 'fuzzy_match': 0.1, 'keyword_match': 0.4}
+    results = LLMEvaluator(LEXICAL).evaluate_batch(PREDICTIONS, REFERENCES)
+    fresh = LLMEvaluator(LEXICAL, weights=weights).evaluate_batch(PREDICTIONS, REFERENCES)
+
+    reweighted = reaggregate(results, weights)
+    assert reweighted['aggregate'] == pytest.approx(fresh['aggregate'])
+    assert score_rows(reweighted) == pytest.approx(score_rows(fresh))
+
+
+def test_reweight_cli_columnar_round_trip(tmp_path):
+    weights = {'exact_match': 0.5, 'fuzzy_match': 0.1, 'keyword_match': 0.4}
+    evaluator = LLMEvaluator(LEXICAL)
+    source = tmp_path / 'run.evalcols'
+    evaluator.save_results(evaluator.evaluate_batch(PREDICTIONS, REFERENCES), str(source))
+    fresh = LLMEvaluator(LEXICAL, weights=weights).evaluate_batch(PREDICTIONS, REFERENCES)
+
+    output = tmp_path / 'reweighted.evalcols'
+    spec = ','.join(f"{metric}={weight}" for metric, weight in weights.items())
+    subprocess.run([sys.executable, '-m', 'src.reweight', str(source), '--weights', spec,
+                    '--output', str(output)], check=True, capture_output=True,
+                   cwd=Path(__file__).parent.parent)
+
+    restored = LLMEvaluator.load_results(str(output))
+    assert restored['aggregate'] == pytest.approx(fresh['aggregate'])
+    assert score_rows(restored) == pytest.approx(score_rows(fresh))
+    assert restored['metadata']['weights'] == weights
+
+
+@pytest.mark.parametrize('reduce', ['max', 'mean'])
+def test_multi_reference_reduction(reduce):
+    evaluator = LLMEvaluator(LEXICAL, reference_reduce=reduce)
+    alternatives = [[reference, "Something else entirely"] for reference in REFERENCES]
+    results = evaluator.evaluate_batch(PREDICTIONS, alternatives)
+
+    for sample, prediction, refs in zip(results['per_sample'], PREDICTIONS, alternatives):
+        per_reference = [evaluator.evaluate_single(prediction, ref)['scores'] for ref in refs]
+        for metric in LEXICAL:
+            values = [scores[metric] for scores in per_reference]
+            expected = max(values) if reduce == 'max' else sum(values) / len(values)
+            assert sample['scores'][metric] == pytest.approx(expected)
+
+    fast = evaluator.evaluate_single(PREDICTIONS[2], alternatives[2], cascade='fast')
+    assert fast['scores'] == pytest.approx(results['per_sample'][2]['scores'])
+
+
+def test_fast_cascade_agrees_with_strict():
+    evaluator = LLMEvaluator(LEXICAL)
+    for threshold in (0.2, 0.5, 0.9):
+        for prediction, reference in zip(PREDICTIONS, REFERENCES):
+            strict = evaluator.evaluate_single(prediction, reference, pass_threshold=threshold)
+            fast = evaluator.evaluate_single(prediction, reference, cascade='fast',
+                                             pass_threshold=threshold)
+            assert fast['passed'] == strict['passed']
+            if fast['scores']['overall_score'] is None:
+                low, high = fast['overall_score_bound']
+                assert low <= strict['scores']['overall_score'] <= high
+            else:
+                assert fast['scores']['overall_score'] == pytest.approx(strict['scores']['overall_score'])
+
+
+def test_group_confidence_intervals():
+    labels = ['geo', 'geo', 'sci', 'sci', 'bio', 'geo', 'geo', 'sci']
+    results = LLMEvaluator(LEXICAL).evaluate_batch(PREDICTIONS, REFERENCES, groups={'topic': labels},
+                                                   n_boot=200)
+    groups = results['groups']['topic']
+    overall = np.array([scores['overall_score'] for scores in score_rows(results)])
+
+    assert sum(entry['count'] for entry in groups.values()) == len(labels)
+    for label, entry in groups.items():
+        members = overall[[i for i, value in enumerate(labels) if value == label]]
+        assert entry['overall_mean'] == pytest.approx(members.mean())
+        assert members.min() <= entry['overall_ci_low'] <= entry['overall_mean']
+        assert entry['overall_mean'] <= entry['overall_ci_high'] <= members.max()
+
+
+def test_group_labels_that_stringify_alike_are_rejected():
+    columns = {'overall_score': [1.0, 0.0, 0.5, 0.5]}
+    assert set(group_aggregates(columns, [1, 2, 2, None], n_boot=0)) == {'1', '2', 'None'}
+    with pytest.raises(ValueError, match="share the label '1'"):
+        group_aggregates(columns, [1, '1', 2, 2], n_boot=0)
+    with pytest.raises(ValueError):
+        group_aggregates(columns, [None, 'None', 'a', 'a'], n_boot=0)
+
+
+def sampled_records(seed=1):
+    """3000 rows in three categories whose exact-match rates are 0.8, 0.5 and 0.2."""
+    rng = np.random.default_rng(seed)
+    rates = {'geo': 0.8, 'sci': 0.5, 'bio': 0.2}
+    categories = ['geo'] * 1500 + ['sci'] * 1000 + ['bio'] * 500
+    records = []
+    for i, category in enumerate(categories):
+        reference = f"answer {i}"
+        prediction = reference if rng.random() < rates[category] else f"wrong {i}"
+        records.append({'prediction': prediction, 'reference': reference, 'category': category})
+    return records
+
+
+def test_sampled_stops_once_interval_is_narrow():
+    records = sampled_records()
+    evaluator = LLMEvaluator({'exact_match': {'normalize': True}})
+    full = evaluator.evaluate_batch([r['prediction'] for r in records], [r['reference'] for r in records])
+    options = dict(target_half_width=0.04, strata=('category',), chunk_size=100, seed=7)
+    results = evaluator.evaluate_sampled(records, compare_to=full, **options)
+    sampling = results['metadata']['sampling']
+
+    assert sampling['stopped'] == 'target_reached'
+    assert sampling['samples_used'] < len(records)
+    # Stops at the first chunk whose interval is within the target, not later
+    assert sampling['history'][-1]['half_width'] <= 0.04 < sampling['history'][-2]['half_width']
+    assert results['estimate']['overall']['half_width'] <= 0.04
+    assert results['comparison']['overall']['within_ci']
+    # Proportional allocation: each stratum's share of the sample tracks its share of the data
+    for stratum in sampling['strata']:
+        expected = stratum['population'] * sampling['samples_used'] / len(records)
+        assert abs(stratum['sampled'] - expected) <= 3
+
+    again = evaluator.evaluate_sampled(records, compare_to=full, **options)
+    assert again['metadata']['sampling']['history'] == sampling['history']
+    assert again['estimate'] == results['estimate']
+
+
+def test_sampled_falls_back_to_full_population():
+    records = sampled_records()
+    evaluator = LLMEvaluator({'exact_match': {'normalize': True}})
+    full = evaluator.evaluate_batch([r['prediction'] for r in records], [r['reference'] for r in records])
+    # An unreachable target scores every row, so the estimate is the full-run mean
+    results = evaluator.evaluate_sampled(records, target_half_width=0.0, strata=('category',),
+                                         chunk_size=700, seed=7)
+
+    assert results['metadata']['sampling']['stopped'] == 'exhausted'
+    assert results['metadata']['sampling']['samples_used'] == len(records)
+    assert results['estimate']['overall']['mean'] == pytest.approx(full['aggregate']['overall_mean'])
+    assert results['estimate']['overall']['half_width'] == pytest.approx(0.0)
+
+    capped = evaluator.evaluate_sampled(records, target_half_width=0.0, strata=('category',),
+                                        chunk_size=700, max_samples=1000, seed=7)
+    assert capped['metadata']['sampling']['stopped'] == 'max_samples'
+    assert capped['metadata']['sampling']['samples_used'] == 1000
+
+
+def test_allocate_is_proportional_with_a_minimum():
+    assert allocate(100, np.array([600, 300, 100]), np.zeros(3, dtype=np.int64)).tolist() == [60, 30, 10]
+    # Small strata get their minimum first, capped by what they hold
+    assert allocate(10, np.array([990, 9, 1]), np.zeros(3, dtype=np.int64), minimum=2).tolist() == [7, 2, 1]
+    # Exhausted strata hand their share to the others
+    assert allocate(50, np.array([100, 10]), np.array([0, 10])).tolist() == [50, 0]
+
+
+def test_compare_aligns_and_gates(tmp_path):
+    evaluator = LLMEvaluator(LEXICAL)
+    ids = [f"q{i}" for i in range(len(PREDICTIONS))]
+    baseline = evaluator.evaluate_batch(PREDICTIONS, REFERENCES, sample_ids=ids)
+    # The candidate answers every question with its reference, in reverse order, plus one extra
+    candidate = evaluator.evaluate_batch(REFERENCES[::-1] + ["extra"], REFERENCES[::-1] + ["extra"],
+                                         sample_ids=ids[::-1] + ["q_extra"])
+    for name, results in (('baseline', baseline), ('candidate', candidate)):
+        with open(tmp_path / f'{name}.json', 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+
+    base_run = load_run(str(tmp_path / 'baseline.json'))
+    cand_run = load_run(str(tmp_path / 'candidate.json'))
+    report = compare_runs(base_run, cand_run, n_boot=200, n_permutations=200,
+                          max_drops={'overall_score': 0.0})
+    assert report['pairs'] == len(PREDICTIONS)
+    assert report['only_in_candidate'] == 1
+    expected = 1.0 - np.mean([scores['overall_score'] for scores in score_rows(baseline)])
+    assert report['metrics']['overall_score']['mean_delta'] == pytest.approx(expected)
+    assert not report['gate']['failed']
+
+    # Swapped, every pair drops or stays: a significant drop fails a zero tolerance
+    reverse = compare_runs(cand_run, base_run, n_boot=0, n_permutations=500,
+                           max_drops={'overall_score': 0.0})
+    assert reverse['gate']['failed']
+    # ... but passes once the tolerance covers the whole drop
+    tolerant = compare_runs(cand_run, base_run, n_boot=0, n_permutations=500,
+                            max_drops={'overall_score': expected + 0.05})
+    assert not tolerant['gate']['failed']
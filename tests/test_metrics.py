@@ -0,0 +1,121 @@
+import random
+
+import Levenshtein
+import pytest
+
+from src.metrics.correctness import CorrectnessMetrics
+
+
+def random_texts(count, seed=0):
+    rng = random.Random(seed)
+    words = ["cat", "cats", "sat", "mat", "the", "a", "on", "dog", "paris", "france", "capital"]
+    return [" ".join(rng.choices(words, k=rng.randint(0, 8))) for _ in range(count)]
+
+
+def full_distance_match(prediction, reference, threshold):
+    """fuzzy_match as originally written: the full distance, no cutoff."""
+    pred_norm = CorrectnessMetrics.normalize_text(prediction)
+    ref_norm = CorrectnessMetrics.normalize_text(reference)
+    if len(ref_norm) == 0:
+        return 1.0 if len(pred_norm) == 0 else 0.0
+    distance = Levenshtein.distance(pred_norm, ref_norm)
+    return 1.0 if 1 - (distance / max(len(pred_norm), len(ref_norm))) >= threshold else 0.0
+
+
+@pytest.mark.parametrize('threshold', [0.0, 0.5, 0.7, 0.8, 0.95, 1.0, 1.2])
+def test_bounded_fuzzy_match_matches_full_distance(threshold):
+    predictions, references = random_texts(400, seed=1), random_texts(400, seed=2)
+    for prediction, reference in zip(predictions, references):
+        expected = full_distance_match(prediction, reference, threshold)
+        assert CorrectnessMetrics.fuzzy_match(prediction, reference, threshold=threshold) == expected
+
+
+def test_keyword_token_mode_matches_whole_words():
+    prediction = "The cats category was scattered"
+    # Substring mode finds 'cat' inside 'cats', 'category' and 'scattered'
+    assert CorrectnessMetrics.keyword_match(prediction, "", required_keywords=['cat'],
+                                            match_mode='substring') == 1.0
+    assert CorrectnessMetrics.keyword_match(prediction, "", required_keywords=['cat'],
+                                            match_mode='token') == 0.0
+    assert CorrectnessMetrics.keyword_match("A black cat, sleeping.", "", required_keywords=['cat', 'black cat'],
+                                            match_mode='token') == 1.0
+    assert CorrectnessMetrics.keyword_match("cat black", "", required_keywords=['black cat'],
+                                            match_mode='token') == 0.0
+    with pytest.raises(ValueError):
+        CorrectnessMetrics.keyword_match("cat", "cat", match_mode='regex')
+
+
+def test_semantic_encodes_each_distinct_text_once(tiny_model):
+    from src.metrics.relevance import RelevanceMetrics
+
+    relevance = RelevanceMetrics(tiny_model, batch_size=8)
+    references = [f"reference {i}" for i in range(5)] * 40
+    predictions = [f"prediction {i}" for i in range(200)]
+    scores = relevance.batch_semantic_similarity(predictions, references)['scores']
+
+    assert relevance.texts_requested == 400
+    assert relevance.texts_encoded == 205
+    single = [relevance.semantic_similarity(p, r) for p, r in zip(predictions[:10], references[:10])]
+    assert scores[:10] == pytest.approx(single, abs=1e-6)
+
+
+def test_long_texts_split_into_windows(tiny_model):
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    from src.metrics.encoders import encode_texts, split_windows
+
+    model = SentenceTransformer(tiny_model)
+    capacity = model.max_seq_length - model.tokenizer.num_special_tokens_to_add()
+    long_text = " ".join(f"the cat sat on mat number {i}" for i in range(60))
+    texts = ["a short text", long_text]
+    count = len(model.tokenizer(long_text, add_special_tokens=False)['input_ids'])
+    assert count > 2 * capacity
+
+    segments, owners, weights = split_windows(model, texts, window_overlap=16)
+    assert segments[0] == texts[0]
+    assert list(owners) == [0] + [1] * (len(segments) - 1)
+    windows = segments[1:]
+    tokens = [len(model.tokenizer(window, add_special_tokens=False)['input_ids']) for window in windows]
+    assert max(tokens) <= capacity
+    assert list(weights[1:]) == tokens
+    assert tokens[-1] < capacity
+    assert windows[0] == long_text[:len(windows[0])] and long_text.endswith(windows[-1])
+
+    windowed = encode_texts(model, texts, long_text='window', window_overlap=16)
+    truncated = encode_texts(model, texts, long_text='truncate')
+    segment_vectors = model.encode(windows, convert_to_numpy=True)
+    expected = (segment_vectors * weights[1:, None]).sum(axis=0) / weights[1:].sum()
+    np.testing.assert_allclose(windowed[1], expected, atol=1e-5)
+    np.testing.assert_allclose(windowed[0], truncated[0], atol=1e-6)
+    assert np.abs(windowed[1] - truncated[1]).max() > 1e-3
+
+
+def test_encoder_pool_matches_in_process(tiny_model):
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    from src.metrics.encoders import encode_texts
+    from src.metrics.relevance import RelevanceMetrics
+
+    texts = random_texts(40, seed=3) + [" ".join(f"the cat sat on mat number {i}" for i in range(60))]
+    relevance = RelevanceMetrics(tiny_model, encode_workers=2, threads_per_worker=1, long_text='window')
+    try:
+        pooled = relevance.encode(texts)
+        # Workers load the model and window long texts; the parent never does
+        assert relevance._model is None
+    finally:
+        relevance.close()
+
+    expected = encode_texts(SentenceTransformer(tiny_model), texts, long_text='window')
+    np.testing.assert_allclose(pooled, expected, atol=1e-6)
+
+
+def test_onnx_backend_matches_torch(tiny_model):
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('optimum')
+    from src.metrics.encoders import score_drift
+
+    predictions = ["the cat sat on the mat", "paris is the capital of france", "water boils"]
+    references = ["a cat is sitting on a mat", "the capital of france is paris", "ice melts"]
+    report = score_drift(tiny_model, 'onnx', predictions, references)
+    assert report['pairs'] == 3
+    assert report['within_tolerance']
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+from src.evaluator import LLMEvaluator
+from src.server import ScoringServer
+
+LEXICAL = {
+    'exact_match': {'normalize': True},
+    'fuzzy_match': {'threshold': 0.7},
+    'keyword_match': {}
+}
+
+
+async def post(port, body):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        f"POST /evaluate HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, payload = response.split(b'\r\n\r\n', 1)
+    return int(head.split(b' ', 2)[1]), json.loads(payload)
+
+
+def serve(evaluator, bodies):
+    """Start a server on an ephemeral port, POST each body, return (status, payload) pairs."""
+    async def run():
+        server = ScoringServer(evaluator, max_wait_ms=1)
+        await server.start(port=0)
+        port = server._server.sockets[0].getsockname()[1]
+        try:
+            return [await post(port, body) for body in bodies], server.counters
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('body, message', [
+    (b'{"prediction": "Paris"', None),
+    (json.dumps({'records': ["Paris"]}).encode(), "must be an object"),
+    (json.dumps({'prediction': 3, 'reference': "Paris"}).encode(), "prediction must be a string"),
+    (json.dumps({'records': [{'prediction': "Paris"}]}).encode(), "missing 'reference'"),
+])
+def test_malformed_requests_get_400(body, message):
+    valid = json.dumps({'prediction': "Paris", 'reference': "Paris"}).encode()
+    (bad, good), counters = serve(LLMEvaluator(LEXICAL), [body, valid])
+
+    status, payload = bad
+    assert status == 400
+    if message:
+        assert message in payload['error']
+    # The server keeps scoring after a rejected request
+    assert good[0] == 200
+    assert good[1]['results'][0]['scores']['exact_match'] == 1.0
+    assert counters['errors'] == 1
+    assert counters['records'] == 1
+
+
+def test_execution_settings_reach_results():
+    evaluator = LLMEvaluator(LEXICAL, cascade='fast', pass_threshold=0.6)
+    records = [
+        {'prediction': "Paris is the capital of France.", 'reference': "Paris is the capital of France."},
+        {'prediction': "Berlin", 'reference': "Paris is the capital of France."},
+    ]
+    [(status, payload)], _ = serve(evaluator, [json.dumps({'records': records}).encode()])
+
+    assert status == 200
+    for result, record in zip(payload['results'], records):
+        expected = evaluator.evaluate_single(record['prediction'], record['reference'])
+        assert result['passed'] == expected['passed']
+        assert result['cascade'] == expected['cascade']